@@ -1,9 +1,9 @@
 import os
 import subprocess
 import sys
+import threading
 import yaml
 import requests
-from plexapi.server import PlexServer
 from datetime import datetime, timedelta
 import time
 import signal
@@ -42,6 +42,9 @@ RESET = '\033[0m'
 # Signal handler for graceful shutdown
 def signal_handler(signum, frame):
     print(f"\n{ORANGE}Received shutdown signal. Exiting gracefully...{RESET}")
+    if _tracker:
+        # Stop a running trailer scan; the next scan resumes where it stopped
+        _tracker.cancel_scan()
     sys.exit(0)
 
 signal.signal(signal.SIGTERM, signal_handler)
@@ -184,7 +187,18 @@ def check_plex_connection(config):
             plex_timeout = 120
         if plex_timeout < 30:
             plex_timeout = 120
-        plex = PlexServer(PLEX_URL, PLEX_TOKEN, timeout=plex_timeout)
+        # Pooled keep-alive connection, shared with the web UI and the watcher
+        from Modules.plex_pool import get_plex_pool
+        pool = get_plex_pool()
+        plex = pool.server(PLEX_URL, PLEX_TOKEN, plex_timeout)
+        try:
+            # The pooled server only connects on first use: make a real request
+            # on every check, which also refreshes the library sections that
+            # check_libraries() looks up.
+            plex.library.sections()
+        except Exception:
+            pool.invalidate(PLEX_URL, PLEX_TOKEN, plex_timeout)
+            raise
         print(f"Connection to Plex: {GREEN}Successful{RESET}")
         return plex
     except Exception:
@@ -236,9 +250,11 @@ def check_libraries(config, plex):
 
 
 # Launch scripts based on LAUNCH_METHOD
-def launch_scripts(config, sched_state=None):
+def launch_scripts(config, sched_state=None, added_since=None):
+    """Run the module scripts; returns True if every script that ran exited cleanly."""
     LAUNCH_METHOD = config.get("LAUNCH_METHOD", "0")
     start_time = datetime.now()
+    failed = []
 
     # Get library names for display
     movie_libraries = config.get("MOVIE_LIBRARIES", [])
@@ -272,10 +288,21 @@ def launch_scripts(config, sched_state=None):
         else:
             choice = LAUNCH_METHOD
 
-    def _run_script(script_path):
-        """Run a module script, streaming its output through our stdout/stderr."""
+    parallel_pipelines = bool(config.get("PARALLEL_PIPELINES", False))
+    parallel_libraries = bool(config.get("PARALLEL_LIBRARIES", False))
+    output_lock = threading.Lock()
+
+    def _run_script(script_path, extra_args=(), prefix=""):
+        """Run a module script, streaming its output through our stdout/stderr.
+
+        prefix is put in front of every output line so that scripts running
+        at the same time can be told apart.
+        """
+        args = [sys.executable, "-u", script_path, *extra_args]
+        if added_since is not None:
+            args += ["--added-since", str(added_since)]
         proc = subprocess.Popen(
-            [sys.executable, "-u", script_path],
+            args,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             bufsize=1,
@@ -286,27 +313,66 @@ def launch_scripts(config, sched_state=None):
             sched_state.set_current_process(proc)
         try:
             for line in proc.stdout:
-                sys.stdout.write(line)
-                sys.stdout.flush()
+                # Whole lines under a lock, so parallel scripts never interleave mid-line
+                with output_lock:
+                    sys.stdout.write(prefix + line)
+                    sys.stdout.flush()
             proc.wait()
         finally:
             if sched_state is not None:
-                sched_state.clear_current_process()
+                sched_state.clear_current_process(proc)
+        if proc.returncode != 0:
+            failed.append(script_path)
+
+    def _run_all(jobs):
+        """Run callables at the same time and wait for all of them."""
+        if len(jobs) == 1:
+            jobs[0]()
+            return
+        def _guarded(job):
+            try:
+                job()
+            except Exception as e:
+                print(f"{RED}Script failed to run: {e}{RESET}")
+                failed.append(job)
+
+        threads = [threading.Thread(target=_guarded, args=(job,), daemon=True) for job in jobs]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def _pipeline(label, script_path, libraries, concurrent):
+        """The jobs of one pipeline: one script, or one per library with PARALLEL_LIBRARIES.
+
+        concurrent: another pipeline runs at the same time (output needs a prefix).
+        """
+        names = [lib["name"] for lib in libraries if lib.get("name")]
+        if parallel_libraries and len(names) > 1:
+            return [lambda name=name: _run_script(script_path, ["--library", name], f"[{label}: {name}] ")
+                    for name in names]
+        prefix = f"[{label}] " if concurrent else ""
+        return [lambda: _run_script(script_path, prefix=prefix)]
 
     if choice == "1":
         print("\nLaunching Movies script...")
-        _run_script(movies_script_path)
+        _run_all(_pipeline("Movies", movies_script_path, movie_libraries, False))
     elif choice == "2":
         print("\nLaunching TV Shows script...")
-        _run_script(tv_shows_script_path)
+        _run_all(_pipeline("TV", tv_shows_script_path, tv_libraries, False))
     elif choice == "3":
-        print("\nLaunching Movies script...")
-        _run_script(movies_script_path)
-        if sched_state is not None and sched_state.is_stopped():
-            print(f"\n{ORANGE}Stop requested — skipping TV Shows script.{RESET}")
+        if parallel_pipelines:
+            print("\nLaunching Movies and TV Shows scripts in parallel...")
+            _run_all(_pipeline("Movies", movies_script_path, movie_libraries, True)
+                     + _pipeline("TV", tv_shows_script_path, tv_libraries, True))
         else:
-            print("\nLaunching TV Shows script...")
-            _run_script(tv_shows_script_path)
+            print("\nLaunching Movies script...")
+            _run_all(_pipeline("Movies", movies_script_path, movie_libraries, False))
+            if sched_state is not None and sched_state.is_stopped():
+                print(f"\n{ORANGE}Stop requested — skipping TV Shows script.{RESET}")
+            else:
+                print("\nLaunching TV Shows script...")
+                _run_all(_pipeline("TV", tv_shows_script_path, tv_libraries, False))
 
         # Calculate and print total runtime
         end_time = datetime.now()
@@ -314,10 +380,12 @@ def launch_scripts(config, sched_state=None):
         print(f"\nTotal runtime: {str(total_runtime).split('.')[0]}")
     else:
         print(f"{RED}Invalid choice. Exiting...{RESET}")
+        return False
+    return not failed
 
 
-def run_once(sched_state=None):
-    """Run the script once"""
+def run_once(sched_state=None, added_since=None):
+    """Run the script once (only items added after epoch added_since, if given)"""
     # Print title
     print(f"Missing Trailer Downloader for Plex {VERSION}")
 
@@ -342,7 +410,45 @@ def run_once(sched_state=None):
     # Proceed with the rest of your flow
     plex = check_plex_connection(config)
     check_libraries(config, plex)
-    launch_scripts(config, sched_state=sched_state)
+    return launch_scripts(config, sched_state=sched_state, added_since=added_since)
+
+
+def _plan_scan(sched_state, manual=False):
+    """Decide between a full scan and an incremental one for the next run.
+
+    With INCREMENTAL_SCAN on, scheduled runs only check items added since the
+    last successful run started; a full scan still runs when the last one is
+    older than FULL_SCAN_DAYS, when there is no successful run on record, and
+    for Run Now. Returns the epoch to pass as added_since, or None for a full scan.
+    """
+    if sched_state is None or manual:
+        return None
+    try:
+        with open(config_path, "r", encoding="utf-8") as config_file:
+            config = yaml.safe_load(config_file) or {}
+    except Exception:
+        return None
+    if not config.get("INCREMENTAL_SCAN", False):
+        return None
+    try:
+        full_scan_days = float(config.get("FULL_SCAN_DAYS", 7))
+    except (TypeError, ValueError):
+        full_scan_days = 7
+    last_success, last_full = sched_state.get_scan_times()
+    if not last_success or not last_full:
+        return None
+    if time.time() - last_full >= full_scan_days * 86400:
+        print(f"Last full scan is older than {full_scan_days:g} days — running a full scan.")
+        return None
+    return last_success
+
+
+def _record_scan(sched_state, started_at, added_since):
+    """Remember a successful run so the next incremental scan starts from it."""
+    if sched_state is None or sched_state.is_stopped():
+        return  # a stopped run may have skipped items; don't move the window
+    sched_state.record_scan(started_at, full=added_since is None)
+
 
 def _load_initial_schedule(sched_state):
     """Seed the scheduler state from config.yml, falling back to env vars.
@@ -462,7 +568,10 @@ def run_scheduled(sched_state=None, watcher=None):
         if watcher is not None:
             watcher.wait_for_item_run(timeout=600)
         try:
-            run_once(sched_state=sched_state)
+            added_since = _plan_scan(sched_state)
+            scan_started = time.time()
+            if run_once(sched_state=sched_state, added_since=added_since):
+                _record_scan(sched_state, scan_started, added_since)
             consecutive_failures = 0
             if sched_state is not None:
                 sched_state.set_last_run(datetime.now())
@@ -485,6 +594,7 @@ def run_scheduled(sched_state=None, watcher=None):
 
     # Schedule loop
     while True:
+        manual_run = False
         # Stopped state: wait until resumed or run-now
         if sched_state is not None and sched_state.is_stopped():
             sched_state.set_status("stopped")
@@ -495,6 +605,7 @@ def run_scheduled(sched_state=None, watcher=None):
             sched_state._wake_event.clear()
             if sched_state.is_run_requested():
                 sched_state.clear_run_request()
+                manual_run = True
             elif sched_state.is_stopped():
                 continue
             else:
@@ -555,6 +666,7 @@ def run_scheduled(sched_state=None, watcher=None):
                     continue
                 if sched_state.is_run_requested():
                     sched_state.clear_run_request()
+                    manual_run = True
                 elif not woken:
                     pass  # Timeout reached, time for scheduled run
                 else:
@@ -573,7 +685,10 @@ def run_scheduled(sched_state=None, watcher=None):
             watcher.wait_for_item_run(timeout=600)
 
         try:
-            run_once(sched_state=sched_state)
+            added_since = _plan_scan(sched_state, manual=manual_run)
+            scan_started = time.time()
+            if run_once(sched_state=sched_state, added_since=added_since):
+                _record_scan(sched_state, scan_started, added_since)
             consecutive_failures = 0
         except PlexConnectionError as e:
             print(f"{ORANGE}Waiting for valid Plex credentials. The web UI is available on port 2121.{RESET}")
@@ -633,11 +748,16 @@ def _scan_trailers(tracker):
     removed = tracker.remove_missing()
     if removed:
         print(f"Cleaned up {removed} missing trailer entries")
+    try:
+        from Modules.probe_cache import get_probe_cache
+        get_probe_cache().purge_missing()
+    except Exception:
+        pass
 
     print("Scanning media directories for trailer files...")
     try:
-        from plexapi.server import PlexServer as _PS
-        plex = _PS(plex_url, plex_token)
+        from Modules.plex_pool import get_plex_server
+        plex = get_plex_server(config)
         dirs = []
         for lib_list_key in ["MOVIE_LIBRARIES", "TV_LIBRARIES"]:
             for lib in config.get(lib_list_key, []):
@@ -708,7 +828,7 @@ def main():
         _tracker = _init_webui_and_tracker(sched_state, watcher=watcher)
         if watcher is not None:
             # Start after the web UI so the watcher's output is teed to mtdp.log.
-            watcher.start()
+            watcher.start(trailer_tracker=_tracker)
         run_scheduled(sched_state, watcher=watcher)
     else:
         # Outside Docker, still start web UI but run once
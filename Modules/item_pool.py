@@ -0,0 +1,135 @@
+"""Worker pools for Movies.py and TV.py: the per-item scan loop and the download queue."""
+
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+_local = threading.local()
+
+
+class _GroupedStream:
+    """Stream proxy that diverts writes from a pool worker into that item's buffer.
+
+    Threads that are not running an item (the main thread, yt-dlp helpers, ...)
+    write straight through to the wrapped stream.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, message):
+        buffer = getattr(_local, "buffer", None)
+        if buffer is None:
+            return self._stream.write(message)
+        buffer.append(message)
+        return len(message)
+
+    def flush(self):
+        if getattr(_local, "buffer", None) is None:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _install_output_grouping():
+    """Wrap sys.stdout/sys.stderr once so worker output can be grouped per item."""
+    if not isinstance(sys.stdout, _GroupedStream):
+        sys.stdout = _GroupedStream(sys.stdout)
+    if not isinstance(sys.stderr, _GroupedStream):
+        sys.stderr = _GroupedStream(sys.stderr)
+
+
+def _run_grouped(worker, index, item):
+    """Run one item on a pool thread, capturing everything it prints."""
+    _local.buffer = []
+    try:
+        result = worker(index, item)
+        error = None
+    except Exception as e:
+        result = None
+        error = e
+    finally:
+        output = "".join(_local.buffer)
+        _local.buffer = None
+    return output, result, error
+
+
+def run_items(items, worker, max_workers=1):
+    """Call worker(index, item) for each item and yield (item, result) in input order.
+
+    index starts at 1. With max_workers == 1 the items run inline on the calling
+    thread, exactly like a plain for-loop. With more workers, up to max_workers
+    items are in flight at once; each item's console output is buffered and
+    written as one block when its turn comes, so the log reads like a serial run
+    and callers can merge results deterministically.
+
+    An exception raised by the worker is re-raised here, in order, after that
+    item's output has been written.
+    """
+    if max_workers <= 1:
+        for index, item in enumerate(items, start=1):
+            yield item, worker(index, item)
+        return
+
+    _install_output_grouping()
+    # Bound the look-ahead so a slow item at the head of the window can't make
+    # finished items pile up in memory behind it.
+    window_size = max_workers * 4
+    window = deque()
+    pending = iter(enumerate(items, start=1))
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="item")
+    try:
+        while True:
+            while len(window) < window_size:
+                nxt = next(pending, None)
+                if nxt is None:
+                    break
+                index, item = nxt
+                window.append((item, executor.submit(_run_grouped, worker, index, item)))
+            if not window:
+                break
+            item, future = window.popleft()
+            output, result, error = future.result()
+            if output:
+                sys.stdout.write(output)
+                sys.stdout.flush()
+            if error is not None:
+                raise error
+            yield item, result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class DownloadQueue:
+    """Background download workers fed by the scan loop.
+
+    The scan hands over a job (a zero-argument callable that downloads and
+    post-processes one trailer) and moves straight on to the next item. Up to
+    `workers` jobs run at once; each job's console output is written as one
+    block when it finishes.
+    """
+
+    def __init__(self, workers):
+        _install_output_grouping()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="download")
+        self._write_lock = threading.Lock()
+
+    def submit(self, job):
+        """Queue job() and return a Future of its result."""
+        return self._executor.submit(self._run, job)
+
+    def _run(self, job):
+        output, result, error = _run_grouped(lambda _index, _item: job(), 0, None)
+        if output:
+            with self._write_lock:
+                sys.stdout.write(output)
+                sys.stdout.flush()
+        if error is not None:
+            raise error
+        return result
+
+    def close(self):
+        """Wait for every queued download to finish."""
+        self._executor.shutdown(wait=True)
@@ -1,6 +1,15 @@
 #Real-time new-item detection via Plex's notifications websocket.
 #Listens to the Plex server's `/:/websockets/notifications` endpoint (through plexapi's AlertListener) 
-
+#New items are checked in-process through Modules/trailer_core.py, reusing the pooled Plex connection,
+#the parsed trailer settings and the trailer tracker; Movies.py/TV.py --rating-key is only run as
+#a subprocess when an in-process check cannot be set up.
+#Due items are drained by a pool of NEW_ITEM_WORKERS threads, at most NEW_ITEM_WORKERS_PER_LIBRARY
+#of them on the same Plex library, sharing a NEW_ITEM_BANDWIDTH_LIMIT download budget.
+#The queue and cooldowns are journaled to watcher_queue.db (Modules/watcher_journal.py) and replayed on
+#start; items added while the watcher was down or disconnected are caught up with an addedAt query.
+
+import copy
+import heapq
 import os
 import subprocess
 import sys
@@ -17,12 +26,15 @@ _WANTED_TYPES = (1, 2)
 
 class NewItemWatcher:
     COOLDOWN_SECONDS = 900        # ignore repeat events for an item for 15 min after handling
-    MAX_PENDING = 50             # circuit breaker: defer to the scheduled scan during a storm
+    MAX_PENDING = 5000           # circuit breaker: defer to the scheduled scan during a storm
     MAX_DEFER_SECONDS = 1800     # burst coalescing cap: handle at most 30 min after first event
     BACKOFF_START = 5
     BACKOFF_MAX = 300
     SETTLE_SECONDS = 1.0         # grace period to confirm a freshly-started listener is alive
     POLL_SECONDS = 5.0
+    JOURNAL_TOUCH_SECONDS = 30   # how often the "still listening" timestamp is persisted
+    CATCH_UP_MARGIN = 120        # look this much further back than the last known listening time
+    CATCH_UP_MAX_SECONDS = 86400  # never catch up further back; older items wait for the scheduled scan
 
     def __init__(self, config_path, sched_state, movies_script, tv_script):
         self._config_path = config_path
@@ -34,31 +46,50 @@ class NewItemWatcher:
         self._cond = threading.Condition(self._lock)
         self._wake = threading.Event()           # wakes the supervisor (apply_config/shutdown)
         self._shutdown = threading.Event()
-        self._item_run_active = threading.Event()  # set while a single-item subprocess runs
+        self._item_run_active = threading.Event()  # set while any single-item check runs
+        self._item_cancel = threading.Event()      # aborts the in-process check on shutdown
 
         self._started = False
         self._enabled = False
         self._delay = 60
+        self._max_workers = 3
+        self._per_library = 2
+        self._bandwidth = 0           # bytes/s shared by all item checks, 0 = unlimited
         self._config_dirty = False
         self._connected = False
         self._error = ""
         self._last_event_ts = None
         self._last_processed = None
 
-        self._pending = {}        # ratingKey -> {"due": epoch, "first_seen": epoch}
+        self._pending = {}        # ratingKey -> {"due": epoch, "first_seen": epoch, "section": sectionID}
+        # sectionID -> heap of (due, ratingKey). An entry is stale (skipped when it
+        # surfaces) once its item left _pending or was rescheduled to another due time.
+        self._due_heaps = {}
+        self._in_progress = set() # ratingKeys a worker has taken
+        self._active = {}         # sectionID -> number of workers busy on that library
+        self._active_total = 0
+        self._checks_running = 0  # workers inside an item check (drives _item_run_active)
         self._cooldown = {}       # ratingKey -> expiry epoch
+        self._cooldown_heap = []  # (expiry, ratingKey); stale once _cooldown moved on
         self._section_map = {}    # str(sectionID) -> "movie" | "tv"
         self._storm_warned = False
 
+        self._journal = None          # watcher_journal.WatcherJournal, opened in start()
+        self._journal_touched = 0.0
         self._listener = None
-        self._current_proc = None
+        self._procs = set()           # fallback subprocesses, terminated on shutdown
+        self._settings = None         # trailer_core.TrailerSettings, rebuilt after config changes
+        self._trailer_tracker = None
         self._supervisor_thread = None
-        self._worker_thread = None
+        self._worker_threads = []
 
     # ── Lifecycle ─────────────────────────────────────────────────────────
 
-    def start(self):
-        """Spawn the supervisor + worker threads (idempotent).
+    def start(self, trailer_tracker=None):
+        """Spawn the supervisor + worker pool threads (idempotent).
+
+        trailer_tracker is shared with the item checks (a new TrailerTracker
+        is created on first use if not given).
 
         Probes for websocket-client first; if it is missing we record an error
         and do not spawn the connect loop (avoids a hot reconnect loop).
@@ -67,8 +98,12 @@ class NewItemWatcher:
             if self._started:
                 return
             self._started = True
+            self._trailer_tracker = trailer_tracker
 
+        from Modules.watcher_journal import WatcherJournal
+        self._journal = WatcherJournal()
         self.apply_config()  # load enabled/delay from config.yml
+        self._replay_journal()
 
         try:
             import websocket  # noqa: F401  (plexapi's AlertListener needs this)
@@ -80,27 +115,60 @@ class NewItemWatcher:
 
         self._supervisor_thread = threading.Thread(
             target=self._supervise, daemon=True, name="new-item-watcher")
-        self._worker_thread = threading.Thread(
-            target=self._work, daemon=True, name="new-item-worker")
         self._supervisor_thread.start()
-        self._worker_thread.start()
+        self._ensure_workers()
+
+    def _replay_journal(self):
+        """Restore the queue and cooldowns saved before the last shutdown, due times included."""
+        pending, cooldown = self._journal.load()
+        last_event = self._journal.get_meta().get("last_event")
+        with self._lock:
+            if last_event:
+                self._last_event_ts = last_event
+            if not self._enabled:
+                return
+            for rk, expiry in cooldown.items():
+                self._cooldown[rk] = expiry
+                heapq.heappush(self._cooldown_heap, (expiry, rk))
+            for rk, info in pending.items():
+                self._pending[rk] = info
+                heapq.heappush(self._due_heaps.setdefault(info["section"], []), (info["due"], rk))
+            self._cond.notify_all()
+        if pending:
+            print(f"[Watcher] Restored {len(pending)} queued new item(s) from before the restart.")
+
+    def _ensure_workers(self):
+        """Grow the worker pool to NEW_ITEM_WORKERS threads.
+
+        The pool never shrinks: when the setting is lowered, the extra threads
+        stay idle because _wait_for_due_item enforces the global cap.
+        """
+        with self._lock:
+            if self._supervisor_thread is None or self._shutdown.is_set():
+                return
+            while len(self._worker_threads) < self._max_workers:
+                t = threading.Thread(target=self._work, daemon=True,
+                                     name=f"new-item-worker-{len(self._worker_threads) + 1}")
+                self._worker_threads.append(t)
+                t.start()
 
     def shutdown(self):
-        """Stop all threads, the listener, and any in-flight subprocess."""
+        """Stop all threads, the listener, and any in-flight item check."""
         self._shutdown.set()
+        self._item_cancel.set()
         self._wake.set()
         with self._lock:
             self._cond.notify_all()
-            proc = self._current_proc
+            procs = list(self._procs)
         self._stop_listener()
-        if proc is not None:
+        for proc in procs:
             try:
                 proc.terminate()
             except OSError:
                 pass
 
     def apply_config(self):
-        """Re-read config.yml and apply enabled/delay; force a reconnect.
+        """Re-read config.yml and apply enabled/delay/pool limits; force a reconnect.
 
         Called after the Settings page saves so changes (including Plex
         URL/token/library edits) take effect without a container restart.
@@ -113,18 +181,32 @@ class NewItemWatcher:
             delay = 60
         if delay < 0:
             delay = 0
+        max_workers = self._int_setting(cfg, "NEW_ITEM_WORKERS", 3, 1)
+        per_library = self._int_setting(cfg, "NEW_ITEM_WORKERS_PER_LIBRARY", 2, 1)
+        try:
+            bandwidth = float(cfg.get("NEW_ITEM_BANDWIDTH_LIMIT", 0) or 0)
+        except (TypeError, ValueError):
+            bandwidth = 0
         with self._lock:
             self._enabled = enabled
             self._delay = delay
+            self._max_workers = max_workers
+            self._per_library = per_library
+            self._bandwidth = int(bandwidth * 1024 * 1024) if bandwidth > 0 else 0
             self._config_dirty = True  # rebuild listener + section map on next supervisor pass
+            self._settings = None
             if not enabled:
                 self._pending.clear()
+                self._due_heaps.clear()
                 self._storm_warned = False
             self._cond.notify_all()
+        if not enabled and self._journal is not None:
+            self._journal.clear_pending()
         self._wake.set()
+        self._ensure_workers()
 
     def wait_for_item_run(self, timeout=600):
-        """Block until any in-flight single-item subprocess finishes.
+        """Block until all in-flight single-item checks finish.
 
         Called by the scheduler before a full run (after it sets status to
         'running') so a full scan can't race an in-flight single-item download.
@@ -143,6 +225,7 @@ class NewItemWatcher:
                 "connected": self._connected,
                 "last_event": self._last_event_ts,
                 "pending": len(self._pending),
+                "active": self._active_total,
                 "last_processed": self._last_processed,
                 "error": self._error,
             }
@@ -164,6 +247,9 @@ class NewItemWatcher:
             if not enabled:
                 self._set_connected(False)
                 self._stop_listener()
+                # Items added while detection is off are the scheduled scan's;
+                # keep last_seen current so enabling it doesn't catch them up.
+                self._touch_journal()
                 self._wake.wait(self.POLL_SECONDS)
                 self._wake.clear()
                 continue
@@ -171,6 +257,7 @@ class NewItemWatcher:
             listener = self._listener
             if listener is not None and listener.is_alive():
                 self._set_connected(True)
+                self._touch_journal()
                 if time.monotonic() - listener_started_at >= 60:
                     backoff = self.BACKOFF_START
                 self._wake.wait(self.POLL_SECONDS)
@@ -223,6 +310,69 @@ class NewItemWatcher:
             self._listener = listener
             self._error = ""
 
+        self._catch_up(plex, section_map)
+        self._touch_journal(force=True)
+
+    def _catch_up(self, plex, section_map):
+        """Queue items added while the watcher was not listening (restart, dropped websocket).
+
+        Asks each watched library for items added since the last time the
+        watcher was known to be listening; nothing is queued on the very
+        first start, when there is no such time yet. The window starts no
+        earlier than the last successful scheduled scan, which already handled
+        older items, and reaches back at most CATCH_UP_MAX_SECONDS.
+        """
+        from Modules.plex_batch import section_added_since
+
+        last_seen = self._journal.get_meta().get("last_seen") if self._journal else None
+        if not last_seen:
+            return
+        since = max(last_seen - self.CATCH_UP_MARGIN, time.time() - self.CATCH_UP_MAX_SECONDS)
+        if self._sched_state is not None:
+            last_scan = self._sched_state.get_scan_times()[0]
+            if last_scan:
+                since = max(since, last_scan)
+        found = {}
+        for section_key in section_map:
+            try:
+                for rk in section_added_since(plex, section_key, since):
+                    found[rk] = section_key
+            except Exception as e:
+                print(f"[Watcher] Could not list recently added items of library {section_key}: {e}")
+        now = time.time()
+        queued = []
+        with self._lock:
+            if not self._enabled:
+                return
+            delay = self._delay
+            for rk, section_key in found.items():
+                if rk in self._pending or rk in self._in_progress:
+                    continue
+                cd = self._cooldown.get(rk)
+                if cd is not None and now < cd:
+                    continue
+                if len(self._pending) >= self.MAX_PENDING:
+                    break
+                info = {"due": now + delay, "first_seen": now, "section": section_key}
+                self._pending[rk] = info
+                heapq.heappush(self._due_heaps.setdefault(section_key, []), (info["due"], rk))
+                queued.append((rk, info))
+            self._cond.notify_all()
+        if queued:
+            self._journal.save_pending(queued)
+            print(f"[Watcher] Queued {len(queued)} item(s) added while the watcher was not listening.")
+
+    def _touch_journal(self, force=False, event=False):
+        """Persist that the watcher is listening, or deliberately not (at most every JOURNAL_TOUCH_SECONDS)."""
+        now = time.time()
+        if self._journal is None or (not force and now - self._journal_touched < self.JOURNAL_TOUCH_SECONDS):
+            return
+        self._journal_touched = now
+        if event:
+            self._journal.set_meta(last_seen=now, last_event=now)
+        else:
+            self._journal.set_meta(last_seen=now)
+
     def _stop_listener(self):
         with self._lock:
             listener = self._listener
@@ -246,6 +396,7 @@ class NewItemWatcher:
                 return
             entries = data.get("TimelineEntry") or []
             now = time.time()
+            journaled = []
             with self._lock:
                 self._last_event_ts = now
                 if not self._enabled:
@@ -269,6 +420,8 @@ class NewItemWatcher:
                     cd = self._cooldown.get(rk)
                     if cd is not None and now < cd:
                         continue
+                    if rk in self._in_progress:
+                        continue
 
                     if MTDP_DEBUG:
                         print(f"[Watcher] new-item event: ratingKey={rk} type={entry.get('type')} "
@@ -282,12 +435,23 @@ class NewItemWatcher:
                                       f"deferring the rest to the next scheduled scan.")
                                 self._storm_warned = True
                             continue
-                        self._pending[rk] = {"due": now + delay, "first_seen": now}
+                        existing = {"due": now + delay, "first_seen": now,
+                                    "section": str(entry.get("sectionID"))}
+                        self._pending[rk] = existing
                     else:
                         # Repeat event: push the due time out so bursts coalesce,
                         # capped relative to when we first saw the item.
-                        existing["due"] = min(now + delay, existing["first_seen"] + self.MAX_DEFER_SECONDS)
+                        due = min(now + delay, existing["first_seen"] + self.MAX_DEFER_SECONDS)
+                        if due == existing["due"]:
+                            continue
+                        existing["due"] = due
+                    heapq.heappush(self._due_heaps.setdefault(existing["section"], []), (existing["due"], rk))
+                    journaled.append((rk, dict(existing)))
                 self._cond.notify()
+            # SQLite writes happen outside the lock so workers never wait on disk I/O.
+            self._touch_journal(event=True)
+            if journaled and self._journal is not None:
+                self._journal.save_pending(journaled)
         except Exception as e:
             if MTDP_DEBUG:
                 print(f"[Watcher] alert handler error: {e}")
@@ -297,47 +461,126 @@ class NewItemWatcher:
         if MTDP_DEBUG:
             print(f"[Watcher] websocket error: {error}")
 
-    # ── Worker: drains the pending queue serially ─────────────────────────
+    # ── Worker pool: drains the pending queue in parallel ─────────────────
 
     def _work(self):
         while not self._shutdown.is_set():
-            rk = self._wait_for_due_item()
-            if rk is None or self._shutdown.is_set():
-                continue
-            with self._lock:
-                enabled = self._enabled
-            if not enabled:
+            taken = self._wait_for_due_item()
+            if taken is None:
                 continue
+            rk, section = taken
             try:
-                self._process(rk)
+                with self._lock:
+                    enabled = self._enabled
+                if enabled and not self._shutdown.is_set():
+                    self._process(rk)
             except Exception as e:
                 print(f"[Watcher] Error handling ratingKey {rk}: {e}")
+            finally:
+                # Only now: a check cut short by a restart is replayed from the journal.
+                if self._journal is not None:
+                    self._journal.remove_pending(rk)
+                self._release_slot(rk, section)
 
     def _wait_for_due_item(self):
-        """Block until a pending item is due, then pop and return its ratingKey."""
+        """Block until a pending item is due and a worker slot is free for its library.
+
+        Pops the earliest due item whose library is below the per-library cap,
+        takes a slot for it and returns (ratingKey, sectionID); the caller must
+        hand both to _release_slot when done.
+        """
         with self._lock:
             while not self._shutdown.is_set():
                 self._expire_cooldowns()
                 now = time.time()
-                due_rk = None
-                earliest = None
-                for rk, info in self._pending.items():
-                    if info["due"] <= now and (earliest is None or info["due"] < earliest):
-                        earliest = info["due"]
-                        due_rk = rk
-                if due_rk is not None:
+                pool_free = self._active_total < self._max_workers
+                best_section = None
+                next_due = None
+                # One heap per library: peeking each top finds the earliest item of
+                # every library with a free slot without walking the whole queue.
+                for section in list(self._due_heaps):
+                    top = self._heap_top(section)
+                    if top is None:
+                        continue
+                    if top[0] > now:
+                        if next_due is None or top[0] < next_due:
+                            next_due = top[0]
+                    elif pool_free and self._active.get(section, 0) < self._per_library:
+                        if best_section is None or top < self._due_heaps[best_section][0]:
+                            best_section = section
+                if best_section is not None:
+                    _, due_rk = heapq.heappop(self._due_heaps[best_section])
                     del self._pending[due_rk]
                     if not self._pending:
                         self._storm_warned = False
-                    return due_rk
-                if self._pending:
-                    next_due = min(info["due"] for info in self._pending.values())
+                    self._active[best_section] = self._active.get(best_section, 0) + 1
+                    self._active_total += 1
+                    self._in_progress.add(due_rk)
+                    return due_rk, best_section
+                # Due items held back by a full pool wake us through _release_slot.
+                if next_due is not None:
                     timeout = max(0.1, min(self.POLL_SECONDS, next_due - now))
                 else:
                     timeout = self.POLL_SECONDS
                 self._cond.wait(timeout)
         return None
 
+    def _heap_top(self, section):
+        """Drop stale entries off a library's due heap and return its top, or None
+        (removing the heap once it is empty). Caller must hold self._lock."""
+        heap = self._due_heaps[section]
+        while heap:
+            due, rk = heap[0]
+            info = self._pending.get(rk)
+            if info is not None and info["due"] == due and info["section"] == section:
+                return heap[0]
+            heapq.heappop(heap)
+        del self._due_heaps[section]
+        return None
+
+    def _release_slot(self, rk, section):
+        with self._lock:
+            self._in_progress.discard(rk)
+            self._active_total -= 1
+            remaining = self._active.get(section, 1) - 1
+            if remaining > 0:
+                self._active[section] = remaining
+            else:
+                self._active.pop(section, None)
+            self._cond.notify_all()
+
+    def _begin_item_run(self):
+        """Mark one more item check as running; False if a scheduled run owns the libraries."""
+        with self._lock:
+            self._checks_running += 1
+            self._item_run_active.set()
+        if self._sched_state is None or self._sched_state.status != "running":
+            return True
+        self._end_item_run()
+        return False
+
+    def _end_item_run(self):
+        with self._lock:
+            self._checks_running -= 1
+            if self._checks_running == 0:
+                self._item_run_active.clear()
+
+    def _share_bandwidth(self, settings):
+        """A copy of settings capped at this check's share of NEW_ITEM_BANDWIDTH_LIMIT.
+
+        Every worker gets an equal, fixed share of the budget, so the checks
+        together never exceed it however many run at once; with no budget the
+        shared settings are returned unchanged.
+        """
+        with self._lock:
+            budget = self._bandwidth
+            workers = max(1, self._max_workers)
+        if not budget:
+            return settings
+        settings = copy.copy(settings)
+        settings.rate_limit = max(1, budget // workers)
+        return settings
+
     def _process(self, raw_rk):
         plex = self._get_worker_plex()
         if plex is None:
@@ -394,14 +637,14 @@ class NewItemWatcher:
             with self._lock:
                 if not self._enabled:
                     return
-            self._item_run_active.set()
-            if self._sched_state is None or self._sched_state.status != "running":
+            if self._begin_item_run():
                 claimed = True
                 break
-            self._item_run_active.clear()
             self._shutdown.wait(15)
-        if not claimed or self._shutdown.is_set():
-            self._item_run_active.clear()
+        if not claimed:
+            return
+        if self._shutdown.is_set():
+            self._end_item_run()
             return
 
         # Cooldown both keys now (pre-run) to absorb any event echoes, then run.
@@ -410,15 +653,73 @@ class NewItemWatcher:
         title = getattr(target, "title", str(target_rk))
         print(f"[Watcher] Checking '{title}' (ratingKey {target_rk}) for a missing trailer...")
         try:
-            self._run_item_subprocess(script, target_rk)
+            self._run_item(target, kind, script)
         finally:
-            self._item_run_active.clear()
+            self._end_item_run()
 
         self._upsert_cache_item(target_rk)
         self._refresh_library_cache()
         with self._lock:
             self._last_processed = {"ratingKey": target_rk, "title": title, "at": time.time()}
 
+    def _run_item(self, item, kind, script):
+        """Check one item in-process.
+
+        Only a failure while preparing the check (imports, config, settings,
+        metadata) re-runs the item in a subprocess. Once check_item() has
+        started, a search or download may already have happened, so an error
+        is only logged; the item is retried by a later event or scan once its
+        cooldown is over.
+        """
+        title = getattr(item, 'title', item.ratingKey)
+        try:
+            prepared = self._prepare_in_process(item, kind)
+        except Exception as e:
+            if self._shutdown.is_set():
+                return
+            print(f"[Watcher] In-process check of '{title}' could not start ({e}); "
+                  f"retrying in a subprocess.")
+            self._run_item_subprocess(script, int(item.ratingKey))
+            return
+        if prepared is None:
+            return
+        try:
+            self._check_in_process(item, *prepared)
+        except Exception as e:
+            if not self._shutdown.is_set():
+                print(f"[Watcher] Check of '{title}' failed: {e}")
+
+    def _prepare_in_process(self, item, kind):
+        """Load what `Movies.py/TV.py --rating-key` would for this item.
+
+        Returns (settings, genres_to_skip, trailer_tracker), or None if there
+        is nothing to do.
+        """
+        from Modules.plex_batch import ensure_full_metadata
+        import Modules.trailer_core  # noqa: F401  (an import error should fail here, not in the check)
+
+        cfg = self._read_config()
+        settings = self._share_bandwidth(self._get_settings(cfg))
+        ensure_full_metadata(item)
+        if settings.use_labels and any(getattr(l, "tag", None) == "MTDfP" for l in (item.labels or [])):
+            print(f"[Watcher] '{item.title}' already has the MTDfP label — nothing to do.")
+            return None
+        genres_to_skip = self._library_genres_to_skip(cfg, kind, getattr(item, "librarySectionTitle", ""))
+        return settings, genres_to_skip, self._get_trailer_tracker()
+
+    def _check_in_process(self, item, settings, genres_to_skip, trailer_tracker):
+        """Same checks as `Movies.py/TV.py --rating-key`, without a new interpreter."""
+        from Modules.trailer_core import check_item, ITEM_DOWNLOADED, ITEM_UPGRADED_BELOW_MIN
+
+        status, _ = check_item(settings, item, genres_to_skip, trailer_tracker,
+                               cancel=self._item_cancel)
+        if settings.refresh_metadata and status in (ITEM_DOWNLOADED, ITEM_UPGRADED_BELOW_MIN):
+            try:
+                print(f"Refreshing metadata for '{item.title}'")
+                item.refresh()
+            except Exception as e:
+                print(f"Failed to refresh metadata for '{item.title}': {e}")
+
     def _run_item_subprocess(self, script, rating_key):
         proc = None
         try:
@@ -431,7 +732,7 @@ class NewItemWatcher:
                 errors="replace",
             )
             with self._lock:
-                self._current_proc = proc
+                self._procs.add(proc)
             for line in proc.stdout:
                 sys.stdout.write(line)
                 sys.stdout.flush()
@@ -439,8 +740,9 @@ class NewItemWatcher:
         except Exception as e:
             print(f"[Watcher] Item check subprocess failed: {e}")
         finally:
-            with self._lock:
-                self._current_proc = None
+            if proc is not None:
+                with self._lock:
+                    self._procs.discard(proc)
 
     # ── Helpers ───────────────────────────────────────────────────────────
 
@@ -451,28 +753,56 @@ class NewItemWatcher:
         except Exception:
             return {}
 
-    def _build_plex(self):
-        from plexapi.server import PlexServer
-
-        cfg = self._read_config()
-        url = cfg.get("PLEX_URL")
-        token = cfg.get("PLEX_TOKEN")
-        if not url or not token or token == "YOUR_PLEX_TOKEN":
-            raise RuntimeError("Plex credentials not configured")
+    @staticmethod
+    def _int_setting(cfg, key, default, minimum):
         try:
-            timeout = int(cfg.get("PLEX_TIMEOUT", 120))
+            value = int(cfg.get(key, default))
         except (TypeError, ValueError):
-            timeout = 120
-        if timeout < 30:
-            timeout = 120
-        return PlexServer(url, token, timeout=timeout)
+            return default
+        return max(value, minimum)
+
+    def _build_plex(self):
+        """The process-wide pooled Plex connection for the current config."""
+        from Modules.plex_pool import get_plex_server
+
+        return get_plex_server(self._read_config())
 
     def _get_worker_plex(self):
+        """Plex connection for item checks (shared with the Web UI), or None."""
         try:
             return self._build_plex()
         except Exception:
             return None
 
+    def _get_settings(self, cfg):
+        with self._lock:
+            settings = self._settings
+        if settings is None:
+            from Modules.trailer_core import TrailerSettings
+            settings = TrailerSettings(cfg)
+            with self._lock:
+                self._settings = settings
+        return settings
+
+    def _get_trailer_tracker(self):
+        with self._lock:
+            if self._trailer_tracker is None:
+                from Modules.trailer_tracker import TrailerTracker
+                self._trailer_tracker = TrailerTracker()
+            return self._trailer_tracker
+
+    def _library_genres_to_skip(self, cfg, kind, lib_title):
+        """genres_to_skip of the configured library lib_title, honoring the legacy keys."""
+        list_key, single_key, genres_key = (
+            ("MOVIE_LIBRARIES", "MOVIE_LIBRARY_NAME", "MOVIE_GENRES_TO_SKIP") if kind == "movie"
+            else ("TV_LIBRARIES", "TV_LIBRARY_NAME", "TV_GENRES_TO_SKIP"))
+        for lib in cfg.get(list_key) or []:
+            if isinstance(lib, dict) and lib.get("name") == lib_title:
+                return lib.get("genres_to_skip") or []
+        if not cfg.get(list_key) and cfg.get(single_key) == lib_title:
+            return cfg.get(genres_key) or []
+        return []
+
     def _configured_library_names(self, cfg):
         """Return (movie_names, tv_names) sets, honoring the legacy single-name keys."""
         def _names(list_key, single_key):
@@ -495,14 +825,21 @@ class NewItemWatcher:
         return section_map
 
     def _add_cooldown(self, rk):
+        expiry = time.time() + self.COOLDOWN_SECONDS
         with self._lock:
-            self._cooldown[int(rk)] = time.time() + self.COOLDOWN_SECONDS
+            self._cooldown[int(rk)] = expiry
+            heapq.heappush(self._cooldown_heap, (expiry, int(rk)))
+        if self._journal is not None:
+            self._journal.save_cooldown(rk, expiry)
 
     def _expire_cooldowns(self):
         """Drop expired cooldown entries. Caller must hold self._lock."""
         now = time.time()
-        for k in [k for k, t in self._cooldown.items() if t <= now]:
-            del self._cooldown[k]
+        heap = self._cooldown_heap
+        while heap and heap[0][0] <= now:
+            expiry, rk = heapq.heappop(heap)
+            if self._cooldown.get(rk) == expiry:
+                del self._cooldown[rk]
 
     def _get_cached_item(self, rating_key):
         try:
@@ -519,7 +856,11 @@ class NewItemWatcher:
             pass
 
     def _refresh_library_cache(self):
-        """Trigger a full background cache rebuild (stats recompute + orphan cleanup)."""
+        """Trigger a background library cache refresh (stats recompute + orphan cleanup).
+
+        This is a delta refresh of the changed items; a full rebuild only runs
+        when CACHE_FULL_REFRESH_HOURS says one is due.
+        """
         try:
             from webui.routes import refresh_library_cache
             refresh_library_cache()
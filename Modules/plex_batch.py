@@ -0,0 +1,117 @@
+"""Bulk metadata loading for Plex library items.
+
+Listing a section (section.all() / section.search()) returns partial objects
+without genres, locations, labels or extras, so per-item code used to call
+reload() and extras() for every item: two or more round-trips each. Plex can
+return the full metadata of many items at once from
+/library/metadata/<key>,<key>,...?includeExtras=1, which is what this module
+does, a batch at a time.
+"""
+
+from plexapi.video import Extra
+
+# ratingKeys per request; keeps the URL well under common proxy limits
+BATCH_SIZE = 100
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _fetch_batch(plex, rating_keys):
+    """Fetch full metadata for up to BATCH_SIZE ratingKeys; returns {ratingKey: item}."""
+    keys = ','.join(str(key) for key in rating_keys)
+    try:
+        loaded = plex.fetchItems(f'/library/metadata/{keys}?includeExtras=1')
+    except Exception as e:
+        print(f"Batch metadata request failed ({e}); falling back to per-item requests")
+        loaded = []
+    by_key = {}
+    for obj in loaded:
+        # The objects hold the full detail response already; don't let a
+        # missing attribute trigger an implicit reload() per item.
+        obj._autoReload = False
+        obj._mtdp_full = True
+        by_key[str(obj.ratingKey)] = obj
+    return by_key
+
+
+def iter_full_items(plex, items, batch_size=BATCH_SIZE):
+    """Yield items with full metadata (and trailer extras) in input order.
+
+    Items are fetched lazily, batch_size at a time, so a consumer that starts
+    working on the first items does not wait for the whole section. Items that
+    a batch did not return (failed request, item deleted meanwhile) are yielded
+    as-is; ensure_full_metadata() and get_extras() fall back to the normal
+    per-item calls for those.
+    """
+    for chunk in _chunks(items, max(1, batch_size)):
+        by_key = _fetch_batch(plex, [item.ratingKey for item in chunk])
+        for item in chunk:
+            yield by_key.get(str(item.ratingKey), item)
+
+
+def iter_items_by_key(plex, rating_keys, batch_size=BATCH_SIZE):
+    """Yield full items (with trailer extras) for ratingKeys, in input order.
+
+    Like iter_full_items() for callers that only have the keys; keys Plex does
+    not return (e.g. the item was deleted meanwhile) are skipped.
+    """
+    for chunk in _chunks(rating_keys, max(1, batch_size)):
+        by_key = _fetch_batch(plex, chunk)
+        for key in chunk:
+            item = by_key.get(str(key))
+            if item is not None:
+                yield item
+
+
+def section_item_versions(plex, section):
+    """Return [(ratingKey, updatedAt)] for every item in a library section.
+
+    Reads the attributes straight from the section listing without building
+    plexapi objects, which makes it a cheap way to find added, changed and
+    deleted items. updatedAt is Plex's epoch timestamp (0 if missing).
+    """
+    data = plex.query(f'/library/sections/{section.key}/all')
+    versions = []
+    for elem in data:
+        key = elem.attrib.get('ratingKey')
+        if not key:
+            continue
+        try:
+            updated_at = int(elem.attrib.get('updatedAt') or 0)
+        except ValueError:
+            updated_at = 0
+        versions.append((int(key), updated_at))
+    return versions
+
+
+def section_added_since(plex, section_key, since):
+    """Return the ratingKeys of the items added to a library section after epoch `since`.
+
+    Plex filters the listing server-side, so this is one small request even
+    on a large library.
+    """
+    data = plex.query(f'/library/sections/{section_key}/all?addedAt>>={int(since)}')
+    return [int(elem.attrib['ratingKey']) for elem in data if elem.attrib.get('ratingKey')]
+
+
+def ensure_full_metadata(item):
+    """reload() an item unless it came from iter_full_items()."""
+    if not getattr(item, '_mtdp_full', False):
+        item.reload()
+    return item
+
+
+def get_extras(item):
+    """Return the item's extras, from the batch response when available."""
+    if getattr(item, '_mtdp_full', False):
+        return item.findItems(item._data, Extra, rtag='Extras')
+    return item.extras()
@@ -0,0 +1,176 @@
+"""Process-wide, reusable Plex connections.
+
+Building a PlexServer costs a request to the server root plus a new requests
+Session, i.e. a fresh TCP (and TLS) handshake, and the Web UI used to pay that
+on every item view, stream, delete and cache update, as did the watcher and
+the trailer scan. The pool keeps one PlexServer per (url, token, timeout) on
+a keep-alive Session whose connection pool is sized for the threads that
+share it, and records per-connection request latency and health for the
+Web UI. invalidate() drops everything after the Plex settings change.
+"""
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 16
+_LATENCY_SAMPLES = 50
+
+
+def plex_settings(config):
+    """(url, token, timeout) from config.yml values, or None if Plex isn't configured."""
+    url = (config.get('PLEX_URL') or '').strip()
+    token = config.get('PLEX_TOKEN') or ''
+    if not url or not token or token == 'YOUR_PLEX_TOKEN':
+        return None
+    try:
+        timeout = int(config.get('PLEX_TIMEOUT', 120))
+    except (TypeError, ValueError):
+        timeout = 120
+    if timeout < 30:
+        timeout = 120
+    return url, token, timeout
+
+
+class _Connection:
+    """A keep-alive Session for one server, its PlexServer and request metrics."""
+
+    def __init__(self, url, token, pool_size):
+        self.url = url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['X-Plex-Token'] = token
+        self.session.hooks['response'].append(self._record)
+        self.server = None
+        self.created_at = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.last_status = None
+        self.last_used = None
+        self._latencies = []
+        self._lock = threading.Lock()
+
+    def _record(self, response, *args, **kwargs):
+        ms = response.elapsed.total_seconds() * 1000
+        with self._lock:
+            self.requests += 1
+            if response.status_code >= 400:
+                self.errors += 1
+            self.last_status = response.status_code
+            self.last_used = time.time()
+            self._latencies.append(ms)
+            if len(self._latencies) > _LATENCY_SAMPLES:
+                del self._latencies[0]
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                'url': self.url,
+                'connected': self.server is not None,
+                'healthy': self.last_status is not None and self.last_status < 400,
+                'created_at': self.created_at,
+                'last_used': self.last_used,
+                'requests': self.requests,
+                'errors': self.errors,
+                'last_status': self.last_status,
+                'last_latency_ms': round(self._latencies[-1], 1) if latencies else None,
+                'median_latency_ms': round(latencies[len(latencies) // 2], 1) if latencies else None,
+                'max_latency_ms': round(latencies[-1], 1) if latencies else None,
+            }
+
+
+class PlexPool:
+    """Thread-safe cache of PlexServer connections keyed by (url, token, timeout)."""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE):
+        self._pool_size = pool_size
+        self._connections = {}
+        self._lock = threading.Lock()
+        self.handshakes = 0
+
+    def set_pool_size(self, pool_size):
+        """Connections per server for connections created from now on."""
+        with self._lock:
+            self._pool_size = max(1, int(pool_size))
+
+    def _connection(self, url, token, timeout):
+        key = (url.rstrip('/'), token, timeout)
+        with self._lock:
+            conn = self._connections.get(key)
+            if conn is None:
+                conn = self._connections[key] = _Connection(key[0], token, self._pool_size)
+            return conn
+
+    def server(self, url, token, timeout=120):
+        """The shared PlexServer for these credentials, connecting on first use.
+
+        Raises what PlexServer raises when the server can't be reached; a
+        failed connect is not cached, so the next call tries again.
+        """
+        from plexapi.server import PlexServer
+
+        conn = self._connection(url, token, timeout)
+        if conn.server is None:
+            # Two threads may connect at once on a cold pool; both results are
+            # usable and the last one is kept.
+            server = PlexServer(conn.url, token, session=conn.session, timeout=timeout)
+            with self._lock:
+                self.handshakes += 1
+            conn.server = server
+        return conn.server
+
+    def session(self, url, token, timeout=120):
+        """The keep-alive Session of these credentials, for raw requests (posters, streams).
+
+        It already sends the X-Plex-Token header.
+        """
+        return self._connection(url, token, timeout).session
+
+    def invalidate(self, url=None, token=None, timeout=120):
+        """Forget cached connections so the next use reconnects.
+
+        Without arguments every connection is dropped (after the Plex URL, token
+        or timeout changed); with credentials only that one, e.g. after a
+        request on it failed.
+        """
+        with self._lock:
+            if url is None:
+                connections = list(self._connections.values())
+                self._connections.clear()
+            else:
+                conn = self._connections.pop((url.rstrip('/'), token, timeout), None)
+                connections = [conn] if conn is not None else []
+        for conn in connections:
+            conn.session.close()
+
+    def stats(self):
+        with self._lock:
+            connections = list(self._connections.values())
+            handshakes = self.handshakes
+        return {'handshakes': handshakes, 'connections': [conn.stats() for conn in connections]}
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_plex_pool():
+    """The process-wide PlexPool."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = PlexPool()
+        return _default_pool
+
+
+def get_plex_server(config):
+    """Shared PlexServer for the Plex settings in config (raises if not configured)."""
+    settings = plex_settings(config)
+    if settings is None:
+        raise RuntimeError("Plex credentials not configured")
+    return get_plex_pool().server(*settings)
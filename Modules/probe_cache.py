@@ -0,0 +1,198 @@
+"""Persistent cache of video probe results (dimensions, codec, duration) for local trailers.
+
+Deciding whether a trailer needs an upgrade, renaming a download with its
+resolution and showing an item in the Web UI all need the video dimensions of
+local files, and each used to spawn an ffprobe process every time. This cache
+stores the first video stream's width, height and codec plus the container's
+duration and bitrate in a small SQLite database next to the config, keyed by
+the file's real path and validated against its size and mtime, so a file is
+probed again only after it has been replaced or modified.
+
+On a miss, MP4 and Matroska/WebM files are read in-process from their
+container headers (Modules/video_header.py); ffprobe only runs for other
+containers or headers the reader doesn't understand.
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import time
+
+try:
+    from Modules.video_header import read_video_info
+except ImportError:
+    from video_header import read_video_info
+
+PROBE_FIELDS = ('width', 'height', 'codec', 'duration', 'bitrate')
+
+
+def default_cache_path():
+    if os.environ.get('IS_DOCKER', 'false').lower() == 'true':
+        return '/config/probe_cache.db'
+    return os.path.join(os.path.dirname(__file__), 'config', 'probe_cache.db')
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def run_ffprobe(filepath):
+    """Probe a file with ffprobe.
+
+    Returns a dict with PROBE_FIELDS (width/height/codec are None when the file
+    has no video stream), or None when ffprobe could not be run at all (not
+    installed, timed out, unreadable output) -- a result worth retrying later.
+    """
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'stream=width,height,codec_name:format=duration,bit_rate',
+             '-of', 'json', filepath],
+            capture_output=True, text=True, timeout=10
+        )
+        data = json.loads(result.stdout or '{}')
+    except Exception:
+        return None
+    streams = data.get('streams') or [{}]
+    stream = streams[0]
+    fmt = data.get('format') or {}
+    if not streams[0] and not fmt:
+        return None  # ffprobe failed to read the file
+    return {
+        'width': _to_int(stream.get('width')),
+        'height': _to_int(stream.get('height')),
+        'codec': stream.get('codec_name'),
+        'duration': _to_float(fmt.get('duration')),
+        'bitrate': _to_int(fmt.get('bit_rate')),
+    }
+
+
+class ProbeCache:
+    """SQLite-backed file -> probe result cache, safe across threads and processes."""
+
+    def __init__(self, cache_path=None):
+        self._path = cache_path or default_cache_path()
+        self._ready = False
+
+    def _connect(self):
+        # One short-lived connection per call, like SearchCache: the scans probe
+        # from worker threads and the Web UI from another process.
+        if not self._ready:
+            os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self._path, timeout=30)
+        if not self._ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS probe_cache ('
+                ' path TEXT PRIMARY KEY,'
+                ' size INTEGER NOT NULL,'
+                ' mtime_ns INTEGER NOT NULL,'
+                ' width INTEGER,'
+                ' height INTEGER,'
+                ' codec TEXT,'
+                ' duration REAL,'
+                ' bitrate INTEGER,'
+                ' probed_at REAL NOT NULL)')
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def probe(self, filepath):
+        """Return the probe result dict for filepath, reading the file only on a miss.
+
+        Returns None if the file does not exist or could not be probed.
+        """
+        try:
+            real = os.path.realpath(filepath)
+            st = os.stat(real)
+        except OSError:
+            return None
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    f'SELECT size, mtime_ns, {", ".join(PROBE_FIELDS)} FROM probe_cache WHERE path = ?',
+                    (real,)).fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            row = None
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return dict(zip(PROBE_FIELDS, row[2:]))
+
+        info = read_video_info(real) or run_ffprobe(real)
+        if info is None:
+            return None
+        self._store(real, st, info)
+        return info
+
+    def _store(self, real, st, info):
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    f'INSERT OR REPLACE INTO probe_cache (path, size, mtime_ns, {", ".join(PROBE_FIELDS)}, probed_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (real, st.st_size, st.st_mtime_ns) + tuple(info[f] for f in PROBE_FIELDS) + (time.time(),))
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            pass
+
+    def renamed(self, old_path, new_path):
+        """Carry a cached result over to a file's new name after os.rename()."""
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('UPDATE OR REPLACE probe_cache SET path = ? WHERE path = ?',
+                             (os.path.realpath(new_path), os.path.realpath(old_path)))
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            pass
+
+    def purge_missing(self):
+        """Drop entries for files that no longer exist. Returns the number removed."""
+        if not os.path.exists(self._path):
+            return 0
+        conn = self._connect()
+        try:
+            paths = [row[0] for row in conn.execute('SELECT path FROM probe_cache')]
+            missing = [(p,) for p in paths if not os.path.exists(p)]
+            conn.executemany('DELETE FROM probe_cache WHERE path = ?', missing)
+            conn.commit()
+        finally:
+            conn.close()
+        return len(missing)
+
+
+_default_cache = None
+
+
+def get_probe_cache():
+    """The process-wide ProbeCache at the default location."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ProbeCache()
+    return _default_cache
+
+
+def probe_dimensions(filepath):
+    """(width, height) of a video file's first video stream, or None if unknown."""
+    info = get_probe_cache().probe(filepath)
+    if not info or not info.get('width') or not info.get('height'):
+        return None
+    return info['width'], info['height']
@@ -6,7 +6,7 @@ import subprocess
 import threading
 import time
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Set
 
 
 class SchedulerState:
@@ -26,7 +26,12 @@ class SchedulerState:
         self._schedule_hours: int = 24
         self._cron_expression: Optional[str] = None
         self._started_at: Optional[datetime] = None
-        self._current_process: Optional[subprocess.Popen] = None
+        self._processes: Set[subprocess.Popen] = set()  # running module scripts
+        # Start times (epoch) of the last successful run and full scan, kept in
+        # status.json so incremental scans carry on across restarts
+        self._last_success_at: Optional[float] = None
+        self._last_full_scan_at: Optional[float] = None
+        self._load_scan_times()
 
         # Cross-thread signaling
         self._wake_event = threading.Event()
@@ -66,6 +71,8 @@ class SchedulerState:
                 "schedule_hours": self._schedule_hours,
                 "error_message": self._error_message,
                 "cron_expression": self._cron_expression,
+                "last_success_at": self._last_success_at,
+                "last_full_scan_at": self._last_full_scan_at,
             }
 
     def get_schedule(self) -> tuple:
@@ -73,6 +80,11 @@ class SchedulerState:
         with self._lock:
             return (self._schedule_type, self._schedule_hours, self._cron_expression or "")
 
+    def get_scan_times(self) -> tuple:
+        """Return (last_success_at, last_full_scan_at) as epoch seconds or None."""
+        with self._lock:
+            return (self._last_success_at, self._last_full_scan_at)
+
     @property
     def status(self) -> str:
         with self._lock:
@@ -98,6 +110,14 @@ class SchedulerState:
         with self._lock:
             self._last_run_time = dt
 
+    def record_scan(self, started_at: float, full: bool) -> None:
+        """Remember a successful run that started at epoch started_at."""
+        with self._lock:
+            self._last_success_at = started_at
+            if full:
+                self._last_full_scan_at = started_at
+        self._save_status()
+
     def set_schedule(self, hours: int) -> None:
         with self._lock:
             self._schedule_type = "hours"
@@ -185,22 +205,28 @@ class SchedulerState:
         self._wake_event.set()
 
     def set_current_process(self, proc: subprocess.Popen) -> None:
-        """Register the currently running subprocess so it can be terminated on stop."""
+        """Register a running subprocess so it can be terminated on stop.
+
+        Several can be registered at once when pipelines or libraries run in parallel.
+        """
         with self._lock:
-            self._current_process = proc
+            self._processes.add(proc)
 
-    def clear_current_process(self) -> None:
-        """Clear the current subprocess reference."""
+    def clear_current_process(self, proc: Optional[subprocess.Popen] = None) -> None:
+        """Forget a finished subprocess (all of them if proc is None)."""
         with self._lock:
-            self._current_process = None
+            if proc is None:
+                self._processes.clear()
+            else:
+                self._processes.discard(proc)
 
     def request_stop(self) -> None:
-        """Signal the scheduler to pause and terminate any running subprocess."""
+        """Signal the scheduler to pause and terminate every running subprocess."""
         self._stop_requested.set()
         self._wake_event.set()
         with self._lock:
-            proc = self._current_process
-        if proc is not None:
+            procs = list(self._processes)
+        for proc in procs:
             try:
                 proc.terminate()
             except OSError:
@@ -213,6 +239,18 @@ class SchedulerState:
 
     # ── Persistence ───────────────────────────────────────────────────────
 
+    def _load_scan_times(self) -> None:
+        """Read the scan times back from config/status.json, if present."""
+        try:
+            with open(os.path.join(self._config_dir, "status.json"), "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        for key in ("last_success_at", "last_full_scan_at"):
+            value = data.get(key)
+            if isinstance(value, (int, float)):
+                setattr(self, f"_{key}", float(value))
+
     def _save_status(self) -> None:
         """Write current status to config/status.json (atomic)."""
         status_path = os.path.join(self._config_dir, "status.json")
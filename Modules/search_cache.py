@@ -0,0 +1,164 @@
+"""Persistent cache of YouTube trailer search results.
+
+Each `ytsearch15:` query costs a network round-trip to YouTube, and the
+scheduled run used to repeat the same queries every night for items that had
+no usable trailer. This cache stores the flat candidate list per normalized
+query in a small SQLite database next to the config, together with the
+outcome of the last evaluation:
+
+- 'match'    -- the query produced candidates; they are reused until the
+                positive TTL expires, so only the chosen video is downloaded.
+- 'no_match' -- none of the candidates was usable; the query is skipped
+                entirely until the no-match TTL expires.
+
+A TTL of 0 disables that kind of caching.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import unicodedata
+
+# Flat-playlist fields kept per candidate (everything scoring/matching needs)
+CANDIDATE_FIELDS = ('id', 'url', 'title', 'channel', 'uploader', 'duration', 'view_count')
+
+OUTCOME_MATCH = 'match'
+OUTCOME_NO_MATCH = 'no_match'
+
+DEFAULT_TTL_HOURS = 168
+DEFAULT_NO_MATCH_TTL_HOURS = 72
+
+
+def default_cache_path():
+    if os.environ.get('IS_DOCKER', 'false').lower() == 'true':
+        return '/config/search_cache.db'
+    return os.path.join(os.path.dirname(__file__), 'config', 'search_cache.db')
+
+
+def normalize_query(query):
+    """Case-, width- and whitespace-insensitive cache key for a search query."""
+    query = unicodedata.normalize('NFKC', query or '')
+    return ' '.join(query.lower().split())
+
+
+def _flatten(entry):
+    return {field: entry.get(field) for field in CANDIDATE_FIELDS if entry.get(field) is not None}
+
+
+class SearchCache:
+    """SQLite-backed query -> candidates cache, safe across threads and processes."""
+
+    def __init__(self, cache_path=None, ttl_hours=DEFAULT_TTL_HOURS,
+                 no_match_ttl_hours=DEFAULT_NO_MATCH_TTL_HOURS):
+        self._path = cache_path or default_cache_path()
+        self._ttl = max(0.0, float(ttl_hours or 0)) * 3600
+        self._no_match_ttl = max(0.0, float(no_match_ttl_hours or 0)) * 3600
+        self._ready = False
+
+    @property
+    def enabled(self):
+        return bool(self._ttl or self._no_match_ttl)
+
+    def _connect(self):
+        # One short-lived connection per call: the scan runs in a subprocess and
+        # on several worker threads, and the Web UI purges from yet another process.
+        if not self._ready:
+            os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self._path, timeout=30)
+        if not self._ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS search_cache ('
+                ' query TEXT PRIMARY KEY,'
+                ' outcome TEXT NOT NULL,'
+                ' candidates TEXT NOT NULL,'
+                ' searched_at REAL NOT NULL)')
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def get(self, query):
+        """Return (outcome, candidates) for a fresh entry, or None on a miss."""
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    'SELECT outcome, candidates, searched_at FROM search_cache WHERE query = ?',
+                    (normalize_query(query),)).fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            return None
+        if row is None:
+            return None
+        outcome, candidates, searched_at = row
+        ttl = self._no_match_ttl if outcome == OUTCOME_NO_MATCH else self._ttl
+        if time.time() - searched_at > ttl:
+            return None
+        try:
+            return outcome, json.loads(candidates)
+        except ValueError:
+            return None
+
+    def put(self, query, entries):
+        """Store the flat candidates of a search (entries as returned by yt-dlp)."""
+        if not self._ttl:
+            return
+        candidates = json.dumps([_flatten(e) for e in entries if e])
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO search_cache (query, outcome, candidates, searched_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    (normalize_query(query), OUTCOME_MATCH, candidates, time.time()))
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            pass
+
+    def mark_no_match(self, query):
+        """Record that none of a query's candidates was usable."""
+        if not self._no_match_ttl:
+            # Don't let a stale positive entry keep serving unusable candidates
+            self.discard(query)
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO search_cache (query, outcome, candidates, searched_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    (normalize_query(query), OUTCOME_NO_MATCH, '[]', time.time()))
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            pass
+
+    def discard(self, query):
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('DELETE FROM search_cache WHERE query = ?', (normalize_query(query),))
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            pass
+
+    def purge(self):
+        """Delete every cached search. Returns the number of entries removed."""
+        if not os.path.exists(self._path):
+            return 0
+        conn = self._connect()
+        try:
+            removed = conn.execute('DELETE FROM search_cache').rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return removed
@@ -0,0 +1,101 @@
+"""Precompiled title and language matching for trailer search results.
+
+A search round scores and title-checks up to 45 candidates per item, and the
+checks used to rebuild the same regular expressions and sanitized titles for
+every candidate. TitleMatcher does the per-item work once, when the item's
+search starts; keyword_pattern() turns a language's keyword list into a
+single compiled alternation that module-level tables can hold.
+"""
+
+import re
+
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_SPACES_RE = re.compile(r'\s+')
+_PREFIX_SEPARATORS_RE = re.compile(r'[|\-:!]')
+_YEAR_RE = re.compile(r'\b((?:19|20)\d{2})\b')
+
+STOPWORDS = frozenset({'the', 'a', 'an', 'of', 'and', 'in', 'to', 'for', 'is', 'on', 'at'})
+
+
+def sanitize_title(text_lower):
+    """Drop punctuation and collapse whitespace (input already lowercased)."""
+    return _SPACES_RE.sub(' ', _NON_WORD_RE.sub('', text_lower)).strip()
+
+
+def years_in(text):
+    """Four-digit years (19xx/20xx) mentioned in text."""
+    return _YEAR_RE.findall(text)
+
+
+def keyword_pattern(keywords):
+    """Compile keywords into one regex: short ones (<= 3 chars) as whole words,
+    longer ones as plain substrings. None if there are no keywords."""
+    alternatives = [r'\b' + re.escape(kw) + r'\b' if len(kw) <= 3 else re.escape(kw)
+                    for kw in keywords]
+    if not alternatives:
+        return None
+    return re.compile('|'.join(alternatives))
+
+
+class _Phrase:
+    """A title phrase that must appear on its own in a video title."""
+
+    def __init__(self, phrase, noise_words):
+        self.phrase = phrase
+        self._pattern = re.compile(r'\b' + re.escape(phrase) + r'\b')
+        # Only short titles (1-2 words) are checked for a preceding title prefix
+        self._check_prefix = len(phrase.split()) <= 2
+        self._noise_words = noise_words
+
+    def found_in(self, text):
+        match = self._pattern.search(text)
+        if not match:
+            return False
+        # Reject if significant words precede a short title (e.g. "Burden of"
+        # before "Dreams" means it's a different title)
+        if self._check_prefix:
+            prefix = text[:match.start()].strip()
+            if prefix:
+                prefix = _PREFIX_SEPARATORS_RE.sub(' ', prefix).strip()
+                for word in prefix.split():
+                    if word not in self._noise_words and len(word) > 2:
+                        return False
+        return True
+
+
+class TitleMatcher:
+    """Everything about one item's title that candidate checks need, built once.
+
+    title is the item title as matched against video titles (already stripped
+    of anything that should not count, e.g. a '(2019)' suffix on a show).
+    """
+
+    def __init__(self, title, noise_words=frozenset()):
+        self.title = title.lower().strip()
+        self.sanitized = sanitize_title(self.title)
+        self.colon_parts = [part.strip() for part in self.title.split(':')]
+        self.words = self.title.split()
+        self.significant_words = frozenset(self.sanitized.split()) - STOPWORDS
+        # Long or multi-word titles are unlikely to collide with other titles
+        self.is_specific = len(self.words) >= 3 or len(self.title) >= 15
+        self._phrase = _Phrase(self.title, noise_words)
+        self._sanitized_phrase = _Phrase(self.sanitized, noise_words)
+
+    def standalone_in(self, video_title_lower):
+        """Title appears as a standalone phrase, not part of a longer title."""
+        return self._phrase.found_in(video_title_lower)
+
+    def sanitized_standalone_in(self, sanitized_video_title):
+        """Same as standalone_in(), on punctuation-free titles."""
+        return self._sanitized_phrase.found_in(sanitized_video_title)
+
+    def colon_parts_in(self, video_title_lower):
+        """For 'Franchise: Subtitle' titles, every part appears in the video title."""
+        return len(self.colon_parts) > 1 and all(part in video_title_lower for part in self.colon_parts)
+
+    def word_overlap(self, sanitized_video_title):
+        """Share of the title's significant words that appear in the video title."""
+        if not self.significant_words:
+            return 0.0
+        video_words = set(sanitized_video_title.split())
+        return len(self.significant_words & video_words) / len(self.significant_words)
@@ -0,0 +1,1503 @@
+"""Trailer search, scoring, download and post-processing shared by Movies.py, TV.py and the Web UI.
+
+Movies.py and TV.py used to carry their own copies of this pipeline, and the
+Web UI a third, slightly different one. Everything here is plain functions
+and small classes driven by a TrailerSettings object, so the scripts, the
+new-item watcher and the Web UI can all call it in-process:
+
+- TrailerSettings: the trailer-related config.yml keys, parsed and validated
+  once, plus the compiled language patterns and yt-dlp options built from them.
+- TrailerTarget: what to search for and where the trailer goes for one movie
+  or show (queries, title check, trailer folder and file name).
+- download_trailer(): search YouTube, rank and title-check candidates and
+  download the best one, with upgrade handling and the DL_* outcomes.
+- check_item(): the per-item decision (genre skip, existing trailer,
+  upgrade) around download_trailer(), for a Plex movie or show.
+- download_video(): the Web UI's "download this video" path.
+"""
+
+import itertools
+import os
+import re
+import shlex
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import yt_dlp
+
+try:
+    from Modules.search_cache import SearchCache, OUTCOME_NO_MATCH
+except ImportError:
+    from search_cache import SearchCache, OUTCOME_NO_MATCH
+
+try:
+    from Modules.probe_cache import get_probe_cache, probe_dimensions
+except ImportError:
+    from probe_cache import get_probe_cache, probe_dimensions
+
+try:
+    from Modules.plex_batch import get_extras
+except ImportError:
+    from plex_batch import get_extras
+
+try:
+    from Modules.title_match import TitleMatcher, keyword_pattern, sanitize_title, years_in
+except ImportError:
+    from title_match import TitleMatcher, keyword_pattern, sanitize_title, years_in
+
+IS_DOCKER = os.environ.get('IS_DOCKER', 'false').lower() == 'true'
+
+# ANSI color codes
+GREEN = '\033[32m'
+ORANGE = '\033[33m'
+BLUE = '\033[34m'
+RED = '\033[31m'
+RESET = '\033[0m'
+
+
+def print_colored(text, color, end="\n"):
+    colors = {'red': RED, 'green': GREEN, 'blue': BLUE, 'yellow': ORANGE, 'white': RESET}
+    print(f"{colors.get(color, RESET)}{text}{RESET}", end=end)
+
+
+DL_OK = 'downloaded'                  # usable new trailer in place
+DL_KEPT_BELOW_MIN = 'kept_below_min'  # upgrade: better than old but still < min (kept)
+DL_NO_MATCH = 'no_match'              # search completed; no suitable candidate
+DL_ERROR = 'error'                    # yt-dlp exception / all searches empty / OS errors
+
+# Per-item outcomes reported by check_item()
+ITEM_SKIPPED = 'skipped'                        # genre is on the skip list
+ITEM_HAS_TRAILER = 'has_trailer'                # nothing to do
+ITEM_MISSING = 'missing'                        # no trailer and DOWNLOAD_TRAILERS is off
+ITEM_DOWNLOADED = 'downloaded'                  # new trailer meets the minimum
+ITEM_UPGRADED_BELOW_MIN = 'upgraded_below_min'  # upgrade kept, still below the minimum
+ITEM_UPGRADE_NO_MATCH = 'upgrade_no_match'      # no higher-res source found
+ITEM_UPGRADE_ERROR = 'upgrade_error'            # upgrade hit an error; retry next run
+ITEM_FAILED = 'failed'                          # download of a missing trailer failed
+
+NEGATIVE_TITLE_KEYWORDS = [
+    'reaction', 'react', 'review', 'behind the scenes',
+    'making of', 'breakdown', 'explained', 'analysis', 'fan made',
+    'fan-made', 'parody', 'spoof', 'honest trailer', 'honest trailers',
+    'everything wrong', 'pitch meeting', 'recap', 'summary',
+    'cast interview', 'press tour', 'red carpet',
+    'deleted scene', 'bloopers', 'gag reel', 'easter egg',
+    'theory', 'theories', 'predictions', 'ending explained',
+    'watch along', 'commentary', 'video essay', 'ranking',
+    'top 10', 'every trailer', 'all trailers', 'trailer compilation',
+]
+
+PREFERRED_CHANNEL_KEYWORDS = [
+    'official', 'vevo', 'pictures', 'studios', 'entertainment',
+    'warner', 'universal', 'sony', 'disney', 'paramount', 'lionsgate',
+    'a24', 'fox', 'mgm', 'hbo', 'netflix', 'hulu', 'amazon', 'apple tv',
+    'peacock', 'showtime', 'starz', 'amc', 'fx', 'bbc', 'cbs', 'nbc', 'abc',
+]
+
+TRAILER_NOISE_WORDS = {
+    'official', 'new', 'exclusive', 'international', 'final', 'first',
+    'full', 'main', 'original', 'extended', 'teaser', 'trailer',
+    'hd', '4k', 'uhd', 'imax', 'dolby', 'restoration',
+    'tv', 'spot', 'clip', 'promo', 'preview', 'sneak', 'peek',
+}
+
+LANGUAGE_KEYWORDS = {
+    'german': ['deutsch', 'german', 'auf deutsch', 'de'],
+    'french': ['français', 'francais', 'french', 'vf', 'vostfr', 'fr'],
+    'spanish': ['español', 'espanol', 'spanish', 'castellano', 'es'],
+    'italian': ['italiano', 'italian', 'it'],
+    'japanese': ['日本語', 'japanese', 'jp', 'ja'],
+    'korean': ['한국어', 'korean', 'ko'],
+    'portuguese': ['português', 'portugues', 'portuguese', 'pt', 'dublado'],
+    'russian': ['русский', 'russian', 'ru'],
+    'chinese': ['中文', 'chinese', 'zh'],
+    'english': ['english', 'en'],
+}
+
+LANGUAGE_CODES = {
+    'german': 'de', 'french': 'fr', 'spanish': 'es', 'italian': 'it',
+    'japanese': 'ja', 'korean': 'ko', 'portuguese': 'pt', 'russian': 'ru',
+    'chinese': 'zh', 'english': 'en',
+}
+
+# Language code -> label, for trailer file name tags
+LANGUAGE_NAMES = {code: lang.capitalize() for lang, code in LANGUAGE_CODES.items()}
+
+# One compiled keyword alternation per language
+LANGUAGE_PATTERNS = {lang: keyword_pattern(kws) for lang, kws in LANGUAGE_KEYWORDS.items()}
+
+VIDEO_EXTENSIONS = ('.mkv', '.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.m4v')
+
+# Characters dropped from trailer file names (besides ':' which becomes ' -')
+_UNSAFE_FILENAME_RE = re.compile(r'[<>"/\\|?*]')
+_RESOLUTION_TAG_RE = re.compile(r'\.\d{3,4}p[.\-]')
+_WINDOWS_DRIVE_RE = re.compile(r'^([A-Za-z]):')
+
+MOVIE_QUERY_TEMPLATES = (
+    "{title} {year} official trailer",
+    "{title} trailer {year}",
+    "{title} {year} movie trailer",
+)
+SHOW_QUERY_TEMPLATES = (
+    "{title} {year} TV show official trailer",
+    "{title} trailer {year} TV series",
+    "{title} {year} series trailer",
+)
+
+
+def is_likely_trailer(video_title):
+    """Returns False if video title contains non-trailer keywords."""
+    title_lower = video_title.lower()
+    return not any(kw in title_lower for kw in NEGATIVE_TITLE_KEYWORDS)
+
+
+def effective_height(width, height):
+    """Derive an effective height that accounts for cinematic aspect ratios.
+
+    For letterboxed/cinematic trailers (e.g. 1920x1038) the raw height
+    under-reports quality. We compute the height an equivalent 16:9 frame would
+    have for this width and take the larger of the two, so a 1920-wide trailer
+    classifies as 1080 rather than 1038.
+    """
+    width = width or 0
+    height = height or 0
+    return max(height, int(width * 9 / 16))
+
+
+RES_STANDARDS = (240, 360, 480, 576, 720, 1080, 1440, 2160)
+
+
+def classify_resolution(width, height):
+    """Classify resolution by snapping the effective height to the nearest standard."""
+    height = effective_height(width, height)
+    nearest = min(RES_STANDARDS, key=lambda s: abs(s - height))
+    return f"{nearest}p"
+
+
+def normalize_path_for_docker(path, quiet=False):
+    """
+    Normalize paths for Docker compatibility.
+    - Unix paths (starting with /) are returned as-is
+    - Windows paths keep drive letter as first directory to avoid collisions
+    """
+    if not IS_DOCKER or not path:
+        return path
+
+    # If it's already a Unix-style path, return as-is
+    if path.startswith('/'):
+        return path
+
+    # Handle Windows paths: preserve drive letter to avoid collisions
+    drive_match = _WINDOWS_DRIVE_RE.match(path)
+    if drive_match:
+        drive_letter = drive_match.group(1).upper()
+        # Remove drive letter and colon, convert backslashes to forward slashes
+        path_normalized = path[2:].replace('\\', '/')
+        # Prepend drive as first directory
+        result = f'/{drive_letter}{path_normalized}'
+        if not quiet:
+            print(f"Path normalized: {path} -> {result}")
+        return result
+
+    # Fallback: just convert backslashes
+    return path.replace('\\', '/')
+
+
+# ── yt-dlp options ─────────────────────────────────────────────────────────
+
+def get_cookies_path():
+    """Check for cookies.txt in the cookies subfolder"""
+    if IS_DOCKER:
+        cookies_folder = Path('/cookies')
+    else:
+        cookies_folder = Path(__file__).parent.parent / 'cookies'
+
+    cookies_file = cookies_folder / 'cookies.txt'
+
+    if cookies_file.exists() and cookies_file.is_file():
+        return str(cookies_file)
+
+    return None
+
+
+# yt-dlp options that could allow arbitrary code execution, file writes
+# outside media dirs, or credential theft.
+_BLOCKED_YTDLP_OPTS = {
+    'exec', 'exec_before_dl', 'exec_before_download',
+    'output', 'outtmpl', 'paths', 'batch_file',
+    'cookies', 'cookiefile', 'cookies_from_browser', 'cookiesfrombrowser',
+    'download_archive', 'config_locations', 'config_location',
+    'plugin_dirs', 'write_pages', 'print_to_file',
+}
+
+
+def parse_ytdlp_options(options_list):
+    """Parse command-line style yt-dlp options into a dictionary."""
+    parsed_opts = {}
+
+    for option_str in options_list:
+        parts = shlex.split(option_str)
+
+        for i, part in enumerate(parts):
+            if not part.startswith('--'):
+                continue
+
+            key = part[2:].replace('-', '_')
+            if key in _BLOCKED_YTDLP_OPTS:
+                print(f"[Security] Blocked dangerous yt-dlp option: --{part[2:]}")
+                continue
+
+            if i + 1 < len(parts) and not parts[i + 1].startswith('--'):
+                value = parts[i + 1]
+
+                if key == 'extractor_args':
+                    if ':' in value:
+                        service, args_str = value.split(':', 1)
+                        if 'extractor_args' not in parsed_opts:
+                            parsed_opts['extractor_args'] = {}
+                        if service not in parsed_opts['extractor_args']:
+                            parsed_opts['extractor_args'][service] = {}
+
+                        for arg_pair in args_str.split(','):
+                            if '=' in arg_pair:
+                                arg_key, arg_val = arg_pair.split('=', 1)
+                                parsed_opts['extractor_args'][service][arg_key] = [arg_val]
+                else:
+                    if value.lower() in ('true', 'yes'):
+                        parsed_opts[key] = True
+                    elif value.lower() in ('false', 'no'):
+                        parsed_opts[key] = False
+                    elif value.isdigit():
+                        parsed_opts[key] = int(value)
+                    else:
+                        parsed_opts[key] = value
+            else:
+                if key.startswith('no_'):
+                    actual_key = key[3:]
+                    parsed_opts[actual_key] = False
+                else:
+                    parsed_opts[key] = True
+
+    return parsed_opts
+
+
+def merge_ytdlp_options(ydl_opts, custom_opts):
+    """Merge parsed custom options into ydl_opts, custom options taking precedence."""
+    for key, value in custom_opts.items():
+        if key == 'extractor_args' and key in ydl_opts:
+            # Merge extractor_args dictionaries
+            for service, args in value.items():
+                if service in ydl_opts['extractor_args']:
+                    ydl_opts['extractor_args'][service].update(args)
+                else:
+                    ydl_opts['extractor_args'][service] = args
+        else:
+            ydl_opts[key] = value
+    return ydl_opts
+
+
+def _int_setting(config, key, default, minimum):
+    """Integer config value; default when unparsable or below minimum."""
+    try:
+        value = int(config.get(key, default))
+    except (TypeError, ValueError):
+        return default
+    return value if value >= minimum else default
+
+
+def _hours_setting(config, key, default):
+    try:
+        return max(0.0, float(config.get(key, default)))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+class TrailerSettings:
+    """The trailer-related config.yml settings, parsed and validated once.
+
+    Also holds what is derived from them and reused for every item: the
+    compiled language patterns, the yt-dlp format selector and the search cache.
+    """
+
+    def __init__(self, config, search_cache=None):
+        self.download_trailers = config.get('DOWNLOAD_TRAILERS')
+        self.preferred_language = config.get('PREFERRED_LANGUAGE', 'original')
+        self.refresh_metadata = config.get('REFRESH_METADATA')
+        self.show_progress = config.get('SHOW_YT_DLP_PROGRESS', True)
+        self.check_plex_pass = config.get('CHECK_PLEX_PASS_TRAILERS', True)
+        self.use_labels = config.get('USE_LABELS', False)
+        self.custom_options = config.get('YT_DLP_CUSTOM_OPTIONS', []) or []
+        self.resolution_max = int(config.get('TRAILER_RESOLUTION_MAX', 1080))
+        self.resolution_min = int(config.get('TRAILER_RESOLUTION_MIN', 1080))
+        if self.resolution_min > self.resolution_max:
+            self.resolution_min, self.resolution_max = self.resolution_max, self.resolution_min
+        # Upgrade trailers below TRAILER_RESOLUTION_MIN: 'off' / 'local' / 'local_plexpass'
+        self.upgrade_trailers = str(config.get('UPGRADE_TRAILERS', 'off')).lower()
+        if self.upgrade_trailers not in ('off', 'local', 'local_plexpass'):
+            self.upgrade_trailers = 'off'
+        self.plex_timeout = _int_setting(config, 'PLEX_TIMEOUT', 120, 30)
+        self.file_format = config.get('TRAILER_FILE_FORMAT', 'mkv').lower()
+        if self.file_format not in ('mkv', 'mp4'):
+            self.file_format = 'mkv'
+        # Number of items checked at once (1 = one after the other)
+        self.max_concurrent_items = _int_setting(config, 'MAX_CONCURRENT_ITEMS', 1, 1)
+        # Background download workers (0 = download during the scan, one item at a time)
+        self.download_workers = _int_setting(config, 'DOWNLOAD_WORKERS', 0, 0)
+        # Fire all search queries at once and pick the best of the merged results
+        self.parallel_search = config.get('PARALLEL_SEARCH', False)
+        # How long trailer search results are reused (hours, 0 = don't cache)
+        self.search_cache_ttl_hours = _hours_setting(config, 'SEARCH_CACHE_TTL_HOURS', 168)
+        self.search_cache_no_match_ttl_hours = _hours_setting(config, 'SEARCH_CACHE_NO_MATCH_TTL_HOURS', 72)
+        self.search_cache = search_cache or SearchCache(
+            ttl_hours=self.search_cache_ttl_hours,
+            no_match_ttl_hours=self.search_cache_no_match_ttl_hours)
+        # Download speed cap in bytes/s passed to yt-dlp (None = unlimited); not a
+        # config.yml key, set by callers that share a bandwidth budget
+        self.rate_limit = None
+
+        language = self.preferred_language.lower()
+        self.original_language = language == 'original'
+        # Applied to the file name only when the chosen video matches the language
+        self.lang_code = LANGUAGE_CODES.get(language, '')
+        self.language_suffix = "" if self.original_language else f" {self.preferred_language}"
+        self._preferred_re = LANGUAGE_PATTERNS.get(language) or keyword_pattern([language])
+        # Explicit mentions of another language (long keywords only, short ones are too ambiguous)
+        self._other_re = keyword_pattern([kw for lang, kws in LANGUAGE_KEYWORDS.items()
+                                          if lang != language
+                                          for kw in kws if len(kw) >= 4])
+
+    def matches_language(self, video_title, video_channel=''):
+        """Check if a video's title or channel contains keywords for the preferred language."""
+        if self.original_language:
+            return False
+        return bool(self._preferred_re.search(video_title.lower())
+                    or self._preferred_re.search(video_channel.lower()))
+
+    def mentions_other_language(self, video_title_lower):
+        return bool(self._other_re and self._other_re.search(video_title_lower))
+
+    def format_selector(self, ignore_min=False):
+        """yt-dlp format string within the configured resolution range.
+
+        ignore_min drops the lower bound (and falls back to any format), for
+        manual downloads where the user accepted a lower-quality video.
+        """
+        hi = self.resolution_max
+        if ignore_min:
+            return (f'bestvideo[height<={hi}][ext=mp4]+bestaudio[ext=m4a]/'
+                    f'bestvideo[height<={hi}][ext=webm]+bestaudio[ext=webm]/'
+                    f'bestvideo[height<={hi}]+bestaudio/'
+                    f'best[height<={hi}]/best')
+        lo = self.resolution_min
+        return (f'bestvideo[height<={hi}][height>={lo}][ext=mp4]+bestaudio[ext=m4a]/'
+                f'bestvideo[height<={hi}][height>={lo}][ext=webm]+bestaudio[ext=webm]/'
+                f'bestvideo[height<={hi}][height>={lo}]+bestaudio/'
+                f'best[height<={hi}][height>={lo}]')
+
+    def ydl_opts(self, outtmpl, ignore_min=False, **overrides):
+        """Download options for yt-dlp: format, output, cookies and custom options.
+
+        overrides are applied before YT_DLP_CUSTOM_OPTIONS, which always win.
+        """
+        opts = {
+            'format': self.format_selector(ignore_min),
+            'outtmpl': outtmpl,
+            'noplaylist': True,
+            'merge_output_format': self.file_format,
+            'postprocessor_args': {
+                'merger': ['-movflags', '+faststart'],
+            },
+            'force_generic_extractor': False,
+            'ignoreerrors': True,
+            'quiet': not self.show_progress,
+            'no_warnings': not self.show_progress,
+        }
+        if self.rate_limit:
+            opts['ratelimit'] = self.rate_limit
+        opts.update(overrides)
+        cookies_path = get_cookies_path()
+        if cookies_path:
+            opts['cookiefile'] = cookies_path
+        if self.custom_options:
+            merge_ytdlp_options(opts, parse_ytdlp_options(self.custom_options))
+        return opts
+
+
+# ── Scoring and title matching ────────────────────────────────────────────
+
+def score_video(video, settings):
+    """Score video by likelihood of being an official trailer. Higher = better."""
+    score = 0
+    channel = (video.get('channel', '') or video.get('uploader', '') or '').lower()
+    title = (video.get('title', '') or '').lower()
+
+    if 'official' in title:
+        score += 2
+    if 'trailer' in title:
+        score += 2
+    for kw in PREFERRED_CHANNEL_KEYWORDS:
+        if kw in channel:
+            score += 3
+            break
+    view_count = video.get('view_count', 0) or 0
+    if view_count > 1_000_000:
+        score += 2
+    elif view_count > 100_000:
+        score += 1
+
+    # Search position bonus (YouTube relevance signal)
+    position = video.get('_search_position', 99)
+    if position == 0:
+        score += 3
+    elif position == 1:
+        score += 2
+    elif position <= 3:
+        score += 1
+
+    # Year-mismatch penalty: if the video title names a different year, deprioritize
+    item_year = str(video.get('_item_year', '') or '')
+    if item_year:
+        years_in_title = years_in(title)
+        if years_in_title and item_year not in years_in_title:
+            score -= 3
+
+    # Language bonus/penalty: strongly prefer videos matching the user's preferred language
+    if not settings.original_language:
+        if settings.matches_language(title, channel):
+            score += 25
+        elif settings.mentions_other_language(title):
+            # Penalty if video explicitly mentions a different language
+            score -= 15
+
+    return score
+
+
+def movie_title_verifier(movie_title, movie_year):
+    """Build the title check for a movie's search candidates.
+
+    Year is preferred but not a hard requirement — official trailers on YouTube
+    often omit the year (e.g., 'Outcome — Official Trailer | Apple TV+').
+    When the year is missing, the title must be specific enough and contain 'trailer'.
+    """
+    title_matcher = TitleMatcher(movie_title, TRAILER_NOISE_WORDS)
+    year_str = str(movie_year)
+    # Level 4 below: first 70% of long titles
+    partial_title = title_matcher.title[:int(len(title_matcher.title) * 0.7)] if len(title_matcher.title) > 20 else None
+
+    def verify_title_match(video_title):
+        video_title_lower = video_title.lower()
+        has_year = year_str in video_title_lower
+        sanitized_video = sanitize_title(video_title_lower)
+
+        # --- Levels 1-5: With year present (strongest matches) ---
+        if has_year:
+            # Level 1: Full title + year (standalone match to avoid e.g. "Burden of Dreams" matching "Dreams")
+            if title_matcher.standalone_in(video_title_lower):
+                return True
+
+            # Level 2: Colon-split parts all present + year
+            if title_matcher.colon_parts_in(video_title_lower):
+                return True
+
+            # Level 3: Sanitized comparison + year (standalone match)
+            if title_matcher.sanitized_standalone_in(sanitized_video):
+                return True
+
+            # Level 4: First 70% of long titles + year
+            if partial_title and partial_title in video_title_lower:
+                return True
+
+            # Level 5: Word-overlap >= 80% + year
+            if len(title_matcher.significant_words) >= 2 and title_matcher.word_overlap(sanitized_video) >= 0.8:
+                return True
+
+        # --- Levels 6-7: Without year (relaxed, require 'trailer' + specific title) ---
+        has_trailer_keyword = 'trailer' in video_title_lower
+
+        if has_trailer_keyword and title_matcher.is_specific:
+            # Level 6: Full or sanitized title match + 'trailer' keyword (standalone match)
+            if title_matcher.standalone_in(video_title_lower) or title_matcher.sanitized_standalone_in(sanitized_video):
+                return True
+
+            # Level 7: Colon-split parts all present + 'trailer' keyword
+            if title_matcher.colon_parts_in(video_title_lower):
+                return True
+
+        # --- Level 8: Short title without year, requires standalone match + 'trailer' ---
+        if has_trailer_keyword and not title_matcher.is_specific:
+            if title_matcher.standalone_in(video_title_lower):
+                return True
+            if title_matcher.sanitized_standalone_in(sanitized_video):
+                return True
+
+        return False
+
+    return verify_title_match
+
+
+def show_title_verifier(show_title, show_year):
+    """Build the title check for a TV show's search candidates.
+
+    Uses the year from Plex metadata. Year is preferred but not always
+    required since YouTube trailer titles often omit the year.
+    """
+    # Match against the base title (strip a parenthesized year from the show title)
+    title_matcher = TitleMatcher(re.sub(r'\s*\(\d{4}\)\s*', '', show_title), TRAILER_NOISE_WORDS)
+    year_str = str(show_year) if show_year else None
+
+    def verify_title_match(video_title):
+        video_title_lower = video_title.lower()
+        sanitized_video = sanitize_title(video_title_lower)
+
+        if year_str:
+            has_year = year_str in video_title_lower
+
+            # Level 1: Base title + year both present (standalone match)
+            if title_matcher.standalone_in(video_title_lower) and has_year:
+                return True
+
+            # Level 2: Sanitized base title + year (standalone match)
+            if title_matcher.sanitized_standalone_in(sanitized_video) and has_year:
+                return True
+
+            # Level 3: Colon-split parts + year
+            if title_matcher.colon_parts_in(video_title_lower) and has_year:
+                return True
+
+            # Level 4 (relaxed): Base title present + "trailer" in video title, no year required
+            # Only allow if the title is specific enough to avoid false positives
+            if title_matcher.standalone_in(video_title_lower) and 'trailer' in video_title_lower:
+                if title_matcher.is_specific:
+                    return True
+
+            # Level 5 (relaxed): Sanitized match + "trailer", no year required
+            if title_matcher.sanitized_standalone_in(sanitized_video) and 'trailer' in video_title_lower:
+                if title_matcher.is_specific:
+                    return True
+
+            # Level 6: Short title + trailer keyword + standalone match (no year required)
+            if 'trailer' in video_title_lower:
+                if title_matcher.standalone_in(video_title_lower):
+                    return True
+                if title_matcher.sanitized_standalone_in(sanitized_video):
+                    return True
+
+            return False
+
+        # No year available — more lenient matching (standalone)
+        if title_matcher.standalone_in(video_title_lower):
+            return True
+        if title_matcher.sanitized_standalone_in(sanitized_video):
+            return True
+        if title_matcher.colon_parts_in(video_title_lower):
+            return True
+
+        return False
+
+    return verify_title_match
+
+
+def safe_file_title(title):
+    """Item title as used in trailer file names (colons become ' -')."""
+    return _UNSAFE_FILENAME_RE.sub('', title.replace(":", " -"))
+
+
+class TrailerTarget:
+    """One movie or show to find a trailer for: search queries, title check and destination."""
+
+    def __init__(self, title, year, media_type, media_folder, file_prefix, query_templates, verify_title):
+        self.title = title
+        self.year = year
+        self.media_type = media_type          # 'movie' or 'show' (trailer tracker media type)
+        self.media_folder = media_folder
+        self.trailers_folder = os.path.join(media_folder, "Trailers")
+        self.file_prefix = file_prefix        # trailer file name before '-trailer'
+        self.query_templates = query_templates
+        self.verify_title = verify_title
+        self.label = f"{title} ({year})" if media_type == 'movie' and year else title
+
+    @classmethod
+    def for_movie(cls, title, year, movie_path):
+        """Target for a movie; movie_path is the (Docker-normalized) path of its media file."""
+        prefix = f"{safe_file_title(title)} ({year})" if year else safe_file_title(title)
+        return cls(title, year, 'movie', os.path.dirname(movie_path), prefix,
+                   MOVIE_QUERY_TEMPLATES, movie_title_verifier(title, year))
+
+    @classmethod
+    def for_show(cls, title, year, show_directory):
+        """Target for a TV show; the trailer goes in the show folder (no year in the name)."""
+        return cls(title, year, 'show', show_directory.rstrip('/').rstrip('\\'), safe_file_title(title),
+                   SHOW_QUERY_TEMPLATES, show_title_verifier(title, year))
+
+    def search_queries(self, settings):
+        return [f"ytsearch15:{template.format(title=self.title, year=self.year)}{settings.language_suffix}"
+                for template in self.query_templates]
+
+    def trailer_files(self):
+        """Paths of this item's '<prefix>...-trailer.<ext>' files in its Trailers folder."""
+        found = []
+        try:
+            for f in os.listdir(self.trailers_folder):
+                name, ext = os.path.splitext(f)
+                if ext.lower() in VIDEO_EXTENSIONS and name.endswith('-trailer') and name.startswith(self.file_prefix):
+                    found.append(os.path.join(self.trailers_folder, f))
+        except OSError:
+            pass
+        return found
+
+
+# ── Local trailer files ───────────────────────────────────────────────────
+
+def find_local_trailer_files(media_folder):
+    """Return a list of on-disk trailer video files for a movie or show folder.
+
+    Checks the folder itself ('*-trailer' files) and a 'Trailers' subfolder
+    (any video file). Used to read the existing resolution and to remove old
+    files when upgrading.
+    """
+    found = []
+    for d in (media_folder, os.path.join(media_folder, "Trailers")):
+        if not os.path.isdir(d):
+            continue
+        try:
+            entries = os.listdir(d)
+        except OSError:
+            continue
+        in_trailers_folder = os.path.basename(d).lower() == "trailers"
+        for f in entries:
+            name_without_ext, ext = os.path.splitext(f.lower())
+            if ext in VIDEO_EXTENSIONS and (in_trailers_folder or name_without_ext.endswith("-trailer")):
+                found.append(os.path.join(d, f))
+    return found
+
+
+def has_local_trailer(media_folder):
+    """
+    Check the local filesystem for an existing trailer file.
+    Conditions:
+      1) A file in the folder ending with "-trailer" before its extension.
+      2) A subfolder named "Trailers" containing at least one video file.
+    """
+    # If the folder doesn't exist or is inaccessible, return False
+    if not os.path.isdir(media_folder):
+        print(f"Warning: Cannot access directory: {media_folder}")
+        return False
+    try:
+        os.listdir(media_folder)
+    except OSError as e:
+        print(f"Warning: Error listing directory '{media_folder}': {e}")
+        return False
+    return bool(find_local_trailer_files(media_folder))
+
+
+def local_trailers_best_res(media_folder):
+    """Best effective height across local trailer files (0 if none/unknown)."""
+    best = 0
+    for p in find_local_trailer_files(media_folder):
+        dims = probe_dimensions(p)
+        if dims:
+            best = max(best, effective_height(dims[0], dims[1]))
+    return best
+
+
+def existing_trailer_info_from_extras(trailers):
+    """(source, best effective height) of Plex trailer extras; source is 'local' or 'plexpass'."""
+    local_best = 0
+    plexpass_best = 0
+    for extra in trailers:
+        is_local = False
+        extra_best = 0
+        for media in (getattr(extra, 'media', None) or []):
+            for part in (getattr(media, 'parts', None) or []):
+                if getattr(part, 'file', None):
+                    is_local = True
+            extra_best = max(extra_best, effective_height(
+                getattr(media, 'width', 0), getattr(media, 'height', 0)))
+        if is_local:
+            local_best = max(local_best, extra_best)
+        else:
+            plexpass_best = max(plexpass_best, extra_best)
+    if local_best:
+        return 'local', local_best
+    return 'plexpass', plexpass_best
+
+
+def rename_with_resolution(filepath):
+    """Probe a downloaded trailer's resolution and rename the file to include it."""
+    dims = probe_dimensions(filepath) if filepath else None
+    if not dims:
+        return filepath
+    res_label = classify_resolution(*dims)
+
+    directory = os.path.dirname(filepath)
+    name, ext = os.path.splitext(os.path.basename(filepath))
+    if not name.endswith('-trailer'):
+        return filepath
+
+    # Skip if resolution is already in the filename
+    if _RESOLUTION_TAG_RE.search(name):
+        return filepath
+
+    prefix = name[:-len('-trailer')]
+
+    # Insert resolution before language code (if present) and -trailer
+    parts = prefix.rsplit('.', 1)
+    if len(parts) == 2 and parts[1] in LANGUAGE_NAMES:
+        new_name = f"{parts[0]}.{res_label}.{parts[1]}-trailer{ext}"
+    else:
+        new_name = f"{prefix}.{res_label}-trailer{ext}"
+
+    new_path = os.path.join(directory, new_name)
+    try:
+        os.rename(filepath, new_path)
+        get_probe_cache().renamed(filepath, new_path)
+        print(f"Renamed trailer: {os.path.basename(filepath)} -> {new_name}")
+        return new_path
+    except OSError as e:
+        print(f"Failed to rename trailer: {e}")
+        return filepath
+
+
+def rename_with_lang_tag(filepath, lang_code):
+    """Rename a downloaded trailer to include the language tag."""
+    directory = os.path.dirname(filepath)
+    name, ext = os.path.splitext(os.path.basename(filepath))
+    if not name.endswith('-trailer'):
+        return filepath
+    prefix = name[:-len('-trailer')]
+    # Check if already has a language code
+    parts = prefix.rsplit('.', 1)
+    if len(parts) == 2 and parts[1] in LANGUAGE_NAMES:
+        return filepath  # Already has a lang tag
+    # Insert lang code before -trailer (after resolution label if present)
+    new_name = f"{prefix}.{lang_code}-trailer{ext}"
+    new_path = os.path.join(directory, new_name)
+    try:
+        os.rename(filepath, new_path)
+        get_probe_cache().renamed(filepath, new_path)
+        print(f"Added language tag: {os.path.basename(filepath)} -> {os.path.basename(new_path)}")
+        return new_path
+    except OSError as e:
+        print(f"Failed to add language tag: {e}")
+        return filepath
+
+
+def add_mtdfp_label(item, context=""):
+    """
+    Add MTDfP label to a movie or show if it doesn't already have it.
+    Only called when USE_LABELS is True.
+
+    Args:
+        item: The movie or show object to add the label to
+        context: Optional context string for logging (e.g., "already has trailer")
+    """
+    kind = "Movie" if getattr(item, 'type', None) == 'movie' else "TV show"
+    try:
+        # First unlock the labels field
+        item.edit(**{'label.locked': 0})
+
+        # Check if MTDfP label already exists
+        existing_labels = [label.tag for label in (item.labels or [])]
+        if 'MTDfP' not in existing_labels:
+            # Use addLabel method which works
+            item.addLabel('MTDfP')
+            context_text = f" ({context})" if context else ""
+            print_colored(f"Added MTDfP label to '{item.title}'{context_text}", 'green')
+        else:
+            print_colored(f"{kind} '{item.title}' already has MTDfP label", 'blue')
+    except Exception as e:
+        print_colored(f"Failed to add MTDfP label to '{item.title}': {e}", 'red')
+
+
+# ── Search ────────────────────────────────────────────────────────────────
+
+def search_opts(ydl_opts):
+    """yt-dlp options for the flat search phase.
+
+    Only titles, channels, durations and view counts are needed to pick a
+    candidate, so the search never resolves formats; full extraction happens
+    once, for the chosen video, in the download phase.
+    """
+    opts = {
+        'extract_flat': True,
+        'skip_download': True,
+        'ignoreerrors': True,
+        'quiet': ydl_opts.get('quiet', True),
+        'no_warnings': ydl_opts.get('no_warnings', True),
+    }
+    # Network/auth settings still apply to the search request
+    for key in ('cookiefile', 'proxy', 'source_address', 'extractor_args', 'http_headers'):
+        if key in ydl_opts:
+            opts[key] = ydl_opts[key]
+    return opts
+
+
+def search_candidates(ydl, query, search_cache):
+    """Flat search results for a query, served from the search cache when fresh.
+
+    Returns (entries, cached_outcome). entries is None when yt-dlp returned
+    nothing; cached_outcome is OUTCOME_NO_MATCH when the query had no usable
+    candidate within the no-match TTL and should be skipped.
+    """
+    cached = search_cache.get(query)
+    if cached is not None:
+        outcome, entries = cached
+        return entries, outcome
+    info = ydl.extract_info(query, download=False)
+    if not info or 'entries' not in info:
+        return None, None
+    entries = list(filter(None, info['entries']))
+    search_cache.put(query, entries)
+    return entries, None
+
+
+def run_search_queries(search_queries, ydl_opts, is_confident, search_cache, cancel=None):
+    """Run all search queries at once and merge their candidates by video id.
+
+    Returns (entries, searched_queries, returned_results): the de-duplicated
+    entries, each tagged with the best '_search_position' it reached in any
+    query; the queries whose candidates were evaluated (for no-match caching);
+    and whether any search returned results at all. Queries cached as having no
+    usable match are skipped. Once is_confident() accepts the first query's
+    entries, or cancel (an optional threading.Event) is set, searches that have
+    not started yet are skipped and running ones are abandoned instead of awaited.
+
+    yt-dlp has no way to interrupt a search request, so an abandoned search
+    still runs to completion in the background: it holds its worker thread and
+    bandwidth until then, and its results are still stored in search_cache.
+    """
+    # Search threads have no per-item output buffer, so keep yt-dlp quiet there
+    # and report errors from the calling thread.
+    opts = dict(search_opts(ydl_opts), quiet=True, no_warnings=True)
+    stop = threading.Event()
+
+    def _winner(idx, result):
+        entries, outcome, _ = result
+        return idx == 0 and entries and outcome != OUTCOME_NO_MATCH and is_confident(entries)
+
+    def _one(query):
+        if stop.is_set() or _cancelled(cancel):
+            return None, None, None
+        try:
+            with yt_dlp.YoutubeDL(opts) as search_ydl:
+                return search_candidates(search_ydl, query, search_cache) + (None,)
+        except Exception as e:
+            return None, None, e
+
+    # Cached queries are answered here; a cached winner means no search at all
+    results = {}
+    for idx, query in enumerate(search_queries):
+        cached = search_cache.get(query)
+        if cached is not None:
+            outcome, entries = cached
+            results[idx] = (entries, outcome, None)
+    to_search = [idx for idx in range(len(search_queries)) if idx not in results]
+    if 0 in results and _winner(0, results[0]):
+        to_search = []
+
+    if to_search:
+        executor = ThreadPoolExecutor(max_workers=len(to_search), thread_name_prefix="search")
+        futures = {executor.submit(_one, search_queries[idx]): idx for idx in to_search}
+        pending = set(futures)
+        try:
+            while pending and not _cancelled(cancel):
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = futures[future]
+                    results[idx] = future.result()
+                    if _winner(idx, results[idx]):
+                        pending = ()
+                        break
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    merged = {}
+    searched_queries = []
+    returned_results = False
+    for idx in sorted(results):
+        entries, outcome, error = results[idx]
+        if error is not None:
+            print(f"Search failed for '{search_queries[idx]}': {error}")
+            continue
+        if outcome == OUTCOME_NO_MATCH:
+            returned_results = True
+            continue
+        if entries is None:
+            continue
+        returned_results = True
+        searched_queries.append(search_queries[idx])
+        for position, video in enumerate(entries):
+            video_id = video.get('id') or video.get('url')
+            if not video_id:
+                continue
+            if video_id in merged:
+                merged[video_id]['_search_position'] = min(merged[video_id]['_search_position'], position)
+            else:
+                merged[video_id] = dict(video, _search_position=position)
+    return list(merged.values()), searched_queries, returned_results
+
+
+# ── Download pipeline ─────────────────────────────────────────────────────
+
+def _cancelled(cancel):
+    return cancel is not None and cancel.is_set()
+
+
+def _format_unavailable(message):
+    """True when a yt-dlp error means no format within the resolution range exists."""
+    message = message.lower()
+    return 'format is not available' in message or 'no video formats found' in message
+
+
+def _cancel_hook(cancel):
+    """yt-dlp progress hook that aborts the running download once cancel is set."""
+    def hook(_status):
+        if cancel.is_set():
+            raise yt_dlp.utils.DownloadCancelled('Trailer download cancelled')
+    return hook
+
+
+def download_trailer(settings, target, trailer_tracker=None, plex_rating_key=None,
+                     is_upgrade=False, existing_local_paths=None, existing_res=0, defer=False,
+                     cancel=None):
+    """Search for and download a trailer for target; returns one of the DL_* outcomes.
+
+    With defer=True only the search runs here: if it picked candidates, a
+    zero-argument callable is returned instead, which performs the download and
+    post-processing and returns the outcome (see DownloadQueue).
+
+    cancel is an optional threading.Event; once set, no further search or
+    download starts, a running download is aborted and DL_ERROR is returned.
+    """
+    show_progress = settings.show_progress
+    search_cache = settings.search_cache
+    search_queries = target.search_queries(settings)
+    verify_title_match = target.verify_title
+    label = target.label
+
+    # Make sure the Trailers folder exists
+    os.makedirs(target.trailers_folder, exist_ok=True)
+
+    final_trailer_filename = os.path.join(
+        target.trailers_folder, f"{target.file_prefix}-trailer.{settings.file_format}")
+
+    def _find_downloaded_trailer():
+        """Check if any trailer file exists (any video extension) and return its path."""
+        if os.path.exists(final_trailer_filename):
+            return final_trailer_filename
+        found = target.trailer_files()
+        return found[0] if found else None
+
+    def _snapshot_existing_trailers():
+        """Map abspath -> (mtime, size) for trailer files present before we search.
+
+        A failed yt-dlp download would otherwise let _find_downloaded_trailer()
+        match the OLD trailer sitting at the canonical name and report it as a
+        fresh download.
+        """
+        snap = {}
+        for p in list(existing_local_paths or []) + target.trailer_files():
+            try:
+                st = os.stat(p)
+                snap[os.path.abspath(p)] = (st.st_mtime, st.st_size)
+            except OSError:
+                pass
+        return snap
+
+    preexisting_trailers = _snapshot_existing_trailers() if is_upgrade else {}
+
+    def _track_downloaded_trailer(video_title_for_lang=None, video_channel_for_lang=None):
+        trailer_path = _find_downloaded_trailer()
+        if not trailer_path:
+            return None
+        result = DL_OK
+        if is_upgrade:
+            # The found file must be genuinely new: a failed download re-finds the
+            # old trailer at the canonical name and must not count as a success.
+            abs_path = os.path.abspath(trailer_path)
+            try:
+                st = os.stat(abs_path)
+            except OSError:
+                return None
+            if preexisting_trailers.get(abs_path) == (st.st_mtime, st.st_size):
+                print_colored("Download did not produce a new trailer file; keeping existing", 'yellow')
+                return None
+            # A new file must actually beat the old resolution (only enforced when
+            # both resolutions are known, so a probe hiccup can't discard a good file).
+            dims = probe_dimensions(trailer_path)
+            new_res = effective_height(dims[0], dims[1]) if dims else 0
+            if existing_res and new_res and new_res <= existing_res:
+                print_colored(
+                    f"Downloaded trailer is {new_res}p - not better than the existing "
+                    f"{existing_res}p; removing it", 'yellow')
+                try:
+                    os.remove(trailer_path)
+                except OSError as e:
+                    print(f"Failed to remove rejected trailer '{trailer_path}': {e}")
+                return None
+            if new_res and new_res < settings.resolution_min:
+                result = DL_KEPT_BELOW_MIN
+        trailer_path = rename_with_resolution(trailer_path)
+        # Apply language tag only if the video actually matches the preferred language
+        if settings.lang_code and video_title_for_lang and settings.matches_language(
+                video_title_for_lang, video_channel_for_lang or ''):
+            trailer_path = rename_with_lang_tag(trailer_path, settings.lang_code)
+        # On an upgrade, remove the old lower-res trailer file(s) now that the
+        # higher-res replacement is in place.
+        if is_upgrade and existing_local_paths:
+            new_abs = os.path.abspath(trailer_path)
+            for old in existing_local_paths:
+                try:
+                    if os.path.abspath(old) != new_abs and os.path.exists(old):
+                        os.remove(old)
+                        print(f"Removed old lower-res trailer: {os.path.basename(old)}")
+                except OSError as e:
+                    print(f"Failed to remove old trailer '{old}': {e}")
+        if trailer_tracker:
+            trailer_tracker.add_trailer(
+                file_path=trailer_path,
+                title=target.title,
+                year=str(target.year) if target.year else "",
+                media_type=target.media_type,
+                plex_rating_key=str(plex_rating_key) if plex_rating_key else "",
+                poster_url=f"/api/plex/poster/{plex_rating_key}" if plex_rating_key else "",
+            )
+        return result
+
+    # If a trailer file already exists, no need to download again (unless upgrading)
+    if not is_upgrade and _find_downloaded_trailer():
+        return DL_OK
+
+    ydl_opts = settings.ydl_opts(os.path.join(target.trailers_folder, f"{target.file_prefix}-trailer.%(ext)s"))
+    if cancel is not None:
+        ydl_opts['progress_hooks'] = list(ydl_opts.get('progress_hooks') or []) + [_cancel_hook(cancel)]
+    if 'cookiefile' in ydl_opts:
+        print(f"Using cookies file: {ydl_opts['cookiefile']}")
+
+    if not show_progress:
+        # Quiet version with minimal output
+        print(f"Searching trailer for {label}...")
+        ydl_opts['quiet'] = True
+        ydl_opts['no_warnings'] = True
+
+    # Shared between the search and download phases (which may run on
+    # different threads when a download queue is used)
+    search_state = {'returned_results': False, 'error': None, 'download_failed': False}
+
+    def _score(video):
+        return score_video(video, settings)
+
+    def _is_usable(video):
+        """Duration and content filter applied before scoring."""
+        duration = video.get('duration', 0)
+        video_title = video.get('title', '')
+        if show_progress:
+            print(f"Found video: {video_title} (Duration: {duration} seconds)")
+        if not duration or duration > 300:
+            if show_progress:
+                print(f"Skipping video - duration {duration} seconds exceeds 5-minute limit")
+            return False
+        if not is_likely_trailer(video_title):
+            if show_progress:
+                print(f"Skipping video - appears to be reaction/review/non-trailer content")
+            return False
+        return True
+
+    def _rank_candidates(entries):
+        """Filter, score and title-match search entries; best candidate first."""
+        valid_entries = []
+        for idx, video in enumerate(entries):
+            if not _is_usable(video):
+                continue
+            video.setdefault('_search_position', idx)
+            video['_item_year'] = target.year
+            valid_entries.append(video)
+
+        # Sort by score (best candidates first)
+        valid_entries.sort(key=_score, reverse=True)
+
+        candidates = []
+        for video in valid_entries:
+            if not verify_title_match(video.get('title', '')):
+                if show_progress:
+                    print(f"Skipping video - title doesn't match {target.media_type} title (score: {_score(video)})")
+                continue
+            candidates.append(video)
+        return candidates
+
+    def _confident(entries):
+        """True when the first query's best candidate is an official-channel title match."""
+        valid = [dict(video, _search_position=position, _item_year=target.year)
+                 for position, video in enumerate(entries)
+                 if video.get('duration') and video['duration'] <= 300
+                 and is_likely_trailer(video.get('title', ''))]
+        if not valid:
+            return False
+        best = max(valid, key=_score)
+        channel = (best.get('channel', '') or best.get('uploader', '') or '').lower()
+        return ('official' in (best.get('title', '') or '').lower()
+                and any(kw in channel for kw in PREFERRED_CHANNEL_KEYWORDS)
+                and verify_title_match(best.get('title', '')))
+
+    def _search_rounds():
+        """Search phase: yield (queries, candidates) for each round that found candidates.
+
+        Sequential mode searches one query per round, and a later query is only
+        searched if every candidate of the previous round failed to download.
+        Parallel mode is a single round over the merged results. Rounds without
+        usable candidates are recorded in the search cache and not yielded.
+        """
+        if settings.parallel_search:
+            # All queries at once, candidates merged and scored as one pool
+            if _cancelled(cancel):
+                return
+            search_state['error'] = None
+            entries, searched_queries, returned_results = run_search_queries(
+                search_queries, ydl_opts, _confident, search_cache, cancel)
+            search_state['returned_results'] = returned_results
+            candidates = _rank_candidates(entries)
+            if candidates:
+                yield searched_queries, candidates
+            else:
+                for query in searched_queries:
+                    search_cache.mark_no_match(query)
+            return
+
+        with yt_dlp.YoutubeDL(search_opts(ydl_opts)) as search_ydl:
+            for query_idx, current_query in enumerate(search_queries):
+                if _cancelled(cancel):
+                    return
+                if query_idx and show_progress:
+                    print("No match found, trying alternative search query...")
+                if show_progress:
+                    print(f"Searching for trailer: {current_query}")
+                search_state['error'] = None
+                try:
+                    entries, cached_outcome = search_candidates(search_ydl, current_query, search_cache)
+                except Exception as e:
+                    print(f"Unexpected error downloading trailer for '{label}': {str(e)}")
+                    search_state['error'] = e
+                    continue
+                if cached_outcome == OUTCOME_NO_MATCH:
+                    search_state['returned_results'] = True
+                    if show_progress:
+                        print("Skipping search - no usable result for this query last time (cached)")
+                    continue
+                if entries is None:
+                    continue
+                search_state['returned_results'] = True
+                candidates = _rank_candidates(entries)
+                if candidates:
+                    yield [current_query], candidates
+                else:
+                    search_cache.mark_no_match(current_query)
+
+    def _download_candidates(candidates):
+        """Try candidates best-first. Returns (outcome or None, download_failed)."""
+        download_failed = False
+        # Raise instead of ignoring errors, so a failure can be told apart
+        # from a video that has no format within the resolution range.
+        with yt_dlp.YoutubeDL(dict(ydl_opts, ignoreerrors=False)) as ydl:
+            for video in candidates:
+                if _cancelled(cancel):
+                    break
+                video_title = video.get('title', '')
+                video_channel = video.get('channel', '') or video.get('uploader', '') or ''
+                if show_progress:
+                    print(f"Selected trailer: {video_title} (score: {_score(video)})")
+                try:
+                    retcode = ydl.download([video['url']])
+                except yt_dlp.utils.DownloadError as e:
+                    if "has already been downloaded" in str(e):
+                        tracked = _track_downloaded_trailer(video_title, video_channel)
+                        if tracked:
+                            print_colored("Trailer already exists", 'green')
+                            return tracked, download_failed
+                    elif not _format_unavailable(str(e)):
+                        # No format within the resolution range only rules this
+                        # candidate out; anything else is a real failure.
+                        download_failed = True
+                    if show_progress:
+                        print(f"Failed to download video: {str(e)}")
+                    continue
+
+                tracked = _track_downloaded_trailer(video_title, video_channel)
+                if tracked:
+                    if show_progress:
+                        print(f"Trailer successfully downloaded for '{label}'")
+                    else:
+                        print_colored("Trailer download successful", 'green')
+                    return tracked, download_failed
+                if retcode:
+                    download_failed = True
+                    if show_progress:
+                        print(f"Failed to download video: {video_title}")
+        return None, download_failed
+
+    def _download_rounds(rounds):
+        """Download phase: work through the search rounds until a trailer sticks.
+
+        Queries are only recorded as no-match in the search phase, when none of
+        their results passed the filters; a round whose candidates were tried
+        and failed stays searchable.
+        """
+        for queries, candidates in rounds:
+            if _cancelled(cancel):
+                break
+            try:
+                tracked, download_failed = _download_candidates(candidates)
+            except Exception as e:
+                tracked = _track_downloaded_trailer()
+                if tracked:
+                    print(f"Trailer exists despite error: {str(e)}")
+                    return tracked
+                if _cancelled(cancel):
+                    break
+                print(f"Unexpected error downloading trailer for '{label}': {str(e)}")
+                search_state['error'] = e
+                continue
+            if tracked:
+                return tracked
+            if download_failed:
+                # Network/HTTP/format trouble, not a verdict on availability:
+                # report an error so the item is retried
+                search_state['download_failed'] = True
+
+        if _cancelled(cancel):
+            print_colored(f"Trailer search for '{label}' cancelled", 'yellow')
+            return DL_ERROR
+        if search_state['error'] is not None or search_state['download_failed']:
+            if not show_progress:
+                print_colored("Trailer download failed. Turn on SHOW_YT_DLP_PROGRESS for more info", 'red')
+            return DL_ERROR
+        if search_state['returned_results']:
+            if show_progress:
+                print("No suitable videos found matching criteria")
+            return DL_NO_MATCH
+        if show_progress:
+            print_colored(
+                f"Trailer search returned no results for '{label}' "
+                f"(network/YouTube error?)", 'yellow')
+        else:
+            print_colored("Trailer search returned no results (network/YouTube error?). "
+                          "Turn on SHOW_YT_DLP_PROGRESS for more info", 'red')
+        return DL_ERROR
+
+    rounds = _search_rounds()
+    if not defer:
+        return _download_rounds(rounds)
+
+    # Download queue: search now, hand the chosen candidates to a download worker
+    first_round = next(rounds, None)
+    if first_round is None:
+        return _download_rounds(iter(()))
+    return lambda: _download_rounds(itertools.chain([first_round], rounds))
+
+
+def item_target(item):
+    """TrailerTarget for a Plex movie or show (locations must be loaded)."""
+    path = normalize_path_for_docker(item.locations[0])
+    if item.type == 'movie':
+        return TrailerTarget.for_movie(item.title, item.year, path)
+    return TrailerTarget.for_show(item.title, item.year, path)
+
+
+def _guarded_download(target, download):
+    """Run download(), turning permission/OS errors into DL_ERROR.
+
+    Returns (outcome, permission_error).
+    """
+    try:
+        return download(), False
+    except PermissionError as e:
+        print(f"Permission denied for '{target.label}': {e}")
+    except OSError as e:
+        print(f"OS error for '{target.label}': {e}")
+    return DL_ERROR, True
+
+
+def settle_download(settings, item, outcome, needs_upgrade, permission_error, trailer_tracker):
+    """Turn a download_trailer() outcome into a check_item() result (labels, upgrade bookkeeping)."""
+    if outcome == DL_OK:
+        # Trailer now meets the minimum -> label it (only if USE_LABELS is True)
+        if settings.use_labels:
+            add_mtdfp_label(item)
+        return ITEM_DOWNLOADED, permission_error
+    if not needs_upgrade:
+        return ITEM_FAILED, permission_error
+    minimum = settings.resolution_min
+    if outcome == DL_KEPT_BELOW_MIN:
+        # Better than before but still below the minimum
+        trailer_tracker.mark_upgrade_attempt(item.ratingKey, minimum)
+        print_colored(
+            f"Upgraded trailer for '{item.title}' is better but still below "
+            f"{minimum}p; keeping it (no retry until the minimum is raised)", 'yellow')
+        return ITEM_UPGRADED_BELOW_MIN, permission_error
+    if outcome == DL_NO_MATCH:
+        # No higher-res source found; record the attempt so we don't retry
+        # every run. Re-armed automatically if TRAILER_RESOLUTION_MIN is raised.
+        trailer_tracker.mark_upgrade_attempt(item.ratingKey, minimum)
+        print_colored(
+            f"No higher-res trailer found for '{item.title}'; keeping existing", 'yellow')
+        return ITEM_UPGRADE_NO_MATCH, permission_error
+    # DL_ERROR: infrastructure problem, not a verdict on availability.
+    # Don't record an attempt - retry on the next run.
+    print_colored(
+        f"Upgrade attempt for '{item.title}' hit an error; keeping existing "
+        f"trailer (will retry next run)", 'yellow')
+    return ITEM_UPGRADE_ERROR, permission_error
+
+
+def check_item(settings, item, genres_to_skip, trailer_tracker, defer=False, cancel=None):
+    """Check one movie or show and download/upgrade its trailer if needed.
+
+    item must have its full metadata loaded (genres, locations, extras).
+    Safe to run on a worker thread: the only shared state touched is the
+    trailer tracker (which locks internally) and Plex itself. Returns
+    (status, permission_error). With defer=True, when the search found
+    candidates the download is not run; a zero-argument callable that runs it
+    and returns (status, permission_error) is returned instead.
+    """
+    # If it has any skip-genres, skip it
+    item_genres = [genre.tag.lower() for genre in (item.genres or [])]
+    if any(skip_genre.lower() in item_genres for skip_genre in genres_to_skip):
+        print(f"Skipping '{item.title}' (Genres match skip list: {', '.join(item_genres)})")
+        return ITEM_SKIPPED, False
+
+    target = item_target(item)
+    media_folder = target.media_folder
+    minimum = settings.resolution_min
+
+    # Determine whether a trailer exists, and (for upgrades) its source/resolution
+    trailer_source = None      # 'local' or 'plexpass'
+    trailer_best_res = 0       # best effective height of the existing trailer
+    if settings.check_plex_pass:
+        # Check Plex extras for a 'trailer' subtype
+        trailers = [
+            extra
+            for extra in get_extras(item)
+            if extra.type == 'clip' and extra.subtype == 'trailer'
+        ]
+        already_has_trailer = bool(trailers)
+        if already_has_trailer:
+            trailer_source, trailer_best_res = existing_trailer_info_from_extras(trailers)
+            # Fall back to probing the files if Plex reported no usable media info for a local trailer
+            if trailer_source == 'local' and trailer_best_res == 0:
+                trailer_best_res = local_trailers_best_res(media_folder)
+    else:
+        # Check only the local filesystem for a trailer
+        already_has_trailer = has_local_trailer(media_folder)
+        if already_has_trailer:
+            trailer_source = 'local'
+            trailer_best_res = local_trailers_best_res(media_folder)
+
+    in_scope_below_min = False
+    if already_has_trailer and settings.upgrade_trailers != 'off':
+        scope_ok = (trailer_source == 'local') or \
+            (trailer_source == 'plexpass' and settings.upgrade_trailers == 'local_plexpass')
+        if scope_ok and trailer_best_res < minimum:
+            in_scope_below_min = True
+
+    prior_attempt = trailer_tracker.get_upgrade_attempt(item.ratingKey) if in_scope_below_min else None
+    already_attempted = bool(prior_attempt) and int(prior_attempt.get("attempted_min", 0)) >= minimum
+    needs_upgrade = in_scope_below_min and settings.download_trailers and not already_attempted
+    existing_local_paths = find_local_trailer_files(media_folder) if (needs_upgrade and trailer_source == 'local') else None
+
+    if already_has_trailer and not needs_upgrade:
+        if in_scope_below_min and already_attempted:
+            attempted_date = (prior_attempt.get("attempted_at") or "")[:10] or "unknown date"
+            print_colored(
+                f"Skipping upgrade for '{item.title}' ({trailer_best_res or '?'}p < "
+                f"{minimum}p): no higher-res trailer found on previous "
+                f"attempt ({attempted_date})", 'yellow')
+        elif in_scope_below_min and not settings.download_trailers:
+            print_colored(
+                f"Trailer for '{item.title}' is below the {minimum}p minimum "
+                f"({trailer_best_res or '?'}p) but DOWNLOAD_TRAILERS is off", 'yellow')
+        if settings.use_labels and not in_scope_below_min:
+            add_mtdfp_label(item, "already has trailer")
+        return ITEM_HAS_TRAILER, False
+
+    # No trailer found, or an existing one is being upgraded
+    if not settings.download_trailers:
+        return ITEM_MISSING, False
+
+    if needs_upgrade:
+        print_colored(
+            f"Upgrading {trailer_source} trailer for '{item.title}' "
+            f"({trailer_best_res or '?'}p < {minimum}p minimum)", 'blue')
+    outcome, permission_error = _guarded_download(target, lambda: download_trailer(
+        settings, target,
+        trailer_tracker=trailer_tracker, plex_rating_key=item.ratingKey,
+        is_upgrade=needs_upgrade, existing_local_paths=existing_local_paths,
+        existing_res=trailer_best_res if needs_upgrade else 0,
+        defer=defer, cancel=cancel))
+    if callable(outcome):
+        # Search is done; the caller runs the download (e.g. on a download queue)
+        job = outcome
+
+        def run_download():
+            outcome, permission_error = _guarded_download(target, job)
+            return settle_download(settings, item, outcome, needs_upgrade, permission_error, trailer_tracker)
+        return run_download
+    return settle_download(settings, item, outcome, needs_upgrade, permission_error, trailer_tracker)
+
+
+def remove_trailer_variants(target):
+    """Remove the item's existing trailers in any resolution/language variant.
+
+    Matches '<prefix>[.<res>][.<lang>]-trailer.<ext>' in the Trailers folder,
+    so switching language or quality doesn't leave the old trailer behind.
+    """
+    for path in target.trailer_files():
+        stem = os.path.splitext(os.path.basename(path))[0][:-len('-trailer')]
+        suffix = stem[len(target.file_prefix):]
+        # suffix is e.g. "", ".de", ".720p", ".720p.de"
+        if not suffix or all(
+            p in LANGUAGE_NAMES or (p.endswith('p') and p[:-1].isdigit())
+            for p in suffix.lstrip('.').split('.') if p
+        ):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def download_video(settings, target, video_url, ignore_quality_min=False):
+    """Download one chosen video as target's trailer, replacing any existing one.
+
+    Returns (True, trailer_path) or (False, message); the message is
+    'QUALITY_TOO_HIGH' when no format within the configured minimum exists.
+    """
+    remove_trailer_variants(target)
+    output_path = os.path.join(target.trailers_folder, f"{target.file_prefix}-trailer")
+    ydl_opts = settings.ydl_opts(output_path + '.%(ext)s', ignore_min=ignore_quality_min,
+                                 ignoreerrors=False, quiet=True, no_warnings=True)
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            # Extract video info first to check language match later
+            video_info = ydl.extract_info(video_url, download=False)
+            video_title = (video_info.get('title', '') or '') if video_info else ''
+            video_channel = (video_info.get('channel', '') or video_info.get('uploader', '') or '') if video_info else ''
+
+            ydl.download([video_url])
+
+        # Find the downloaded file and rename to include resolution
+        for ext in ['.mkv', '.mp4', '.webm']:
+            final_path = output_path + ext
+            if os.path.exists(final_path):
+                final_path = rename_with_resolution(final_path)
+                # Apply language tag only if video title/channel matches preferred language
+                if settings.lang_code and settings.matches_language(video_title, video_channel):
+                    final_path = rename_with_lang_tag(final_path, settings.lang_code)
+                return True, final_path
+
+        return False, "Download completed but file not found"
+    except Exception as e:
+        err_msg = str(e)
+        if not ignore_quality_min and _format_unavailable(err_msg):
+            return False, "QUALITY_TOO_HIGH"
+        print(f"Trailer download error: {err_msg}")
+        return False, "Download failed"
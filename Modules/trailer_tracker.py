@@ -1,106 +1,224 @@
-"""Track downloaded trailers in a JSON file for the dashboard carousel and statistics."""
+"""Track downloaded trailers in a SQLite database for the dashboard carousel and statistics."""
 
 import json
 import os
+import sqlite3
 import threading
 from datetime import datetime
 from pathlib import Path
 
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trailers (
+    file_path       TEXT PRIMARY KEY,
+    title           TEXT NOT NULL DEFAULT '',
+    year            TEXT NOT NULL DEFAULT '',
+    media_type      TEXT NOT NULL DEFAULT 'movie',
+    plex_rating_key TEXT NOT NULL DEFAULT '',
+    poster_url      TEXT NOT NULL DEFAULT '',
+    thumb_url       TEXT NOT NULL DEFAULT '',
+    downloaded_at   TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_trailers_rating_key ON trailers (plex_rating_key);
+CREATE INDEX IF NOT EXISTS idx_trailers_downloaded_at ON trailers (downloaded_at);
+CREATE TABLE IF NOT EXISTS upgrade_attempts (
+    rating_key    TEXT PRIMARY KEY,
+    attempted_min INTEGER NOT NULL,
+    attempted_at  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scan_dirs (
+    path     TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    subdirs  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_TRAILER_COLUMNS = ('file_path', 'title', 'year', 'media_type', 'plex_rating_key',
+                    'poster_url', 'thumb_url', 'downloaded_at')
+
+
+class _ScanBatch:
+    """Pending scan results, written in one short transaction per flush.
+
+    A directory's mtime is stored in the same transaction as the trailers
+    found in it, so an interrupted scan never marks a directory as done
+    without its files.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.trailers = []
+        self.removed_trailers = []
+        self.dirs = []
+        self.removed_dirs = []
+
+    def flush(self):
+        if not (self.trailers or self.removed_trailers or self.dirs or self.removed_dirs):
+            return
+        with self._conn:
+            if self.trailers:
+                self._conn.executemany(
+                    f"INSERT OR IGNORE INTO trailers ({', '.join(_TRAILER_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(_TRAILER_COLUMNS))})", self.trailers)
+            if self.removed_trailers:
+                self._conn.executemany("DELETE FROM trailers WHERE file_path = ?",
+                                       [(path,) for path in self.removed_trailers])
+            for path in self.removed_dirs:
+                # Drop a deleted directory's stored state and trailers, and everything below it
+                prefix = path.rstrip('/\\') + os.sep
+                self._conn.execute(
+                    "DELETE FROM scan_dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+                    (path, len(prefix), prefix))
+                self._conn.execute(
+                    "DELETE FROM trailers WHERE substr(file_path, 1, ?) = ?",
+                    (len(prefix), prefix))
+            if self.dirs:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO scan_dirs (path, mtime_ns, subdirs) VALUES (?, ?, ?)",
+                    self.dirs)
+        self.trailers = []
+        self.removed_trailers = []
+        self.dirs = []
+        self.removed_dirs = []
+
+
 class TrailerTracker:
-    """Manages a JSON file that tracks all local trailer files."""
+    """Manages a SQLite database that tracks all local trailer files.
+
+    The MTDP process and the Movies/TV subprocesses each open their own tracker
+    on the same file; SQLite (in WAL mode) lets them read concurrently while one
+    of them writes, and every change is a small indexed update instead of a
+    rewrite of the whole store. A trailers.json left by older versions is
+    imported once and renamed to trailers.json.migrated.
+    """
 
     VIDEO_EXTENSIONS = {'.mkv', '.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.m4v'}
 
     def __init__(self, tracker_path: str = None):
         if tracker_path is None:
             if os.environ.get('IS_DOCKER', 'false').lower() == 'true':
-                tracker_path = '/config/trailers.json'
+                tracker_path = '/config/trailers.db'
             else:
-                tracker_path = os.path.join(os.path.dirname(__file__), 'config', 'trailers.json')
+                tracker_path = os.path.join(os.path.dirname(__file__), 'config', 'trailers.db')
+        root, ext = os.path.splitext(tracker_path)
+        if ext.lower() == '.json':
+            # Callers that still pass the legacy JSON path get the database next to it
+            tracker_path = root + '.db'
         self._path = tracker_path
-        self._lock = threading.Lock()
-        self._data = {"trailers": []}
+        self._json_path = os.path.splitext(tracker_path)[0] + '.json'
+        self._local = threading.local()
+        self._scan_lock = threading.Lock()
+        self._scan_cancel = threading.Event()
         self.scan_progress = {"scanning": False, "directory": "", "found": 0}
-        self._load()
+        self._init_db()
 
-    def _load(self):
-        """Load tracker data from disk."""
+    def _conn(self):
+        """Per-thread connection (sqlite3 connections can't be shared across threads)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA busy_timeout = 30000')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(_SCHEMA)
+        self._migrate_json()
+
+    def _migrate_json(self):
+        """One-time import of the trailers.json used by older versions."""
+        if not os.path.exists(self._json_path):
+            return
+        conn = self._conn()
         try:
-            if os.path.exists(self._path):
-                with open(self._path, 'r', encoding='utf-8') as f:
-                    self._data = json.load(f)
-                if "trailers" not in self._data:
-                    self._data = {"trailers": []}
+            with open(self._json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         except Exception:
-            self._data = {"trailers": []}
-        self._data.setdefault("upgrade_attempts", {})
-
-    def _save(self):
-        """Save tracker data to disk atomically."""
-        tmp_path = self._path + '.tmp'
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        # BEGIN IMMEDIATE so a subprocess starting at the same moment can't import twice
+        conn.execute('BEGIN IMMEDIATE')
         try:
-            os.makedirs(os.path.dirname(self._path), exist_ok=True)
-            with open(tmp_path, 'w', encoding='utf-8') as f:
-                json.dump(self._data, f, indent=2)
-            os.replace(tmp_path, self._path)
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated_at'").fetchone():
+                conn.rollback()
+                return
+            rows = []
+            for t in data.get("trailers") or []:
+                if isinstance(t, dict) and t.get("file_path"):
+                    rows.append(tuple(str(t.get(col) or '') if col != 'media_type'
+                                      else str(t.get(col) or 'movie') for col in _TRAILER_COLUMNS))
+            # Later entries won in the JSON list; INSERT OR REPLACE keeps that
+            conn.executemany(
+                f"INSERT OR REPLACE INTO trailers ({', '.join(_TRAILER_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_TRAILER_COLUMNS))})", rows)
+            attempts = []
+            for rating_key, record in (data.get("upgrade_attempts") or {}).items():
+                try:
+                    attempts.append((str(rating_key), int(record.get("attempted_min", 0)),
+                                     str(record.get("attempted_at", ""))))
+                except (AttributeError, TypeError, ValueError):
+                    continue
+            conn.executemany(
+                "INSERT OR REPLACE INTO upgrade_attempts (rating_key, attempted_min, attempted_at) "
+                "VALUES (?, ?, ?)", attempts)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated_at', ?)",
+                         (datetime.now().isoformat(),))
+            conn.commit()
         except Exception:
-            try:
-                os.unlink(tmp_path)
-            except OSError:
-                pass
+            conn.rollback()
+            raise
+        try:
+            os.replace(self._json_path, self._json_path + '.migrated')
+        except OSError:
+            pass
+        if rows:
+            print(f"Migrated {len(rows)} tracked trailers from {os.path.basename(self._json_path)}")
 
     def reload(self):
-        """Reload tracker data from disk (for use when external processes may have updated the file)."""
-        with self._lock:
-            self._load()
+        """Kept for compatibility: reads always see the current database contents."""
 
     def add_trailer(self, file_path: str, title: str, year: str = "",
                     media_type: str = "movie", plex_rating_key: str = "",
                     poster_url: str = "", thumb_url: str = ""):
         """Add a newly downloaded trailer to the tracker."""
-        with self._lock:
-            self._load()
+        conn = self._conn()
+        with conn:
             # Remove existing entries for same path OR same Plex item (rating key).
             # This prevents duplicates when the same movie gets a new trailer
             # (e.g. after changing preferred language).
-            self._data["trailers"] = [
-                t for t in self._data["trailers"]
-                if t.get("file_path") != file_path
-                and not (plex_rating_key and t.get("plex_rating_key") == plex_rating_key)
-            ]
-            self._data["trailers"].append({
-                "file_path": file_path,
-                "title": title,
-                "year": str(year),
-                "media_type": media_type,
-                "plex_rating_key": plex_rating_key,
-                "poster_url": poster_url,
-                "thumb_url": thumb_url,
-                "downloaded_at": datetime.now().isoformat(),
-            })
-            self._save()
+            conn.execute("DELETE FROM trailers WHERE file_path = ?", (file_path,))
+            if plex_rating_key:
+                conn.execute("DELETE FROM trailers WHERE plex_rating_key = ?", (plex_rating_key,))
+            conn.execute(
+                f"INSERT INTO trailers ({', '.join(_TRAILER_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_TRAILER_COLUMNS))})",
+                (file_path, title, str(year), media_type, plex_rating_key,
+                 poster_url, thumb_url, datetime.now().isoformat()))
 
     def mark_upgrade_attempt(self, rating_key, attempted_min):
         """Record that a trailer-upgrade attempt found no higher-res source."""
         if not rating_key:
             return
-        with self._lock:
-            self._load()
-            self._data["upgrade_attempts"][str(rating_key)] = {
-                "attempted_min": int(attempted_min),
-                "attempted_at": datetime.now().isoformat(),
-            }
-            self._save()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO upgrade_attempts (rating_key, attempted_min, attempted_at) "
+                "VALUES (?, ?, ?)",
+                (str(rating_key), int(attempted_min), datetime.now().isoformat()))
 
     def was_upgrade_attempted(self, rating_key, min_res):
         """Return True if an upgrade was already attempted at or above min_res."""
-        if not rating_key:
-            return False
-        with self._lock:
-            self._load()
-            record = self._data.get("upgrade_attempts", {}).get(str(rating_key))
-            return bool(record) and int(record.get("attempted_min", 0)) >= int(min_res)
+        record = self.get_upgrade_attempt(rating_key)
+        return bool(record) and int(record.get("attempted_min", 0)) >= int(min_res)
 
     def get_upgrade_attempt(self, rating_key):
         """Return the recorded upgrade-attempt record for this rating key, or None.
@@ -109,136 +227,190 @@ class TrailerTracker:
         """
         if not rating_key:
             return None
-        with self._lock:
-            self._load()
-            return self._data.get("upgrade_attempts", {}).get(str(rating_key))
+        row = self._conn().execute(
+            "SELECT attempted_min, attempted_at FROM upgrade_attempts WHERE rating_key = ?",
+            (str(rating_key),)).fetchone()
+        if row is None:
+            return None
+        return {"attempted_min": row["attempted_min"], "attempted_at": row["attempted_at"]}
 
     def clear_upgrade_attempts(self):
         """Forget all recorded upgrade attempts so the next run retries them.
 
         Returns the number of entries removed.
         """
-        with self._lock:
-            self._load()
-            count = len(self._data.get("upgrade_attempts", {}))
-            self._data["upgrade_attempts"] = {}
-            self._save()
-            return count
+        conn = self._conn()
+        with conn:
+            count = conn.execute("SELECT COUNT(*) FROM upgrade_attempts").fetchone()[0]
+            conn.execute("DELETE FROM upgrade_attempts")
+        return count
 
     def remove_missing(self):
         """Remove entries whose files no longer exist on disk."""
-        with self._lock:
-            self._load()
-            before = len(self._data["trailers"])
-            self._data["trailers"] = [
-                t for t in self._data["trailers"] if os.path.exists(t.get("file_path", ""))
-            ]
-            removed = before - len(self._data["trailers"])
-            if removed > 0:
-                self._save()
-            return removed
+        conn = self._conn()
+        missing = [(row["file_path"],) for row in conn.execute("SELECT file_path FROM trailers")
+                   if not os.path.exists(row["file_path"])]
+        if missing:
+            with conn:
+                conn.executemany("DELETE FROM trailers WHERE file_path = ?", missing)
+        return len(missing)
 
     def get_recent(self, limit: int = 30):
         """Get the most recently downloaded trailers, deduplicated per Plex item."""
-        with self._lock:
-            sorted_trailers = sorted(
-                self._data["trailers"],
-                key=lambda t: t.get("downloaded_at", ""),
-                reverse=True
-            )
-            # Keep only the most recent entry per plex_rating_key to avoid
-            # duplicates (e.g. after language change + re-download).
-            seen_keys = set()
-            unique = []
-            for t in sorted_trailers:
-                rk = t.get("plex_rating_key", "")
-                if rk and rk in seen_keys:
-                    continue
-                if rk:
-                    seen_keys.add(rk)
-                unique.append(t)
-            return unique[:limit]
+        # Keep only the most recent entry per plex_rating_key to avoid
+        # duplicates (e.g. after language change + re-download).
+        seen_keys = set()
+        unique = []
+        for row in self._conn().execute("SELECT * FROM trailers ORDER BY downloaded_at DESC"):
+            rk = row["plex_rating_key"]
+            if rk and rk in seen_keys:
+                continue
+            if rk:
+                seen_keys.add(rk)
+            unique.append(dict(row))
+            if len(unique) >= limit:
+                break
+        return unique
 
     def get_all(self):
         """Get all tracked trailers."""
-        with self._lock:
-            return list(self._data["trailers"])
+        return [dict(row) for row in self._conn().execute("SELECT * FROM trailers")]
 
     def count(self):
         """Get total number of tracked trailers."""
-        with self._lock:
-            return len(self._data["trailers"])
+        return self._conn().execute("SELECT COUNT(*) FROM trailers").fetchone()[0]
 
     def scan_directories(self, directories: list):
         """Scan directories for existing '-trailer' files and index them.
 
-        This is used on first run when the JSON doesn't exist yet.
+        The scan is incremental: the mtime of every visited directory is
+        stored, and a directory whose mtime hasn't changed since the last scan
+        is not listed again, since none of its entries can have changed. Its
+        known subdirectories are still checked, because adding a file to e.g.
+        Movie/Trailers/ only touches the mtime of Trailers/, not of Movie/.
+        Tracked trailers missing from a directory that is listed again, or
+        below a directory that disappeared, are removed from the index.
+
+        Readers are never blocked: the index is updated in small batches.
+        cancel_scan() stops the walk early; directories are only recorded once
+        their trailers are indexed, so the next scan resumes where this one
+        stopped. Returns the number of newly indexed trailers.
         """
+        if not self._scan_lock.acquire(blocking=False):
+            return 0  # another scan is already running
+        self._scan_cancel.clear()
         found = 0
         self.scan_progress = {"scanning": True, "directory": "", "found": 0}
         try:
-            with self._lock:
-                self._load()
-                existing_paths = {t["file_path"] for t in self._data["trailers"]}
+            conn = self._conn()
+            known_dirs = {
+                row["path"]: (row["mtime_ns"], json.loads(row["subdirs"]))
+                for row in conn.execute("SELECT path, mtime_ns, subdirs FROM scan_dirs")
+            }
+            existing_paths = {row["file_path"] for row in conn.execute("SELECT file_path FROM trailers")}
+            tracked_by_dir = {}
+            for file_path in existing_paths:
+                tracked_by_dir.setdefault(os.path.dirname(file_path), set()).add(file_path)
+            batch = _ScanBatch(conn)
+
+            for directory in directories:
+                if self._scan_cancel.is_set():
+                    break
+                if not os.path.isdir(directory):
+                    continue
+                self.scan_progress["directory"] = os.path.basename(directory.rstrip('/\\')) or directory
+                stack = [directory]
+                while stack and not self._scan_cancel.is_set():
+                    path = stack.pop()
+                    try:
+                        mtime_ns = os.stat(path).st_mtime_ns
+                    except OSError:
+                        continue
+                    known = known_dirs.get(path)
+                    if known and known[0] == mtime_ns:
+                        stack.extend(known[1])
+                        continue
 
-                for directory in directories:
-                    if not os.path.isdir(directory):
+                    subdirs = []
+                    files = set()
+                    try:
+                        with os.scandir(path) as entries:
+                            for entry in entries:
+                                try:
+                                    if entry.is_dir(follow_symlinks=False):
+                                        subdirs.append(entry.path)
+                                        continue
+                                except OSError:
+                                    continue
+                                files.add(entry.path)
+                                row = self._trailer_row(entry, existing_paths)
+                                if row:
+                                    batch.trailers.append(row)
+                                    existing_paths.add(row[0])
+                                    found += 1
+                                    self.scan_progress["found"] = found
+                    except OSError:
                         continue
-                    self.scan_progress["directory"] = os.path.basename(directory.rstrip('/\\')) or directory
-                    for root, dirs, files in os.walk(directory):
-                        for filename in files:
-                            filepath = os.path.join(root, filename)
-                            name, ext = os.path.splitext(filename)
-                            if ext.lower() not in self.VIDEO_EXTENSIONS:
-                                continue
-                            if not name.lower().endswith('-trailer'):
-                                continue
-                            if filepath in existing_paths:
-                                continue
-
-                            # Extract title from filename: "Movie Name (2024)-trailer.mkv"
-                            base = name[:-len('-trailer')]
-                            title = base
-                            year = ""
-                            if base.endswith(')') and '(' in base:
-                                idx = base.rfind('(')
-                                possible_year = base[idx+1:-1].strip()
-                                if possible_year.isdigit() and len(possible_year) == 4:
-                                    year = possible_year
-                                    title = base[:idx].strip()
-
-                            # Detect media type from path
-                            media_type = "movie"
-                            path_lower = filepath.lower().replace('\\', '/')
-                            if '/tv' in path_lower or '/series' in path_lower or '/shows' in path_lower:
-                                media_type = "tvshow"
-
-                            self._data["trailers"].append({
-                                "file_path": filepath,
-                                "title": title,
-                                "year": year,
-                                "media_type": media_type,
-                                "plex_rating_key": "",
-                                "poster_url": "",
-                                "thumb_url": "",
-                                "downloaded_at": datetime.fromtimestamp(
-                                    os.path.getmtime(filepath)
-                                ).isoformat(),
-                            })
-                            existing_paths.add(filepath)
-                            found += 1
-                            self.scan_progress["found"] = found
-
-                if found > 0:
-                    self._save()
+
+                    batch.removed_trailers.extend(tracked_by_dir.get(path, set()) - files)
+                    if known:
+                        batch.removed_dirs.extend(set(known[1]) - set(subdirs))
+                    batch.dirs.append((path, mtime_ns, json.dumps(subdirs)))
+                    stack.extend(subdirs)
+                    if len(batch.dirs) >= 200:
+                        batch.flush()
+            batch.flush()
         finally:
             self.scan_progress = {"scanning": False, "directory": "", "found": 0}
+            self._scan_lock.release()
         return found
 
+    def _trailer_row(self, entry, existing_paths):
+        """Tracker row for a '-trailer' video file found by the scan, or None."""
+        name, ext = os.path.splitext(entry.name)
+        if ext.lower() not in self.VIDEO_EXTENSIONS:
+            return None
+        if not name.lower().endswith('-trailer'):
+            return None
+        filepath = entry.path
+        if filepath in existing_paths:
+            return None
+        try:
+            mtime = entry.stat().st_mtime
+        except OSError:
+            return None
+
+        # Extract title from filename: "Movie Name (2024)-trailer.mkv"
+        base = name[:-len('-trailer')]
+        title = base
+        year = ""
+        if base.endswith(')') and '(' in base:
+            idx = base.rfind('(')
+            possible_year = base[idx+1:-1].strip()
+            if possible_year.isdigit() and len(possible_year) == 4:
+                year = possible_year
+                title = base[:idx].strip()
+
+        # Detect media type from path
+        media_type = "movie"
+        path_lower = filepath.lower().replace('\\', '/')
+        if '/tv' in path_lower or '/series' in path_lower or '/shows' in path_lower:
+            media_type = "tvshow"
+
+        return (filepath, title, year, media_type, "", "", "",
+                datetime.fromtimestamp(mtime).isoformat())
+
+    def cancel_scan(self):
+        """Ask a running scan_directories() to stop; the next scan resumes."""
+        self._scan_cancel.set()
+
+    def reset_scan_state(self):
+        """Forget stored directory mtimes so the next scan lists everything again."""
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM scan_dirs")
+
     def needs_initial_scan(self):
         """Check if we need to do an initial directory scan."""
-        if not os.path.exists(self._path):
-            return True
-        # Also scan if the file exists but has no entries (e.g. first run created empty file)
-        with self._lock:
-            return len(self._data.get("trailers", [])) == 0
+        # Also scan if the database exists but has no entries (e.g. first run)
+        return self.count() == 0
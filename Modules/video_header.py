@@ -0,0 +1,248 @@
+"""Read video dimensions straight from MP4/MOV and Matroska/WebM headers.
+
+Spawning ffprobe costs tens of milliseconds per file, most of it process
+startup, which adds up when a first run meets thousands of existing trailers.
+The two containers yt-dlp produces describe the video track near the start
+of the file (or in the moov box at the end for non-faststart MP4s), so the
+dimensions can be read with a few small reads of a memory-mapped file:
+
+- MP4/MOV: moov/trak/mdia/minf/stbl/stsd sample entry (coded size), with
+  moov/trak/tkhd as a fallback; duration from moov/mvhd.
+- Matroska/WebM: Segment/Tracks/TrackEntry/Video PixelWidth and PixelHeight;
+  duration from Segment/Info.
+
+read_video_info() returns None for anything else (other containers, or a
+layout it does not understand) so the caller can fall back to ffprobe.
+"""
+
+import mmap
+import os
+import struct
+
+# Sample entry fourcc / Matroska CodecID -> ffprobe codec_name
+_MP4_CODECS = {
+    b'avc1': 'h264', b'avc3': 'h264', b'hvc1': 'hevc', b'hev1': 'hevc',
+    b'av01': 'av1', b'vp09': 'vp9', b'vp08': 'vp8', b'mp4v': 'mpeg4',
+}
+_MKV_CODECS = {
+    'V_MPEG4/ISO/AVC': 'h264', 'V_MPEGH/ISO/HEVC': 'hevc', 'V_AV1': 'av1',
+    'V_VP9': 'vp9', 'V_VP8': 'vp8', 'V_MPEG4/ISO/ASP': 'mpeg4',
+}
+_MP4_TOP_LEVEL = {b'ftyp', b'moov', b'mdat', b'free', b'skip', b'wide', b'pnot'}
+
+# Matroska element IDs (with their length marker bits, as stored)
+_EBML = 0x1A45DFA3
+_SEGMENT = 0x18538067
+_INFO = 0x1549A966
+_TIMECODE_SCALE = 0x2AD7B1
+_DURATION = 0x4489
+_TRACKS = 0x1654AE6B
+_TRACK_ENTRY = 0xAE
+_TRACK_TYPE = 0x83
+_CODEC_ID = 0x86
+_VIDEO = 0xE0
+_PIXEL_WIDTH = 0xB0
+_PIXEL_HEIGHT = 0xBA
+_CLUSTER = 0x1F43B675
+_MKV_VIDEO_TRACK = 1
+
+# Refuse to walk absurdly large header boxes/elements (corrupt files)
+_MAX_HEADER = 64 * 1024 * 1024
+
+
+def _iter_boxes(buf, start, end):
+    """Yield (type, payload_start, box_end) for the MP4 boxes in buf[start:end]."""
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', buf, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                return
+            size = struct.unpack_from('>Q', buf, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            return
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def _find_box(buf, start, end, box_type):
+    for found, payload, box_end in _iter_boxes(buf, start, end):
+        if found == box_type:
+            return payload, box_end
+    return None
+
+
+def _find_path(buf, start, end, path):
+    for box_type in path:
+        found = _find_box(buf, start, end, box_type)
+        if not found:
+            return None
+        start, end = found
+    return start, end
+
+
+def _read_mp4(buf):
+    size = len(buf)
+    moov = _find_box(buf, 0, size, b'moov')
+    if not moov:
+        return None
+    moov_start, moov_end = moov
+    if moov_end - moov_start > _MAX_HEADER:
+        return None
+
+    duration = None
+    mvhd = _find_box(buf, moov_start, moov_end, b'mvhd')
+    if mvhd:
+        p = mvhd[0]
+        if buf[p] == 1:
+            timescale, length = struct.unpack_from('>IQ', buf, p + 20)
+        else:
+            timescale, length = struct.unpack_from('>II', buf, p + 12)
+        if timescale:
+            duration = length / timescale
+
+    for box_type, trak_start, trak_end in _iter_boxes(buf, moov_start, moov_end):
+        if box_type != b'trak':
+            continue
+        hdlr = _find_path(buf, trak_start, trak_end, (b'mdia', b'hdlr'))
+        if not hdlr or buf[hdlr[0] + 8:hdlr[0] + 12] != b'vide':
+            continue
+        width = height = 0
+        codec = None
+        stsd = _find_path(buf, trak_start, trak_end, (b'mdia', b'minf', b'stbl', b'stsd'))
+        if stsd and stsd[0] + 8 + 36 <= stsd[1]:
+            entry = stsd[0] + 8  # skip version/flags and entry_count
+            fourcc = bytes(buf[entry + 4:entry + 8])
+            codec = _MP4_CODECS.get(fourcc, fourcc.decode('latin-1').strip() or None)
+            width, height = struct.unpack_from('>HH', buf, entry + 32)
+        if not (width and height):
+            tkhd = _find_box(buf, trak_start, trak_end, b'tkhd')
+            if tkhd and tkhd[1] - tkhd[0] >= 8:
+                w, h = struct.unpack_from('>II', buf, tkhd[1] - 8)
+                width, height = w >> 16, h >> 16
+        if width and height:
+            return {'width': width, 'height': height, 'codec': codec, 'duration': duration}
+    return None
+
+
+def _read_vint(buf, pos, keep_marker=False):
+    """Decode an EBML variable-length integer; returns (value, length, all_ones)."""
+    first = buf[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        length += 1
+        mask >>= 1
+    if length > 8 or pos + length > len(buf):
+        raise ValueError('invalid EBML vint')
+    value = first if keep_marker else first & (mask - 1)
+    all_ones = (first & (mask - 1)) == mask - 1
+    for b in buf[pos + 1:pos + length]:
+        value = (value << 8) | b
+        all_ones = all_ones and b == 0xFF
+    return value, length, all_ones
+
+
+def _iter_elements(buf, start, end):
+    """Yield (id, data_start, data_end) for the EBML elements in buf[start:end].
+
+    Elements of unknown size (live-muxed Segment/Cluster) extend to end.
+    """
+    pos = start
+    while pos < end:
+        element_id, id_len, _ = _read_vint(buf, pos, keep_marker=True)
+        size, size_len, unknown = _read_vint(buf, pos + id_len)
+        data_start = pos + id_len + size_len
+        data_end = end if unknown else min(end, data_start + size)
+        yield element_id, data_start, data_end
+        pos = data_end
+
+
+def _uint(buf, start, end):
+    return int.from_bytes(buf[start:end], 'big')
+
+
+def _read_mkv(buf):
+    size = len(buf)
+    timecode_scale = 1000000
+    duration = None
+    for element_id, seg_start, seg_end in _iter_elements(buf, 0, size):
+        if element_id != _SEGMENT:
+            continue
+        for child, start, end in _iter_elements(buf, seg_start, seg_end):
+            if child == _INFO:
+                for info_id, s, e in _iter_elements(buf, start, end):
+                    if info_id == _TIMECODE_SCALE:
+                        timecode_scale = _uint(buf, s, e) or timecode_scale
+                    elif info_id == _DURATION and e - s in (4, 8):
+                        duration = struct.unpack('>f' if e - s == 4 else '>d', buf[s:e])[0]
+            elif child == _TRACKS:
+                if end - start > _MAX_HEADER:
+                    return None
+                for entry_id, es, ee in _iter_elements(buf, start, end):
+                    if entry_id != _TRACK_ENTRY:
+                        continue
+                    track_type = codec_id = None
+                    width = height = 0
+                    for field, s, e in _iter_elements(buf, es, ee):
+                        if field == _TRACK_TYPE:
+                            track_type = _uint(buf, s, e)
+                        elif field == _CODEC_ID:
+                            codec_id = bytes(buf[s:e]).rstrip(b'\0').decode('ascii', 'replace')
+                        elif field == _VIDEO:
+                            for video_id, vs, ve in _iter_elements(buf, s, e):
+                                if video_id == _PIXEL_WIDTH:
+                                    width = _uint(buf, vs, ve)
+                                elif video_id == _PIXEL_HEIGHT:
+                                    height = _uint(buf, vs, ve)
+                    if track_type == _MKV_VIDEO_TRACK and width and height:
+                        if duration is not None:
+                            duration = duration * timecode_scale / 1e9
+                        return {'width': width, 'height': height,
+                                'codec': _MKV_CODECS.get(codec_id, (codec_id or '').lower() or None),
+                                'duration': duration}
+            elif child == _CLUSTER:
+                # Media data starts here; Tracks after the first Cluster is
+                # legal but rare enough to leave to ffprobe.
+                return None
+        return None
+    return None
+
+
+def read_video_info(filepath):
+    """Return {'width', 'height', 'codec', 'duration', 'bitrate'} from the file header.
+
+    Returns None when the container is not MP4/MOV or Matroska/WebM, or the
+    header could not be understood.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size < 16:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if struct.unpack_from('>I', buf, 0)[0] == _EBML:
+                    info = _read_mkv(buf)
+                elif bytes(buf[4:8]) in _MP4_TOP_LEVEL:
+                    info = _read_mp4(buf)
+                else:
+                    return None
+    except (OSError, ValueError, struct.error, IndexError):
+        return None
+    if not info:
+        return None
+    duration = info.get('duration')
+    info['bitrate'] = int(file_size * 8 / duration) if duration else None
+    return info
+
+
+def read_dimensions(filepath):
+    """(width, height) of the first video track from the file header, or None."""
+    info = read_video_info(filepath)
+    if not info:
+        return None
+    return info['width'], info['height']
@@ -0,0 +1,131 @@
+"""Persistent journal of the new-item watcher's queue.
+
+NewItemWatcher keeps the items waiting for their check and the cooldowns of
+recently handled items in memory, so a container restart (image pull, yt-dlp
+update) used to drop everything that was queued until the next scheduled scan.
+This journal mirrors both in a small SQLite database next to the config:
+
+- pending  -- one row per queued item with its due time, first-seen time and
+              library; removed once the item's check has finished, so a check
+              interrupted by a restart is replayed.
+- cooldown -- expiry time per recently handled item.
+- meta     -- 'last_seen', the last time the watcher was known to be listening
+              (an event arrived or the listener was alive) or detection was
+              switched off, which bounds the "added while we were away"
+              catch-up query after a restart or reconnect; and 'last_event'
+              for the status display.
+"""
+
+import os
+import sqlite3
+import time
+
+
+def default_journal_path():
+    if os.environ.get('IS_DOCKER', 'false').lower() == 'true':
+        return '/config/watcher_queue.db'
+    return os.path.join(os.path.dirname(__file__), 'config', 'watcher_queue.db')
+
+
+class WatcherJournal:
+    """SQLite-backed copy of the watcher's pending queue and cooldowns."""
+
+    def __init__(self, journal_path=None):
+        self._path = journal_path or default_journal_path()
+        self._ready = False
+
+    def _connect(self):
+        # One short-lived connection per call, like SearchCache: the alert
+        # thread and every worker thread write.
+        if not self._ready:
+            os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self._path, timeout=30)
+        if not self._ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS pending ('
+                ' rating_key INTEGER PRIMARY KEY,'
+                ' section TEXT NOT NULL,'
+                ' due REAL NOT NULL,'
+                ' first_seen REAL NOT NULL)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cooldown ('
+                ' rating_key INTEGER PRIMARY KEY,'
+                ' expiry REAL NOT NULL)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS meta ('
+                ' key TEXT PRIMARY KEY,'
+                ' value REAL NOT NULL)')
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def _write(self, sql, rows):
+        if not rows:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany(sql, rows)
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            pass
+
+    def save_pending(self, items):
+        """Insert or update queued items; items is an iterable of (ratingKey, info dict)."""
+        self._write('INSERT OR REPLACE INTO pending (rating_key, section, due, first_seen) VALUES (?, ?, ?, ?)',
+                    [(int(rk), info['section'], info['due'], info['first_seen']) for rk, info in items])
+
+    def remove_pending(self, rating_key):
+        self._write('DELETE FROM pending WHERE rating_key = ?', [(int(rating_key),)])
+
+    def clear_pending(self):
+        self._write('DELETE FROM pending', [()])
+
+    def save_cooldown(self, rating_key, expiry):
+        self._write('INSERT OR REPLACE INTO cooldown (rating_key, expiry) VALUES (?, ?)',
+                    [(int(rating_key), expiry)])
+
+    def set_meta(self, **values):
+        self._write('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', list(values.items()))
+
+    def get_meta(self):
+        """Saved meta values (key -> epoch)."""
+        if not os.path.exists(self._path):
+            return {}
+        try:
+            conn = self._connect()
+            try:
+                return dict(conn.execute('SELECT key, value FROM meta'))
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            return {}
+
+    def load(self):
+        """Return (pending, cooldown) as saved, dropping expired cooldowns.
+
+        pending maps ratingKey -> {"due", "first_seen", "section"} and cooldown
+        maps ratingKey -> expiry. A pending item keeps no cooldown: it was
+        still queued, or its check was cut short.
+        """
+        if not os.path.exists(self._path):
+            return {}, {}
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('DELETE FROM cooldown WHERE expiry <= ?', (now,))
+                conn.commit()
+                pending = {rk: {"due": due, "first_seen": first_seen, "section": section}
+                           for rk, section, due, first_seen in conn.execute(
+                               'SELECT rating_key, section, due, first_seen FROM pending')}
+                cooldown = {rk: expiry for rk, expiry in conn.execute(
+                    'SELECT rating_key, expiry FROM cooldown') if rk not in pending}
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            return {}, {}
+        return pending, cooldown
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules import each other as Modules.<name>, as they do when MTDP.py runs
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,90 @@
+"""SearchCache entries expire after their own TTL: match and no-match separately."""
+
+import time
+
+import pytest
+
+from Modules import search_cache as search_cache_module
+from Modules.search_cache import OUTCOME_MATCH, OUTCOME_NO_MATCH, SearchCache
+
+QUERY = 'ytsearch15:Dune Part Two 2024 official trailer'
+ENTRIES = [
+    {'id': 'a1', 'url': 'https://youtu.be/a1', 'title': 'Dune: Part Two | Official Trailer',
+     'channel': 'Warner Bros.', 'duration': 150, 'view_count': 10, 'thumbnails': [{'url': 'x'}]},
+    None,
+    {'id': 'b2', 'url': 'https://youtu.be/b2', 'title': 'Dune 2 Trailer 2'},
+]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Shifts the time the cache sees by .offset seconds."""
+    class Clock:
+        offset = 0.0
+    real_time = time.time
+    monkeypatch.setattr(search_cache_module.time, 'time', lambda: real_time() + Clock.offset)
+    return Clock
+
+
+def make_cache(tmp_path, ttl_hours=24, no_match_ttl_hours=2):
+    return SearchCache(str(tmp_path / 'search_cache.db'), ttl_hours=ttl_hours,
+                       no_match_ttl_hours=no_match_ttl_hours)
+
+
+def test_match_kept_until_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    assert cache.get(QUERY) is None
+    cache.put(QUERY, ENTRIES)
+    outcome, candidates = cache.get(QUERY)
+    assert outcome == OUTCOME_MATCH
+    # Flattened to the fields scoring needs; empty entries dropped
+    assert candidates == [
+        {'id': 'a1', 'url': 'https://youtu.be/a1', 'title': 'Dune: Part Two | Official Trailer',
+         'channel': 'Warner Bros.', 'duration': 150, 'view_count': 10},
+        {'id': 'b2', 'url': 'https://youtu.be/b2', 'title': 'Dune 2 Trailer 2'},
+    ]
+    clock.offset = 23 * 3600
+    assert cache.get(QUERY)[0] == OUTCOME_MATCH
+    clock.offset = 25 * 3600
+    assert cache.get(QUERY) is None
+
+
+def test_no_match_expires_after_its_own_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put(QUERY, ENTRIES)
+    cache.mark_no_match(QUERY)
+    assert cache.get(QUERY) == (OUTCOME_NO_MATCH, [])
+    clock.offset = 1.5 * 3600
+    assert cache.get(QUERY) == (OUTCOME_NO_MATCH, [])
+    clock.offset = 2.5 * 3600
+    assert cache.get(QUERY) is None
+
+
+def test_query_key_is_normalized(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put(QUERY, ENTRIES)
+    assert cache.get('  YTSEARCH15:dune  part two 2024 OFFICIAL trailer ')[0] == OUTCOME_MATCH
+
+
+def test_zero_no_match_ttl_discards_stale_match(tmp_path, clock):
+    cache = make_cache(tmp_path, no_match_ttl_hours=0)
+    cache.put(QUERY, ENTRIES)
+    cache.mark_no_match(QUERY)
+    assert cache.get(QUERY) is None
+
+
+def test_disabled_cache_stores_nothing(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_hours=0, no_match_ttl_hours=0)
+    assert not cache.enabled
+    cache.put(QUERY, ENTRIES)
+    cache.mark_no_match(QUERY)
+    assert cache.get(QUERY) is None
+
+
+def test_purge(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    assert make_cache(tmp_path / 'empty').purge() == 0
+    cache.put(QUERY, ENTRIES)
+    cache.mark_no_match('ytsearch15:other')
+    assert cache.purge() == 2
+    assert cache.get(QUERY) is None
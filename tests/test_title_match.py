@@ -0,0 +1,159 @@
+"""TitleMatcher and keyword_pattern against the per-call regex checks they replaced."""
+
+import re
+
+import pytest
+
+from Modules.title_match import TitleMatcher, keyword_pattern, sanitize_title, years_in
+
+NOISE_WORDS = {
+    'official', 'new', 'exclusive', 'international', 'final', 'first',
+    'full', 'main', 'original', 'extended', 'teaser', 'trailer',
+    'hd', '4k', 'uhd', 'imax', 'dolby', 'restoration',
+    'tv', 'spot', 'clip', 'promo', 'preview', 'sneak', 'peek',
+}
+STOPWORDS = {'the', 'a', 'an', 'of', 'and', 'in', 'to', 'for', 'is', 'on', 'at'}
+
+
+# ── The checks as they were written before TitleMatcher ───────────────────
+
+def old_is_standalone_title_match(movie_title_lower, video_title_lower):
+    pattern = r'\b' + re.escape(movie_title_lower) + r'\b'
+    match = re.search(pattern, video_title_lower)
+    if not match:
+        return False
+    movie_words = movie_title_lower.split()
+    if len(movie_words) <= 2:
+        prefix = video_title_lower[:match.start()].strip()
+        if prefix:
+            prefix = re.sub(r'[|\-:!]', ' ', prefix).strip()
+            prefix_words = prefix.split()
+            significant = [w for w in prefix_words if w not in NOISE_WORDS and len(w) > 2]
+            if significant:
+                return False
+    return True
+
+
+def old_sanitize(text_lower):
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', '', text_lower)).strip()
+
+
+def old_colon_parts_match(movie_title_lower, video_title_lower):
+    parts = movie_title_lower.split(':')
+    return len(parts) > 1 and all(part.strip() in video_title_lower for part in parts)
+
+
+def old_word_overlap_match(sanitized_movie, sanitized_video):
+    movie_significant = set(sanitized_movie.split()) - STOPWORDS
+    if movie_significant and len(movie_significant) >= 2:
+        overlap = movie_significant & set(sanitized_video.split())
+        return len(overlap) / len(movie_significant) >= 0.8
+    return False
+
+
+def old_matches_language_keyword(text, keywords):
+    for kw in keywords:
+        if len(kw) <= 3:
+            if re.search(r'\b' + re.escape(kw) + r'\b', text):
+                return True
+        elif kw in text:
+            return True
+    return False
+
+
+TITLES = [
+    'Dreams',
+    'Up',
+    'Alien',
+    'The Thing',
+    'Burden of Dreams',
+    'Mission: Impossible - Dead Reckoning',
+    'Spider-Man: Across the Spider-Verse',
+    'Star Wars: Episode IV - A New Hope',
+    'WALL·E',
+    'Amélie',
+    'Se7en',
+    'Once Upon a Time... in Hollywood',
+    '(500) Days of Summer',
+    'M3GAN',
+]
+
+VIDEO_TITLES = [
+    'Dreams - Official Trailer (1990)',
+    'Burden of Dreams (1982) Trailer',
+    'Akira Kurosawa\'s Dreams | Official Trailer HD',
+    'UP | Official Trailer | Disney Pixar',
+    'Alien: Romulus | Official Trailer',
+    'ALIEN (1979) Official Trailer #1 - Ridley Scott',
+    'The Thing (1982) Official Trailer',
+    'Mission: Impossible – Dead Reckoning Part One | Official Trailer (2023)',
+    'Mission Impossible Dead Reckoning - Final Trailer',
+    'SPIDER-MAN: ACROSS THE SPIDER-VERSE - Official Trailer #2 (HD)',
+    'Star Wars Episode IV A New Hope Trailer 1977',
+    'WALL-E Trailer',
+    'WALL·E - Official Trailer',
+    'Amelie (2001) Official Trailer',
+    'Amélie - Bande Annonce VF',
+    'Se7en (1995) - Official Trailer 4K',
+    'Once Upon a Time in Hollywood - Official Trailer',
+    '500 Days of Summer - Official Trailer',
+    'M3GAN 2.0 | Official Trailer',
+    'Final Trailer: Dreams',
+    'New Dreams Teaser',
+]
+
+
+@pytest.mark.parametrize('title', TITLES)
+def test_title_checks_match_old_behaviour(title):
+    matcher = TitleMatcher(title, NOISE_WORDS)
+    title_lower = title.lower()
+    sanitized_title = old_sanitize(title_lower)
+    assert matcher.title == title_lower
+    assert matcher.sanitized == sanitized_title
+    assert matcher.is_specific == (len(title_lower.split()) >= 3 or len(title_lower) >= 15)
+    for video_title in VIDEO_TITLES:
+        video_lower = video_title.lower()
+        sanitized_video = old_sanitize(video_lower)
+        assert sanitize_title(video_lower) == sanitized_video
+        assert matcher.standalone_in(video_lower) == old_is_standalone_title_match(title_lower, video_lower), video_title
+        assert (matcher.sanitized_standalone_in(sanitized_video)
+                == old_is_standalone_title_match(sanitized_title, sanitized_video)), video_title
+        assert matcher.colon_parts_in(video_lower) == old_colon_parts_match(title_lower, video_lower), video_title
+        new_overlap = len(matcher.significant_words) >= 2 and matcher.word_overlap(sanitized_video) >= 0.8
+        assert new_overlap == old_word_overlap_match(sanitized_title, sanitized_video), video_title
+
+
+def test_short_title_rejects_significant_prefix():
+    matcher = TitleMatcher('Dreams', NOISE_WORDS)
+    assert matcher.standalone_in('dreams - official trailer')
+    assert matcher.standalone_in('official final trailer: dreams')
+    assert not matcher.standalone_in('burden of dreams trailer')
+    assert not matcher.standalone_in('sweet dreams are made of this')
+
+
+def test_word_overlap_without_significant_words():
+    assert TitleMatcher('The').word_overlap('the trailer') == 0.0
+
+
+@pytest.mark.parametrize('keywords', [
+    ['deutsch', 'german', 'auf deutsch', 'de'],
+    ['français', 'francais', 'french', 'vf', 'vostfr', 'fr'],
+    ['español', 'espanol', 'spanish', 'castellano', 'latino', 'es'],
+    ['c++', 'a.b'],
+])
+def test_keyword_pattern_matches_old_behaviour(keywords):
+    pattern = keyword_pattern(keywords)
+    for text in ['trailer deutsch', 'german trailer', 'dead reckoning', 'de', 'trailer (de)',
+                 'bande annonce vf', 'vfx breakdown', 'fr', 'free', 'trailer latino',
+                 'estreno es', 'c++ in 100 seconds', 'axb', 'a.b test']:
+        assert bool(pattern.search(text)) == old_matches_language_keyword(text, keywords), text
+
+
+def test_keyword_pattern_empty():
+    assert keyword_pattern([]) is None
+
+
+def test_years_in():
+    assert years_in('Dune (2021) vs Dune 1984 remaster 4k 2160p') == ['2021', '1984']
+    assert years_in('Blade Runner 2049 trailer') == ['2049']
+    assert years_in('12021 trailer') == []
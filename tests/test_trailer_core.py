@@ -0,0 +1,418 @@
+"""The shared search/download pipeline: scoring, title checks, search and outcomes.
+
+yt-dlp is replaced by FakeYDL, which serves canned search results and writes
+a file for a download, so nothing here touches the network.
+"""
+
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('yt_dlp')
+pytest.importorskip('plexapi')
+
+from Modules import trailer_core  # noqa: E402
+from Modules.search_cache import OUTCOME_NO_MATCH, SearchCache  # noqa: E402
+from Modules.trailer_core import (  # noqa: E402
+    DL_ERROR, DL_KEPT_BELOW_MIN, DL_NO_MATCH, DL_OK,
+    ITEM_DOWNLOADED, ITEM_FAILED, ITEM_HAS_TRAILER, ITEM_MISSING, ITEM_SKIPPED,
+    ITEM_UPGRADE_ERROR, ITEM_UPGRADE_NO_MATCH, ITEM_UPGRADED_BELOW_MIN,
+    TrailerSettings, TrailerTarget, check_item, download_trailer, movie_title_verifier,
+    run_search_queries, score_video, settle_download, show_title_verifier,
+)
+
+
+class FakeYDL:
+    """Stands in for yt_dlp.YoutubeDL.
+
+    search(query) returns the flat entries for a search (or raises); download
+    (url, outtmpl) runs for each download and returns the yt-dlp return code.
+    """
+
+    search = staticmethod(lambda query: None)
+    download_hook = None
+    searched = []
+    downloaded = []
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, query, download=False):
+        FakeYDL.searched.append(query)
+        entries = FakeYDL.search(query)
+        return None if entries is None else {'entries': entries}
+
+    def download(self, urls):
+        FakeYDL.downloaded.extend(urls)
+        try:
+            return FakeYDL.download_hook(urls[0], self.opts['outtmpl'])
+        except trailer_core.yt_dlp.utils.DownloadError:
+            # Like yt-dlp: with ignoreerrors the error only shows in the return code
+            if self.opts.get('ignoreerrors'):
+                return 1
+            raise
+
+
+def write_file(url, outtmpl):
+    with open(outtmpl.replace('%(ext)s', 'mkv'), 'wb') as f:
+        f.write(b'trailer ' + url.encode())
+    return 0
+
+
+def fail_with(message):
+    def hook(url, outtmpl):
+        raise trailer_core.yt_dlp.utils.DownloadError(f'ERROR: [youtube] {url}: {message}')
+    return staticmethod(hook)
+
+
+FORMAT_UNAVAILABLE = 'Requested format is not available. Use --list-formats for a list of available formats'
+HTTP_ERROR = 'Unable to download webpage: HTTP Error 503: Service Unavailable'
+
+
+def video(video_id, title, channel='Warner Bros. Pictures', duration=150, views=2_000_000):
+    return {'id': video_id, 'url': f'https://www.youtube.com/watch?v={video_id}', 'title': title,
+            'channel': channel, 'duration': duration, 'view_count': views}
+
+
+HEAT_RESULTS = [
+    video('review', 'Heat (1995) Review - Is It Michael Mann\'s Best?', channel='Film Critic'),
+    video('long', 'Heat (1995) Full Movie', duration=10200),
+    video('fan', 'Heat trailer 1995', channel='Some Fan', views=900),
+    video('official', 'Heat (1995) Official Trailer - Al Pacino, Robert De Niro'),
+]
+
+
+@pytest.fixture(autouse=True)
+def fake_ytdlp(monkeypatch):
+    monkeypatch.setattr(trailer_core.yt_dlp, 'YoutubeDL', FakeYDL)
+    monkeypatch.setattr(FakeYDL, 'search', staticmethod(lambda query: [dict(v) for v in HEAT_RESULTS]))
+    monkeypatch.setattr(FakeYDL, 'download_hook', staticmethod(write_file))
+    monkeypatch.setattr(FakeYDL, 'searched', [])
+    monkeypatch.setattr(FakeYDL, 'downloaded', [])
+    # No ffprobe or probe cache, and no cookies file from the checkout
+    monkeypatch.setattr(trailer_core, 'probe_dimensions', lambda path: None)
+    monkeypatch.setattr(trailer_core, 'get_cookies_path', lambda: None)
+
+
+@pytest.fixture
+def make_settings(tmp_path):
+    def _make(**config):
+        config = dict({'DOWNLOAD_TRAILERS': True, 'SHOW_YT_DLP_PROGRESS': False,
+                       'CHECK_PLEX_PASS_TRAILERS': False}, **config)
+        return TrailerSettings(config, search_cache=SearchCache(str(tmp_path / 'search_cache.db')))
+    return _make
+
+
+@pytest.fixture
+def movie_folder(tmp_path):
+    folder = tmp_path / 'movies' / 'Heat (1995)'
+    folder.mkdir(parents=True)
+    (folder / 'Heat (1995).mkv').write_bytes(b'movie')
+    return folder
+
+
+def heat_target(movie_folder):
+    return TrailerTarget.for_movie('Heat', 1995, str(movie_folder / 'Heat (1995).mkv'))
+
+
+def trailer_names(movie_folder):
+    trailers = movie_folder / 'Trailers'
+    return sorted(os.listdir(trailers)) if trailers.is_dir() else []
+
+
+# ── Scoring ───────────────────────────────────────────────────────────────
+
+def test_score_video_signals(make_settings):
+    settings = make_settings()
+    official = dict(video('a', 'Heat (1995) Official Trailer'), _search_position=0, _item_year=1995)
+    # official + trailer + studio channel + views + first result
+    assert score_video(official, settings) == 2 + 2 + 3 + 2 + 3
+    fan = dict(video('b', 'heat trailer', channel='Some Fan', views=50_000), _search_position=5)
+    assert score_video(fan, settings) == 2
+    # A different year in the title costs 3
+    assert score_video(dict(official, title='Heat (2026) Official Trailer'), settings) == 12 - 3
+
+
+def test_score_video_language(make_settings):
+    german = make_settings(PREFERRED_LANGUAGE='german')
+    base = dict(video('a', 'Heat Trailer', channel='Some Fan', views=0), _search_position=10)
+    assert score_video(base, german) == 2
+    assert score_video(dict(base, title='Heat Trailer Deutsch'), german) == 2 + 25
+    assert score_video(dict(base, channel='KinoCheck de'), german) == 2 + 25
+    assert score_video(dict(base, title='Heat Trailer French'), german) == 2 - 15
+    # The original-language setting neither rewards nor penalizes
+    assert score_video(dict(base, title='Heat Trailer Deutsch'), make_settings()) == 2
+
+
+# ── Title checks ──────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize('video_title, expected', [
+    ('Dreams (1990) Official Trailer', True),
+    ('Akira Kurosawa\'s DREAMS 1990 trailer', False),
+    ('Burden of Dreams (1982) Trailer', False),
+    ('Dreams - Official Trailer', True),   # no year, short title: standalone + 'trailer'
+    ('Dreams 1990', True),
+    ('Dreams', False),                     # no year and no 'trailer'
+    ('Sweet Dreams Trailer', False),
+])
+def test_movie_title_verifier_short_title(video_title, expected):
+    assert movie_title_verifier('Dreams', 1990)(video_title) is expected
+
+
+@pytest.mark.parametrize('video_title, expected', [
+    ('Mission: Impossible – Dead Reckoning Part One | Official Trailer (2023)', True),
+    ('Mission Impossible Dead Reckoning Part One 2023', True),
+    ('Mission: Impossible - Dead Reckoning Part One - Final Trailer', True),
+    ('Mission Impossible Dead Reckoning Part One', False),
+    ('Mission: Impossible - Fallout (2018) Official Trailer', False),
+])
+def test_movie_title_verifier_long_title(video_title, expected):
+    verify = movie_title_verifier('Mission: Impossible - Dead Reckoning Part One', 2023)
+    assert verify(video_title) is expected
+
+
+@pytest.mark.parametrize('show_title, show_year, video_title, expected', [
+    ('Severance', 2022, 'Severance — Official Trailer | Apple TV+', True),
+    ('Severance', 2022, 'Severance (2022) Season 1 Teaser', True),
+    ('Severance', 2022, 'Severance Season 2 Teaser', False),
+    ('Severance', 2022, 'Severance Pay Explained Trailer', True),
+    ('Doctor Who (2005)', 2005, 'Doctor Who 2005 Series 1 Trailer', True),
+    ('Doctor Who (2005)', 2005, 'Doctor Who: The Movie 1996', False),
+    ('Severance', None, 'Severance teaser', True),
+    ('Severance', None, 'Severe Weather Warning', False),
+])
+def test_show_title_verifier(show_title, show_year, video_title, expected):
+    assert show_title_verifier(show_title, show_year)(video_title) is expected
+
+
+# ── Parallel search ───────────────────────────────────────────────────────
+
+def test_run_search_queries_merges_by_video_id(tmp_path, monkeypatch):
+    results = {
+        'q0': [video('a', 'A'), video('b', 'B')],
+        'q1': [video('c', 'C'), video('a', 'A')],
+        'q2': Exception('HTTP Error 429'),
+    }
+
+    def search(query):
+        if isinstance(results[query], Exception):
+            raise results[query]
+        return results[query]
+    monkeypatch.setattr(FakeYDL, 'search', staticmethod(search))
+    cache = SearchCache(str(tmp_path / 'search_cache.db'))
+    cache.mark_no_match('q3')
+
+    entries, searched, returned = run_search_queries(['q0', 'q1', 'q2', 'q3'], {}, lambda e: False, cache)
+    positions = {e['id']: e['_search_position'] for e in entries}
+    assert positions == {'a': 0, 'b': 1, 'c': 0}
+    assert searched == ['q0', 'q1']
+    assert returned
+    # The cached no-match query was not searched again
+    assert sorted(FakeYDL.searched) == ['q0', 'q1', 'q2']
+
+
+def test_run_search_queries_stops_at_confident_first_query(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def search(query):
+        if query != 'q0':
+            release.wait(5)
+        return [video(query, query)]
+    monkeypatch.setattr(FakeYDL, 'search', staticmethod(search))
+    try:
+        entries, searched, _ = run_search_queries(
+            ['q0', 'q1', 'q2'], {}, lambda e: e[0]['id'] == 'q0',
+            SearchCache(str(tmp_path / 'search_cache.db')))
+    finally:
+        release.set()
+    assert [e['id'] for e in entries] == ['q0']
+    assert searched == ['q0']
+
+
+def test_run_search_queries_cached_winner_searches_nothing(tmp_path):
+    cache = SearchCache(str(tmp_path / 'search_cache.db'))
+    cache.put('q0', [video('a', 'A')])
+    entries, searched, _ = run_search_queries(['q0', 'q1'], {}, lambda e: True, cache)
+    assert [e['id'] for e in entries] == ['a']
+    assert FakeYDL.searched == []
+
+
+# ── download_trailer outcomes ─────────────────────────────────────────────
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_download_trailer_picks_official_trailer(make_settings, movie_folder, parallel):
+    settings = make_settings(PARALLEL_SEARCH=parallel)
+    assert download_trailer(settings, heat_target(movie_folder)) == DL_OK
+    assert FakeYDL.downloaded == ['https://www.youtube.com/watch?v=official']
+    assert trailer_names(movie_folder) == ['Heat (1995)-trailer.mkv']
+
+
+def test_download_trailer_keeps_existing_trailer(make_settings, movie_folder):
+    (movie_folder / 'Trailers').mkdir()
+    (movie_folder / 'Trailers' / 'Heat (1995)-trailer.mp4').write_bytes(b'old')
+    assert download_trailer(make_settings(), heat_target(movie_folder)) == DL_OK
+    assert FakeYDL.searched == []
+
+
+def test_download_trailer_no_usable_candidate(make_settings, movie_folder, monkeypatch):
+    monkeypatch.setattr(FakeYDL, 'search', staticmethod(lambda q: [dict(v) for v in HEAT_RESULTS[:2]]))
+    settings = make_settings()
+    target = heat_target(movie_folder)
+    assert download_trailer(settings, target) == DL_NO_MATCH
+    assert FakeYDL.downloaded == []
+    # Every query is remembered as having no usable result
+    for query in target.search_queries(settings):
+        assert settings.search_cache.get(query)[0] == OUTCOME_NO_MATCH
+
+
+def test_download_trailer_search_failure(make_settings, movie_folder, monkeypatch):
+    def search(query):
+        raise RuntimeError('Unable to download API page: HTTP Error 503')
+    monkeypatch.setattr(FakeYDL, 'search', staticmethod(search))
+    assert download_trailer(make_settings(), heat_target(movie_folder)) == DL_ERROR
+
+
+def test_download_trailer_empty_search(make_settings, movie_folder, monkeypatch):
+    monkeypatch.setattr(FakeYDL, 'search', staticmethod(lambda q: None))
+    assert download_trailer(make_settings(), heat_target(movie_folder)) == DL_ERROR
+
+
+def test_download_trailer_format_unavailable_is_no_match(make_settings, movie_folder, monkeypatch):
+    monkeypatch.setattr(FakeYDL, 'download_hook', fail_with(FORMAT_UNAVAILABLE))
+    assert download_trailer(make_settings(), heat_target(movie_folder)) == DL_NO_MATCH
+    assert set(FakeYDL.downloaded) == {'https://www.youtube.com/watch?v=official', 'https://www.youtube.com/watch?v=fan'}
+    assert trailer_names(movie_folder) == []
+
+
+def test_download_trailer_format_unavailable_tries_next(make_settings, movie_folder, monkeypatch):
+    def hook(url, outtmpl):
+        if url.endswith('official'):
+            fail_with(FORMAT_UNAVAILABLE).__func__(url, outtmpl)
+        return write_file(url, outtmpl)
+    monkeypatch.setattr(FakeYDL, 'download_hook', staticmethod(hook))
+    assert download_trailer(make_settings(), heat_target(movie_folder)) == DL_OK
+    assert FakeYDL.downloaded[-1] == 'https://www.youtube.com/watch?v=fan'
+
+
+def test_download_trailer_download_failure_is_error(make_settings, movie_folder, monkeypatch):
+    monkeypatch.setattr(FakeYDL, 'download_hook', fail_with(HTTP_ERROR))
+    assert download_trailer(make_settings(), heat_target(movie_folder)) == DL_ERROR
+
+
+def test_download_trailer_deferred(make_settings, movie_folder):
+    job = download_trailer(make_settings(), heat_target(movie_folder), defer=True)
+    assert callable(job)
+    assert FakeYDL.downloaded == []
+    assert job() == DL_OK
+    assert trailer_names(movie_folder) == ['Heat (1995)-trailer.mkv']
+
+
+def test_download_trailer_cancelled(make_settings, movie_folder):
+    cancel = threading.Event()
+    cancel.set()
+    assert download_trailer(make_settings(), heat_target(movie_folder), cancel=cancel) == DL_ERROR
+    assert FakeYDL.searched == []
+
+
+# ── check_item / settle_download outcomes ─────────────────────────────────
+
+class FakeTracker:
+    def __init__(self):
+        self.attempts = {}
+        self.added = []
+
+    def mark_upgrade_attempt(self, rating_key, attempted_min):
+        self.attempts[str(rating_key)] = {"attempted_min": attempted_min, "attempted_at": "2026-01-01T00:00:00"}
+
+    def get_upgrade_attempt(self, rating_key):
+        return self.attempts.get(str(rating_key))
+
+    def add_trailer(self, **kwargs):
+        self.added.append(kwargs)
+
+
+def heat_item(movie_folder, genres=()):
+    return SimpleNamespace(title='Heat', year=1995, type='movie', ratingKey=42,
+                           genres=[SimpleNamespace(tag=g) for g in genres],
+                           locations=[str(movie_folder / 'Heat (1995).mkv')])
+
+
+@pytest.mark.parametrize('outcome, needs_upgrade, status, marked', [
+    (DL_OK, False, ITEM_DOWNLOADED, False),
+    (DL_OK, True, ITEM_DOWNLOADED, False),
+    (DL_NO_MATCH, False, ITEM_FAILED, False),
+    (DL_ERROR, False, ITEM_FAILED, False),
+    (DL_KEPT_BELOW_MIN, True, ITEM_UPGRADED_BELOW_MIN, True),
+    (DL_NO_MATCH, True, ITEM_UPGRADE_NO_MATCH, True),
+    (DL_ERROR, True, ITEM_UPGRADE_ERROR, False),
+])
+def test_settle_download(make_settings, movie_folder, outcome, needs_upgrade, status, marked):
+    tracker = FakeTracker()
+    settings = make_settings(TRAILER_RESOLUTION_MIN=1080)
+    assert settle_download(settings, heat_item(movie_folder), outcome, needs_upgrade, False, tracker) == (status, False)
+    assert tracker.attempts == ({"42": {"attempted_min": 1080, "attempted_at": "2026-01-01T00:00:00"}}
+                                if marked else {})
+
+
+def test_check_item_skips_genre(make_settings, movie_folder):
+    item = heat_item(movie_folder, genres=['Crime', 'Documentary'])
+    assert check_item(make_settings(), item, ['documentary'], FakeTracker()) == (ITEM_SKIPPED, False)
+
+
+def test_check_item_missing_without_downloads(make_settings, movie_folder):
+    settings = make_settings(DOWNLOAD_TRAILERS=False)
+    assert check_item(settings, heat_item(movie_folder), [], FakeTracker()) == (ITEM_MISSING, False)
+
+
+def test_check_item_downloads_missing_trailer(make_settings, movie_folder):
+    tracker = FakeTracker()
+    assert check_item(make_settings(), heat_item(movie_folder), [], tracker) == (ITEM_DOWNLOADED, False)
+    assert [t['plex_rating_key'] for t in tracker.added] == ['42']
+
+
+def test_check_item_failed_download(make_settings, movie_folder, monkeypatch):
+    monkeypatch.setattr(FakeYDL, 'search', staticmethod(lambda q: None))
+    assert check_item(make_settings(), heat_item(movie_folder), [], FakeTracker()) == (ITEM_FAILED, False)
+
+
+def test_check_item_has_trailer(make_settings, movie_folder):
+    (movie_folder / 'Heat (1995)-trailer.mkv').write_bytes(b'old')
+    assert check_item(make_settings(), heat_item(movie_folder), [], FakeTracker()) == (ITEM_HAS_TRAILER, False)
+    assert FakeYDL.searched == []
+
+
+def test_check_item_upgrade_without_better_source(make_settings, movie_folder, monkeypatch):
+    (movie_folder / 'Heat (1995)-trailer.mkv').write_bytes(b'old')
+    monkeypatch.setattr(FakeYDL, 'search', staticmethod(lambda q: [dict(v) for v in HEAT_RESULTS[:2]]))
+    settings = make_settings(UPGRADE_TRAILERS='local')
+    tracker = FakeTracker()
+    assert check_item(settings, heat_item(movie_folder), [], tracker) == (ITEM_UPGRADE_NO_MATCH, False)
+    assert tracker.get_upgrade_attempt(42)["attempted_min"] == 1080
+    # Not retried until the minimum is raised
+    searched = len(FakeYDL.searched)
+    assert check_item(settings, heat_item(movie_folder), [], tracker) == (ITEM_HAS_TRAILER, False)
+    assert len(FakeYDL.searched) == searched
+
+
+@pytest.mark.parametrize('message, status, attempted', [
+    (FORMAT_UNAVAILABLE, ITEM_UPGRADE_NO_MATCH, True),
+    (HTTP_ERROR, ITEM_UPGRADE_ERROR, False),
+])
+def test_check_item_upgrade_download_failures(make_settings, movie_folder, monkeypatch,
+                                              message, status, attempted):
+    (movie_folder / 'Heat (1995)-trailer.mkv').write_bytes(b'old')
+    monkeypatch.setattr(FakeYDL, 'download_hook', fail_with(message))
+    tracker = FakeTracker()
+    settings = make_settings(UPGRADE_TRAILERS='local')
+    assert check_item(settings, heat_item(movie_folder), [], tracker) == (status, False)
+    # Only a finished search without a usable format waits for a higher minimum
+    assert (tracker.get_upgrade_attempt(42) is not None) is attempted
+    assert (movie_folder / 'Heat (1995)-trailer.mkv').read_bytes() == b'old'
@@ -0,0 +1,178 @@
+"""TrailerTracker: import of the legacy trailers.json, and the incremental directory scan."""
+
+import json
+import os
+import shutil
+
+from Modules.trailer_tracker import TrailerTracker
+
+LEGACY = {
+    "trailers": [
+        {"file_path": "/movies/Alien (1979)/Trailers/Alien (1979)-trailer.mp4", "title": "Alien",
+         "year": "1979", "media_type": "movie", "plex_rating_key": "11",
+         "downloaded_at": "2024-01-01T10:00:00"},
+        {"file_path": "/tv/Severance/Trailers/Severance-trailer.mkv", "title": "Severance",
+         "year": 2022, "media_type": "tvshow", "plex_rating_key": "12",
+         "poster_url": "/library/metadata/12/thumb", "downloaded_at": "2024-02-01T10:00:00"},
+        # Later entries won in the JSON list
+        {"file_path": "/movies/Alien (1979)/Trailers/Alien (1979)-trailer.mp4", "title": "Alien",
+         "year": "1979", "plex_rating_key": "11", "downloaded_at": "2024-03-01T10:00:00"},
+        {"title": "no path"},
+        "not an entry",
+    ],
+    "upgrade_attempts": {
+        "11": {"attempted_min": 1080, "attempted_at": "2024-03-02T10:00:00"},
+        "13": {"attempted_min": "not a number"},
+        "14": None,
+    },
+}
+
+
+def write_legacy(config_dir, data=LEGACY):
+    path = config_dir / 'trailers.json'
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return path
+
+
+def test_json_migration(tmp_path):
+    json_path = write_legacy(tmp_path)
+    tracker = TrailerTracker(str(tmp_path / 'trailers.db'))
+
+    trailers = {t["file_path"]: t for t in tracker.get_all()}
+    assert set(trailers) == {"/movies/Alien (1979)/Trailers/Alien (1979)-trailer.mp4",
+                             "/tv/Severance/Trailers/Severance-trailer.mkv"}
+    alien = trailers["/movies/Alien (1979)/Trailers/Alien (1979)-trailer.mp4"]
+    assert alien["downloaded_at"] == "2024-03-01T10:00:00"
+    assert alien["media_type"] == "movie"
+    assert alien["poster_url"] == ""
+    severance = trailers["/tv/Severance/Trailers/Severance-trailer.mkv"]
+    assert (severance["year"], severance["media_type"], severance["poster_url"]) == (
+        "2022", "tvshow", "/library/metadata/12/thumb")
+
+    assert tracker.get_upgrade_attempt("11") == {"attempted_min": 1080, "attempted_at": "2024-03-02T10:00:00"}
+    assert tracker.was_upgrade_attempted(11, 720)
+    assert tracker.get_upgrade_attempt("13") is None
+    assert tracker.get_upgrade_attempt("14") is None
+
+    assert not json_path.exists()
+    assert (tmp_path / 'trailers.json.migrated').exists()
+
+
+def test_json_migration_runs_once(tmp_path):
+    write_legacy(tmp_path)
+    TrailerTracker(str(tmp_path / 'trailers.db'))
+    # A trailers.json that reappears (e.g. restored from a backup) is not imported again
+    json_path = write_legacy(tmp_path, {"trailers": [{"file_path": "/movies/Other-trailer.mp4"}]})
+    tracker = TrailerTracker(str(tmp_path / 'trailers.db'))
+    assert tracker.count() == 2
+    assert json_path.exists()
+
+
+def test_legacy_json_path_uses_database_next_to_it(tmp_path):
+    json_path = write_legacy(tmp_path)
+    tracker = TrailerTracker(str(json_path))
+    assert os.path.exists(tmp_path / 'trailers.db')
+    assert tracker.count() == 2
+
+
+def test_unreadable_json_is_set_aside(tmp_path):
+    (tmp_path / 'trailers.json').write_text('{not json', encoding='utf-8')
+    tracker = TrailerTracker(str(tmp_path / 'trailers.db'))
+    assert tracker.count() == 0
+    assert (tmp_path / 'trailers.json.migrated').exists()
+
+
+# ── Incremental scan ──────────────────────────────────────────────────────
+
+# Directory mtimes before the first scan; any real change afterwards differs
+PAST_NS = 1_600_000_000 * 10**9
+
+
+def set_old_mtimes(root):
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, ns=(PAST_NS, PAST_NS))
+
+
+def make_library(tmp_path):
+    """Two movie folders, one with a trailer in Trailers/, and a tracker."""
+    root = tmp_path / 'movies'
+    (root / 'Alien (1979)' / 'Trailers').mkdir(parents=True)
+    (root / 'Alien (1979)' / 'Alien (1979).mkv').write_bytes(b'movie')
+    (root / 'Alien (1979)' / 'Trailers' / 'Alien (1979)-trailer.mp4').write_bytes(b'trailer')
+    (root / 'Heat (1995)').mkdir()
+    (root / 'Heat (1995)' / 'Heat (1995).mkv').write_bytes(b'movie')
+    set_old_mtimes(root)
+    return root, TrailerTracker(str(tmp_path / 'config' / 'trailers.db'))
+
+
+def indexed(tracker, root):
+    return sorted(os.path.relpath(t["file_path"], root) for t in tracker.get_all())
+
+
+def test_first_scan_indexes_trailers(tmp_path):
+    root, tracker = make_library(tmp_path)
+    assert tracker.scan_directories([str(root)]) == 1
+    assert indexed(tracker, root) == ['Alien (1979)/Trailers/Alien (1979)-trailer.mp4']
+    row = tracker.get_all()[0]
+    assert (row["title"], row["year"], row["media_type"]) == ("Alien", "1979", "movie")
+    assert tracker.scan_directories([str(root)]) == 0
+    assert indexed(tracker, root) == ['Alien (1979)/Trailers/Alien (1979)-trailer.mp4']
+
+
+def test_touched_trailer_is_not_indexed_twice(tmp_path):
+    root, tracker = make_library(tmp_path)
+    tracker.scan_directories([str(root)])
+    trailer = root / 'Alien (1979)' / 'Trailers' / 'Alien (1979)-trailer.mp4'
+    os.utime(trailer)
+    assert tracker.scan_directories([str(root)]) == 0
+    # Replaced in place by a new download: the folder is listed again, still one entry
+    (trailer.parent / 'new.part').write_bytes(b'new trailer')
+    os.replace(trailer.parent / 'new.part', trailer)
+    assert os.stat(trailer.parent).st_mtime_ns != PAST_NS
+    assert tracker.scan_directories([str(root)]) == 0
+    assert indexed(tracker, root) == ['Alien (1979)/Trailers/Alien (1979)-trailer.mp4']
+
+
+def test_added_trailer_is_found(tmp_path):
+    root, tracker = make_library(tmp_path)
+    tracker.scan_directories([str(root)])
+    (root / 'Heat (1995)' / 'Trailers').mkdir()
+    (root / 'Heat (1995)' / 'Trailers' / 'Heat (1995)-trailer.mkv').write_bytes(b'trailer')
+    assert tracker.scan_directories([str(root)]) == 1
+    # Added to an existing Trailers/ folder: only that folder's mtime changes
+    (root / 'Alien (1979)' / 'Trailers' / 'Alien (1979) Teaser-trailer.webm').write_bytes(b'teaser')
+    assert os.stat(root / 'Alien (1979)').st_mtime_ns == PAST_NS
+    assert tracker.scan_directories([str(root)]) == 1
+    assert indexed(tracker, root) == ['Alien (1979)/Trailers/Alien (1979) Teaser-trailer.webm',
+                                      'Alien (1979)/Trailers/Alien (1979)-trailer.mp4',
+                                      'Heat (1995)/Trailers/Heat (1995)-trailer.mkv']
+
+
+def test_deleted_trailer_is_dropped(tmp_path):
+    root, tracker = make_library(tmp_path)
+    trailers = root / 'Alien (1979)' / 'Trailers'
+    (trailers / 'Alien (1979) Teaser-trailer.webm').write_bytes(b'teaser')
+    set_old_mtimes(root)
+    assert tracker.scan_directories([str(root)]) == 2
+    os.remove(trailers / 'Alien (1979)-trailer.mp4')
+    assert tracker.scan_directories([str(root)]) == 0
+    assert indexed(tracker, root) == ['Alien (1979)/Trailers/Alien (1979) Teaser-trailer.webm']
+    # A deleted folder takes its trailers and stored state with it
+    shutil.rmtree(trailers)
+    assert tracker.scan_directories([str(root)]) == 0
+    assert indexed(tracker, root) == []
+    trailers.mkdir()
+    (trailers / 'Alien (1979)-trailer.mp4').write_bytes(b'trailer')
+    assert tracker.scan_directories([str(root)]) == 1
+
+
+def test_reset_scan_state_lists_everything_again(tmp_path):
+    root, tracker = make_library(tmp_path)
+    tracker.scan_directories([str(root)])
+    # A change that leaves every directory mtime alone is only seen after a reset
+    conn = tracker._conn()
+    with conn:
+        conn.execute("DELETE FROM trailers")
+    assert tracker.scan_directories([str(root)]) == 0
+    tracker.reset_scan_state()
+    assert tracker.scan_directories([str(root)]) == 1
@@ -0,0 +1,142 @@
+"""read_video_info on small MP4 and Matroska files built in the test."""
+
+import struct
+
+import pytest
+
+from Modules.video_header import read_dimensions, read_video_info
+
+
+# ── MP4 ───────────────────────────────────────────────────────────────────
+
+def box(box_type, payload=b''):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def mvhd(timescale, duration):
+    # version 0: version/flags, creation and modification time, timescale, duration
+    return box(b'mvhd', struct.pack('>IIIII', 0, 0, 0, timescale, duration) + bytes(80))
+
+
+def tkhd(width, height):
+    # The last 8 bytes are the 16.16 fixed-point display width and height
+    return box(b'tkhd', bytes(76) + struct.pack('>II', width << 16, height << 16))
+
+
+def hdlr(handler):
+    return box(b'hdlr', bytes(8) + handler + bytes(12) + b'\0')
+
+
+def stsd(fourcc, width, height):
+    # Visual sample entry: reserved/data reference index (8), pre-defined/reserved
+    # (16), then width and height, then the rest of its 86 bytes
+    entry = fourcc + bytes(8) + bytes(16) + struct.pack('>HH', width, height) + bytes(50)
+    return box(b'stsd', struct.pack('>II', 0, 1) + struct.pack('>I', 4 + len(entry)) + entry)
+
+
+def trak(handler, fourcc=b'avc1', width=0, height=0, tkhd_size=(0, 0)):
+    stbl = box(b'stbl', stsd(fourcc, width, height))
+    mdia = box(b'mdia', hdlr(handler) + box(b'minf', stbl))
+    return box(b'trak', tkhd(*tkhd_size) + mdia)
+
+
+def mp4(*traks, timescale=1000, duration=30000, faststart=True):
+    ftyp = box(b'ftyp', b'isom' + struct.pack('>I', 512) + b'isomiso2avc1mp41')
+    moov = box(b'moov', mvhd(timescale, duration) + b''.join(traks))
+    mdat = box(b'mdat', bytes(4000))
+    return ftyp + (moov + mdat if faststart else mdat + moov)
+
+
+# ── Matroska ──────────────────────────────────────────────────────────────
+
+def element(element_id, payload):
+    if len(payload) < 0x7F:
+        size = bytes([0x80 | len(payload)])
+    else:
+        size = b'\x01' + len(payload).to_bytes(7, 'big')
+    return element_id + size + payload
+
+
+def uint_element(element_id, value, length=1):
+    return element(element_id, value.to_bytes(length, 'big'))
+
+
+def mkv(codec_id=b'V_VP9', width=1920, height=800, duration_ms=12500.0, unknown_size=False,
+        tracks_after_cluster=False):
+    ebml_header = element(b'\x1A\x45\xDF\xA3', element(b'\x42\x82', b'webm'))
+    info = element(b'\x15\x49\xA9\x66',
+                   uint_element(b'\x2A\xD7\xB1', 1000000, 3) + element(b'\x44\x89', struct.pack('>d', duration_ms)))
+    audio = element(b'\xAE', uint_element(b'\x83', 2) + element(b'\x86', b'A_OPUS'))
+    video = element(b'\xAE', uint_element(b'\x83', 1) + element(b'\x86', codec_id)
+                    + element(b'\xE0', uint_element(b'\xB0', width, 2) + uint_element(b'\xBA', height, 2)))
+    tracks = element(b'\x16\x54\xAE\x6B', audio + video)
+    cluster = element(b'\x1F\x43\xB6\x75', uint_element(b'\xE7', 0) + element(b'\xA3', bytes(3000)))
+    body = info + (cluster + tracks if tracks_after_cluster else tracks + cluster)
+    if unknown_size:
+        segment = b'\x18\x53\x80\x67' + b'\x01\xFF\xFF\xFF\xFF\xFF\xFF\xFF' + body
+    else:
+        segment = element(b'\x18\x53\x80\x67', body)
+    return ebml_header + segment
+
+
+@pytest.fixture
+def write(tmp_path):
+    def _write(name, data):
+        path = tmp_path / name
+        path.write_bytes(data)
+        return str(path)
+    return _write
+
+
+def test_mp4_sample_entry(write):
+    data = mp4(trak(b'soun', b'mp4a'), trak(b'vide', b'avc1', 1920, 1080))
+    info = read_video_info(write('a.mp4', data))
+    assert info == {'width': 1920, 'height': 1080, 'codec': 'h264', 'duration': 30.0,
+                    'bitrate': int(len(data) * 8 / 30.0)}
+
+
+def test_mp4_moov_at_end(write):
+    path = write('b.mp4', mp4(trak(b'vide', b'hvc1', 3840, 1608), faststart=False))
+    info = read_video_info(path)
+    assert (info['width'], info['height'], info['codec']) == (3840, 1608, 'hevc')
+
+
+def test_mp4_tkhd_fallback(write):
+    path = write('c.mp4', mp4(trak(b'vide', b'avc1', 0, 0, tkhd_size=(1280, 720))))
+    assert read_dimensions(path) == (1280, 720)
+
+
+def test_mp4_without_video_track(write):
+    assert read_video_info(write('d.m4a', mp4(trak(b'soun', b'mp4a')))) is None
+
+
+def test_mkv_video_track(write):
+    data = mkv()
+    info = read_video_info(write('a.webm', data))
+    assert info == {'width': 1920, 'height': 800, 'codec': 'vp9', 'duration': 12.5,
+                    'bitrate': int(len(data) * 8 / 12.5)}
+
+
+def test_mkv_unknown_size_segment(write):
+    info = read_video_info(write('b.mkv', mkv(codec_id=b'V_MPEG4/ISO/AVC', width=1280, height=536,
+                                              unknown_size=True)))
+    assert (info['width'], info['height'], info['codec']) == (1280, 536, 'h264')
+
+
+def test_mkv_tracks_after_cluster_left_to_ffprobe(write):
+    assert read_video_info(write('c.mkv', mkv(tracks_after_cluster=True))) is None
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'RIFF' + bytes(60),                      # AVI
+    bytes(8) + b'not a video file at all',
+    mp4(trak(b'vide', b'avc1', 1920, 1080))[:60],  # moov cut off
+    mkv()[:40],                               # Tracks cut off
+])
+def test_unreadable_returns_none(write, data):
+    assert read_video_info(write('x.bin', data)) is None
+
+
+def test_missing_file(tmp_path):
+    assert read_video_info(str(tmp_path / 'missing.mp4')) is None
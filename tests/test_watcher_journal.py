@@ -0,0 +1,61 @@
+"""WatcherJournal round trip: pending items, cooldown expiry and meta."""
+
+import sqlite3
+import time
+
+from Modules.watcher_journal import WatcherJournal
+
+
+def test_load_without_journal(tmp_path):
+    journal = WatcherJournal(str(tmp_path / 'watcher_queue.db'))
+    assert journal.load() == ({}, {})
+    assert journal.get_meta() == {}
+
+
+def test_load_drops_expired_cooldowns(tmp_path):
+    path = str(tmp_path / 'watcher_queue.db')
+    journal = WatcherJournal(path)
+    now = time.time()
+    journal.save_cooldown(101, now - 60)
+    journal.save_cooldown(102, now + 600)
+    journal.save_cooldown(103, now - 1)
+
+    pending, cooldown = WatcherJournal(path).load()
+    assert pending == {}
+    assert cooldown == {102: now + 600}
+    # Expired rows are deleted, not just skipped
+    with sqlite3.connect(path) as conn:
+        assert [rk for rk, in conn.execute('SELECT rating_key FROM cooldown')] == [102]
+
+
+def test_pending_round_trip(tmp_path):
+    path = str(tmp_path / 'watcher_queue.db')
+    journal = WatcherJournal(path)
+    now = time.time()
+    journal.save_pending([
+        ('201', {'due': now + 60, 'first_seen': now, 'section': '1'}),
+        (202, {'due': now + 30, 'first_seen': now - 30, 'section': '2'}),
+    ])
+    # A queued item has no cooldown, even if one was saved before it was queued again
+    journal.save_cooldown(202, now + 600)
+    journal.remove_pending(999)
+
+    pending, cooldown = WatcherJournal(path).load()
+    assert pending == {
+        201: {'due': now + 60, 'first_seen': now, 'section': '1'},
+        202: {'due': now + 30, 'first_seen': now - 30, 'section': '2'},
+    }
+    assert cooldown == {}
+
+    journal.remove_pending(202)
+    assert set(journal.load()[0]) == {201}
+    assert journal.load()[1] == {202: now + 600}
+    journal.clear_pending()
+    assert journal.load()[0] == {}
+
+
+def test_meta(tmp_path):
+    journal = WatcherJournal(str(tmp_path / 'watcher_queue.db'))
+    journal.set_meta(last_seen=100.0, last_event=90.0)
+    journal.set_meta(last_seen=200.0)
+    assert journal.get_meta() == {'last_seen': 200.0, 'last_event': 90.0}
@@ -1,10 +1,14 @@
 """MTDP Web UI - Flask-based interface."""
 
+import atexit
 import logging
 import os
+import queue
 import re
 import sys
 import threading
+import time
+from datetime import datetime
 
 _app = None
 _scheduler_state = None
@@ -15,53 +19,154 @@ _version = None
 _watcher = None
 
 
+class _LogWriter:
+    """Append log text to mtdp.log from a background thread.
+
+    Writers only put chunks on a queue, so output from the scan loops never
+    waits on disk I/O. The thread keeps the file open, assembles whole lines
+    per stream, strips ANSI colour codes and adds the timestamp once per line,
+    writes in batches and flushes at most every FLUSH_SECONDS. Text without a
+    newline is written once it has been waiting FLUSH_SECONDS, so progress
+    output still shows up. When the file grows past MAX_BYTES it is moved to
+    mtdp.log.1 (replacing the previous one) and a new file is started.
+    """
+
+    FLUSH_SECONDS = 0.5
+    MAX_BYTES = 10 * 1024 * 1024
+
+    _ANSI_RE = re.compile(r'\x1b\[[0-9;]*m')
+
+    def __init__(self, log_path):
+        self._log_path = log_path
+        self._queue = queue.SimpleQueue()
+        # stream id -> [buffered text, time its first chunk arrived, at line start]
+        self._streams = {}
+        self._file = None
+        self._dirty = False
+        self._last_flush = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True, name="log-writer")
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, stream_id, data):
+        self._queue.put((stream_id, data, time.time()))
+
+    def close(self):
+        """Write out everything queued so far and stop the thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.FLUSH_SECONDS)
+            except queue.Empty:
+                item = ()
+            out = []
+            stop = False
+            while item is not None:
+                if item:
+                    self._take(out, *item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                stop = True
+            self._take_partial_lines(out, flush_all=stop)
+            try:
+                self._write(''.join(out), force_flush=stop)
+            except Exception:
+                pass
+            if stop:
+                if self._file is not None:
+                    try:
+                        self._file.close()
+                    except Exception:
+                        pass
+                return
+
+    def _take(self, out, stream_id, data, ts):
+        state = self._streams.get(stream_id)
+        if state is None:
+            state = self._streams[stream_id] = ['', ts, True]
+        if not state[0]:
+            state[1] = ts
+        pending = state[0] + data
+        lines = pending.split('\n')
+        state[0] = lines.pop()
+        for line in lines:
+            self._emit(out, state, line, state[1])
+            out.append('\n')
+            state[2] = True
+            state[1] = ts
+
+    def _take_partial_lines(self, out, flush_all=False):
+        now = time.time()
+        for state in self._streams.values():
+            if state[0] and (flush_all or now - state[1] >= self.FLUSH_SECONDS):
+                self._emit(out, state, state[0], state[1])
+                state[0] = ''
+
+    def _emit(self, out, state, text, ts):
+        text = self._ANSI_RE.sub('', text)
+        if not text:
+            return
+        if state[2]:
+            stamp = datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+            out.append(f'[{stamp}] {text}')
+        else:
+            out.append(text)
+        state[2] = False
+
+    def _write(self, text, force_flush=False):
+        if text:
+            if self._file is None:
+                self._file = open(self._log_path, 'a', encoding='utf-8')
+            self._file.write(text)
+            self._dirty = True
+        now = time.monotonic()
+        if self._dirty and (force_flush or now - self._last_flush >= self.FLUSH_SECONDS):
+            self._file.flush()
+            self._dirty = False
+            self._last_flush = now
+            if self._file.tell() > self.MAX_BYTES:
+                self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        try:
+            os.replace(self._log_path, self._log_path + '.1')
+        except OSError:
+            pass
+        self._file = open(self._log_path, 'a', encoding='utf-8')
+
+
 class _TeeWriter:
-    """Write to both the original stream and a log file.
+    """Write to both the original stream and the log file.
 
     Werkzeug API access-log lines are written to the log file but
     suppressed from the console (Docker stdout) to reduce noise.
-    Log lines are prefixed with timestamps for the web UI.
+    The log file side goes through a shared _LogWriter, which adds
+    timestamps for the web UI.
     """
 
     _API_LOG_RE = re.compile(
         r'\d+\.\d+\.\d+\.\d+\s+-\s+-\s+\[.*?\]\s+"'
         r'(GET|POST|PUT|DELETE|PATCH|HEAD|OPTIONS)\s+/api/'
     )
-    _ANSI_RE = re.compile(r'\x1b\[[0-9;]*m')
 
-    def __init__(self, original, log_path):
+    def __init__(self, original, log_writer):
         self._original = original
-        self._log_path = log_path
-        self._lock = threading.Lock()
-        self._at_line_start = True
+        self._log_writer = log_writer
 
     def write(self, data):
         # Always persist to log file
         if data:
-            from datetime import datetime
-            cleaned = self._ANSI_RE.sub('', data)
-            with self._lock:
-                try:
-                    with open(self._log_path, 'a', encoding='utf-8') as f:
-                        # Add timestamps at the start of each new line
-                        lines = cleaned.split('\n')
-                        for i, line in enumerate(lines):
-                            if i > 0:
-                                f.write('\n')
-                                self._at_line_start = True
-                            if line:
-                                if self._at_line_start:
-                                    ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                                    f.write(f'[{ts}] {line}')
-                                else:
-                                    f.write(line)
-                                self._at_line_start = False
-                        if cleaned.endswith('\n'):
-                            self._at_line_start = True
-                except Exception:
-                    pass
+            self._log_writer.write(id(self), data)
             # Suppress noisy API polling lines from console
-            if self._API_LOG_RE.search(data):
+            if '/api/' in data and self._API_LOG_RE.search(data):
                 return
         self._original.write(data)
 
@@ -107,8 +212,9 @@ def start_webui(scheduler_state=None, config_path=None, trailer_tracker=None,
     except Exception:
         pass
 
-    sys.stdout = _TeeWriter(sys.stdout, _log_path)
-    sys.stderr = _TeeWriter(sys.stderr, _log_path)
+    log_writer = _LogWriter(_log_path)
+    sys.stdout = _TeeWriter(sys.stdout, log_writer)
+    sys.stderr = _TeeWriter(sys.stderr, log_writer)
 
     template_dir = os.path.join(os.path.dirname(__file__), 'templates')
     static_dir = os.path.join(os.path.dirname(__file__), 'static')
@@ -0,0 +1,159 @@
+"""Server-Sent Events push channel for the web UI.
+
+Every open page used to poll /api/status every 3 seconds and /api/log every
+5 seconds. Instead, one background thread samples the status (scheduler,
+cache refresh and scan progress, watcher) and tails mtdp.log once a second
+while at least one page is connected, and pushes an event to all of them
+only when something changed:
+
+- status -- the /api/status payload; the countdown to the next run is compared
+            at minute resolution, which is all the page shows.
+- log    -- {"lines": [...]} with the log lines written since the last event.
+
+Each page holds one long-lived /api/events response; a page that stops
+reading is dropped and its EventSource reconnects with a fresh snapshot.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+# Events queued per subscriber before it is considered stalled and dropped
+_QUEUE_SIZE = 256
+# Comment line sent when idle, so proxies and browsers keep the stream open
+_KEEPALIVE_SECONDS = 15
+# Cap on log bytes read per sample (after a burst the page refetches /api/log)
+_MAX_LOG_READ = 256 * 1024
+
+
+def format_event(event, data):
+    """Encode one SSE message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class EventHub:
+    """Samples status and the log on one thread and fans changes out to subscribers.
+
+    status_fn() returns the status dict, log_path_fn() the current log file path
+    (or None) and skip_log_line(line) tells which log lines not to push.
+    """
+
+    def __init__(self, status_fn, log_path_fn, skip_log_line=None, interval=1.0):
+        self._status_fn = status_fn
+        self._log_path_fn = log_path_fn
+        self._skip_log_line = skip_log_line or (lambda line: False)
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+        self._last_status_key = None
+        self._log_pos = None
+        self._log_partial = b""
+
+    # ── Subscribers ───────────────────────────────────────────────────────
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(q)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="webui-events")
+                self._thread.start()
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def stream(self, q):
+        """Yield the SSE messages for one subscriber, starting with a status snapshot."""
+        try:
+            yield format_event("status", self._status_fn())
+            while True:
+                try:
+                    message = q.get(timeout=_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    with self._lock:
+                        if q not in self._subscribers:
+                            return
+                    yield ": keepalive\n\n"
+                    continue
+                yield message
+        finally:
+            self.unsubscribe(q)
+
+    def _publish(self, event, data):
+        message = format_event(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                # The page stopped reading; drop it, its stream ends at the
+                # next keepalive and the browser reconnects.
+                self.unsubscribe(q)
+
+    # ── Sampler ───────────────────────────────────────────────────────────
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    # Start from the then-current log end when pages return
+                    self._log_pos = None
+                    self._log_partial = b""
+                    self._last_status_key = None
+                    return
+            try:
+                self._sample_status()
+            except Exception:
+                pass
+            try:
+                self._sample_log()
+            except Exception:
+                pass
+            time.sleep(self._interval)
+
+    def _sample_status(self):
+        status = self._status_fn()
+        compared = dict(status)
+        if compared.get("next_run_seconds") is not None:
+            compared["next_run_seconds"] //= 60
+        key = json.dumps(compared, sort_keys=True, default=str)
+        if key != self._last_status_key:
+            if self._last_status_key is not None:
+                self._publish("status", status)
+            self._last_status_key = key
+
+    def _sample_log(self):
+        path = self._log_path_fn()
+        if not path:
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if self._log_pos is None:
+            # Pages load the existing lines from /api/log; start at the end.
+            self._log_pos = size
+            return
+        if size < self._log_pos:
+            # Rotated or truncated: the new file's lines are all new.
+            self._log_pos = 0
+            self._log_partial = b""
+        if size == self._log_pos:
+            return
+        with open(path, 'rb') as f:
+            f.seek(max(self._log_pos, size - _MAX_LOG_READ))
+            data = self._log_partial + f.read(size - f.tell())
+        self._log_pos = size
+        lines = data.split(b'\n')
+        self._log_partial = lines.pop()
+        lines = [line.decode('utf-8', errors='replace') for line in lines]
+        lines = [line + '\n' for line in lines if not self._skip_log_line(line)]
+        if lines:
+            self._publish("log", {"lines": lines})
@@ -1,5 +1,7 @@
 """Flask routes and config metadata for MTDP Web UI."""
 
+import bisect
+import hashlib
 import os
 import re
 import json
@@ -9,6 +11,7 @@ import threading
 import yaml
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from flask import render_template, jsonify, request, Response
 
@@ -19,22 +22,13 @@ MTDP_DEBUG = os.environ.get('MTDP_DEBUG', 'false').lower() == 'true'
 
 
 def _normalize_path(path):
-    """Normalize paths for Docker compatibility (mirrors Movies.py logic).
+    """Normalize paths for Docker compatibility (same rules as Movies.py/TV.py).
 
     Unix paths (starting with /) are returned as-is.
     Windows paths are converted: D:\\Movies\\... → /D/Movies/...
     """
-    if not IS_DOCKER:
-        return path
-    if not path or path.startswith('/'):
-        return path
-    drive_match = re.match(r'^([A-Za-z]):', path)
-    if drive_match:
-        drive_letter = drive_match.group(1).upper()
-        path_without_drive = path[2:]
-        path_normalized = path_without_drive.replace('\\', '/')
-        return f'/{drive_letter}{path_normalized}'
-    return path.replace('\\', '/')
+    from Modules.trailer_core import normalize_path_for_docker
+    return normalize_path_for_docker(path, quiet=True)
 
 
 # ── Library / stats cache ─────────────────────────────────────────────────
@@ -47,6 +41,12 @@ _cache_data = {
 }
 _cache_refreshing = False
 _cache_refresh_pending = False
+_cache_refresh_full_pending = False
+_cache_refresh_lock = threading.Lock()
+_cache_refresh_cancel = threading.Event()
+_cache_progress_lock = threading.Lock()
+# Threads building cache entries (local trailer lookups, ffprobe) during a refresh
+_CACHE_REFRESH_WORKERS = 8
 _cache_progress = {
     "refreshing": False,
     "phase": "",
@@ -57,6 +57,13 @@ _cache_progress = {
 
 _known_trailer_paths = set()
 
+# Sort orders and per-status lists of the cached collections; see _rebuild_library_index()
+_LIBRARY_STATUSES = ("local", "plexpass", "missing")
+_library_index = {}
+_library_index_version = 0
+# (config.yml mtime, per-collection genres_to_skip maps)
+_genres_to_skip_cache = (None, None)
+
 
 def _get_cache_path():
     """Return the path to the cache JSON file."""
@@ -73,9 +80,13 @@ def _load_cache():
         if os.path.exists(path):
             with open(path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
+            if data.get("breakdowns") is None:
+                # Cache files written before the breakdowns were stored
+                data["breakdowns"] = _compute_breakdowns(data.get("movies") or [], data.get("tvshows") or [])
             with _cache_lock:
                 _cache_data = data
                 _rebuild_known_trailer_paths()
+                _rebuild_library_index()
             # Pre-populate allowed-dirs cache from loaded data so the first
             # trailer stream doesn't block on a PlexServer connection.
             _prepopulate_allowed_dirs(data)
@@ -151,6 +162,230 @@ def _rebuild_known_trailer_paths():
     _known_trailer_paths = paths
 
 
+def _title_order_key(item):
+    return (item.get("title", "").lower(), item.get("ratingKey") or 0)
+
+
+def _added_order_key(item):
+    """Newest first; items without a usable addedAt go last."""
+    try:
+        return (0, -datetime.fromisoformat(item.get("addedAt")).timestamp(), item.get("ratingKey") or 0)
+    except (TypeError, ValueError):
+        return (1, 0, item.get("ratingKey") or 0)
+
+
+_LIBRARY_ORDER_KEYS = {"title": _title_order_key, "added": _added_order_key}
+
+
+def _rebuild_library_index():
+    """Precompute the orders the library pages ask for from _cache_data.
+
+    Caller must hold _cache_lock. Per collection it stores the items sorted by
+    title and by addedAt (newest first), both orders again per trailerStatus,
+    and the lowercase title of every item for searching, so a library request
+    only filters and slices. Used after loading or refreshing the whole cache;
+    single-item changes go through _index_replace_item() and
+    _index_move_status(). The version changes on every update and goes into
+    the response ETag.
+    """
+    global _library_index, _library_index_version
+    index = {}
+    for collection in ('movies', 'tvshows'):
+        items = _cache_data.get(collection)
+        if items is None:
+            continue
+        orders = {sort: sorted(items, key=key) for sort, key in _LIBRARY_ORDER_KEYS.items()}
+        by_status = {"all": orders}
+        for status in _LIBRARY_STATUSES:
+            by_status[status] = {sort: [i for i in ordered if i.get("trailerStatus") == status]
+                                 for sort, ordered in orders.items()}
+        index[collection] = {
+            "by_status": by_status,
+            "titles": {i.get("ratingKey"): i.get("title", "").lower() for i in items},
+        }
+    _library_index = index
+    _library_index_version += 1
+
+
+def _index_insert(index, bucket, item):
+    """Insert item into the sorted lists of one bucket ('all' or a status)."""
+    orders = index["by_status"].get(bucket)
+    if orders is None:
+        return
+    for sort, key in _LIBRARY_ORDER_KEYS.items():
+        bisect.insort(orders[sort], item, key=key)
+
+
+def _index_remove(index, bucket, item):
+    """Remove item (by identity) from the sorted lists of one bucket."""
+    orders = index["by_status"].get(bucket)
+    if orders is None:
+        return
+    for sort, key in _LIBRARY_ORDER_KEYS.items():
+        ordered = orders[sort]
+        item_key = key(item)
+        pos = bisect.bisect_left(ordered, item_key, key=key)
+        while pos < len(ordered) and key(ordered[pos]) == item_key:
+            if ordered[pos] is item:
+                del ordered[pos]
+                break
+            pos += 1
+
+
+def _index_replace_item(collection, old_item, new_item):
+    """Swap one cache entry in the library index (old_item may be None). Caller must hold _cache_lock."""
+    global _library_index_version
+    index = _library_index.get(collection)
+    if index is None:
+        return
+    if old_item is not None:
+        for bucket in ("all", old_item.get("trailerStatus")):
+            _index_remove(index, bucket, old_item)
+        index["titles"].pop(old_item.get("ratingKey"), None)
+    for bucket in ("all", new_item.get("trailerStatus")):
+        _index_insert(index, bucket, new_item)
+    index["titles"][new_item.get("ratingKey")] = new_item.get("title", "").lower()
+    _library_index_version += 1
+
+
+def _index_move_status(collection, item, old_status):
+    """Move an entry whose trailerStatus changed in place to its new status lists.
+
+    Caller must hold _cache_lock.
+    """
+    global _library_index_version
+    index = _library_index.get(collection)
+    if index is None:
+        return
+    if old_status != item.get("trailerStatus"):
+        _index_remove(index, old_status, item)
+        _index_insert(index, item.get("trailerStatus"), item)
+    _library_index_version += 1
+
+
+def _genres_to_skip_maps():
+    """Return (config mtime, {collection: {library: [genre, ...]}}) from config.yml.
+
+    The maps are only rebuilt when config.yml changes on disk.
+    """
+    global _genres_to_skip_cache
+    try:
+        mtime = os.stat(webui._config_path).st_mtime_ns
+    except OSError:
+        mtime = 0
+    cached_mtime, maps = _genres_to_skip_cache
+    if maps is not None and cached_mtime == mtime:
+        return mtime, maps
+    config = _load_yaml(webui._config_path)
+    maps = {}
+    for collection, key in (('movies', 'MOVIE_LIBRARIES'), ('tvshows', 'TV_LIBRARIES')):
+        genres_to_skip_map = {}
+        for lib in config.get(key, []):
+            if isinstance(lib, dict):
+                lib_name = lib.get('name', '')
+                skip_genres = [g.lower() for g in lib.get('genres_to_skip', [])]
+                if skip_genres:
+                    genres_to_skip_map[lib_name] = skip_genres
+        maps[collection] = genres_to_skip_map
+    _genres_to_skip_cache = (mtime, maps)
+    return mtime, maps
+
+
+def _is_genre_skipped(item, genres_to_skip_map):
+    """Same rule as isGenreSkipped() in the page: cached flag or a configured genre."""
+    if item.get("genreSkipped"):
+        return True
+    skip_list = genres_to_skip_map.get(item.get("library"))
+    if not skip_list:
+        return False
+    item_genres = [g.lower() for g in (item.get("genres") or [])]
+    return any(g in item_genres for g in skip_list)
+
+
+def _library_response(collection):
+    """Serve /api/library/<collection> from the precomputed index.
+
+    Query parameters: sort (title|added), status or filter (all|local|plexpass|
+    missing), library, resolution, language ('original' = no language tag),
+    q (title search), hide_skipped, and offset/limit for paging. Without
+    limit every matching item is returned. total counts the matching items,
+    collectionTotal the whole collection; facets=1 adds the library names and
+    local trailer languages for the filter menus. Responses carry an ETag of the
+    library state and the normalized query, so repeating a request on an
+    unchanged library answers If-None-Match with 304.
+    """
+    with _cache_lock:
+        index = _library_index.get(collection)
+        version = _library_index_version
+    if index is None:
+        # No cache yet - trigger refresh
+        refresh_library_cache()
+        return jsonify({"items": [], "loading": True})
+
+    args = request.args
+    sort = "added" if args.get("sort") == "added" else "title"
+    status = args.get("status") or args.get("filter", "all")
+    library = args.get("library", "all")
+    resolution = args.get("resolution", "all")
+    language = args.get("language", "all")
+    search = args.get("q", "").strip().lower()
+    hide_skipped = args.get("hide_skipped", "").lower() in ("1", "true", "yes")
+    facets = args.get("facets", "").lower() in ("1", "true", "yes")
+    offset = max(0, args.get("offset", 0, type=int))
+    limit = args.get("limit", type=int)
+    if limit is not None:
+        limit = max(0, limit)
+
+    config_mtime, skip_maps = _genres_to_skip_maps()
+    genres_to_skip_map = skip_maps.get(collection, {})
+    # The ETag names one body: the library state plus the normalized query
+    query = json.dumps([sort, status, library, resolution, language, search,
+                        hide_skipped, facets, offset, limit])
+    query_hash = hashlib.sha1(query.encode('utf-8')).hexdigest()[:16]
+    etag = f"{collection}-{version}-{config_mtime}-{query_hash}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    by_status = index["by_status"]
+    collection_total = len(by_status["all"]["title"])
+    items = by_status.get(status, {}).get(sort, [])
+
+    if library != "all":
+        items = [i for i in items if i.get("library") == library]
+    if resolution != "all":
+        items = [i for i in items if i.get("trailerResolution") == resolution]
+    if language == "original":
+        items = [i for i in items if not i.get("trailerLanguage")]
+    elif language != "all":
+        items = [i for i in items if i.get("trailerLanguage") == language]
+    if search:
+        titles = index["titles"]
+        items = [i for i in items if search in titles.get(i.get("ratingKey"), "")]
+    if hide_skipped:
+        items = [i for i in items if not _is_genre_skipped(i, genres_to_skip_map)]
+
+    total = len(items)
+    if limit is not None:
+        items = items[offset:offset + limit]
+    elif offset:
+        items = items[offset:]
+
+    result = {"items": items, "total": total, "offset": offset, "limit": limit,
+              "collectionTotal": collection_total, "genresToSkip": genres_to_skip_map}
+    if facets:
+        # Choices for the page's library and language filters
+        result["libraries"] = sorted({i.get("library") for i in by_status["all"]["title"] if i.get("library")})
+        result["languages"] = sorted({i.get("trailerLanguage") for i in by_status["local"]["title"]
+                                      if i.get("trailerLanguage")})
+    response = jsonify(result)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
 def _update_cache_item_status(rating_key, new_status, trailer_file=""):
     """Optimistically update a single item's trailer status in the cache.
 
@@ -172,10 +407,13 @@ def _update_cache_item_status(rating_key, new_status, trailer_file=""):
             for item in _cache_data["movies"]:
                 if item.get("ratingKey") == rating_key:
                     old_status = item.get("trailerStatus")
+                    _adjust_breakdowns(item, "movies", -1)
                     item["trailerStatus"] = new_status
                     item["trailerFile"] = trailer_file
                     item["trailerResolution"] = resolution
                     item["trailerLanguage"] = language
+                    _adjust_breakdowns(item, "movies", 1)
+                    _index_move_status("movies", item, old_status)
                     is_movie = True
                     break
 
@@ -184,10 +422,13 @@ def _update_cache_item_status(rating_key, new_status, trailer_file=""):
             for item in _cache_data["tvshows"]:
                 if item.get("ratingKey") == rating_key:
                     old_status = item.get("trailerStatus")
+                    _adjust_breakdowns(item, "tvshows", -1)
                     item["trailerStatus"] = new_status
                     item["trailerFile"] = trailer_file
                     item["trailerResolution"] = resolution
                     item["trailerLanguage"] = language
+                    _adjust_breakdowns(item, "tvshows", 1)
+                    _index_move_status("tvshows", item, old_status)
                     break
 
         # Update stats if status actually changed
@@ -230,41 +471,19 @@ def get_cached_item(rating_key):
     return None
 
 
-_RES_STANDARDS = (240, 360, 480, 576, 720, 1080, 1440, 2160)
-
-
-def _classify_resolution(width, height):
-    """Classify resolution by snapping the effective height to the nearest standard.
+def _get_trailer_resolution(trailer_file):
+    """Get the resolution label (e.g. '1080p') of a local trailer file.
 
-    For cinematic aspect ratios (e.g. 1280x550) the height alone
-    under-reports the quality.  We derive an effective height from the
-    width assuming 16:9 and take the higher of the two values, then snap to
-    the closest standard resolution.
+    Uses the shared probe cache, so ffprobe only runs for new or changed files.
     """
-    effective_height = max(height, int(width * 9 / 16))
-    nearest = min(_RES_STANDARDS, key=lambda s: abs(s - effective_height))
-    return f"{nearest}p"
-
-
-def _get_trailer_resolution(trailer_file):
-    """Get the resolution label (e.g. '1080p') of a local trailer file using ffprobe."""
     if not trailer_file or not os.path.isfile(trailer_file):
         return ""
-    try:
-        result = subprocess.run(
-            ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
-             '-show_entries', 'stream=width,height', '-of', 'csv=p=0', trailer_file],
-            capture_output=True, text=True, timeout=10
-        )
-        dims = result.stdout.strip().split(',')
-        if len(dims) == 2:
-            width, height = int(dims[0]), int(dims[1])
-            return _classify_resolution(width, height)
-        # Fallback: single value means only height was returned
-        height = int(dims[0])
-        return _classify_resolution(0, height)
-    except Exception:
+    from Modules.probe_cache import get_probe_cache
+    from Modules.trailer_core import classify_resolution
+    info = get_probe_cache().probe(trailer_file)
+    if not info or not info.get('height'):
         return ""
+    return classify_resolution(info.get('width'), info['height'])
 
 
 def _check_local_trailer_movie(movie):
@@ -352,19 +571,19 @@ def _check_plexpass_trailer(item):
         found = False
         first_key = ""
         best_eff = 0
-        for extra in item.extras():
+        from Modules.plex_batch import get_extras
+        from Modules.trailer_core import classify_resolution, effective_height
+        for extra in get_extras(item):
             if extra.type == 'clip' and extra.subtype == 'trailer':
                 if not found:
                     first_key = str(extra.ratingKey)
                     found = True
                 for media in (getattr(extra, 'media', None) or []):
-                    w = getattr(media, 'width', 0) or 0
-                    h = getattr(media, 'height', 0) or 0
-                    eff = max(h, int(w * 9 / 16))
+                    eff = effective_height(getattr(media, 'width', 0), getattr(media, 'height', 0))
                     if eff > best_eff:
                         best_eff = eff
         if found:
-            resolution = _classify_resolution(0, best_eff) if best_eff else ""
+            resolution = classify_resolution(0, best_eff) if best_eff else ""
             return True, first_key, resolution
     except Exception:
         pass
@@ -423,17 +642,56 @@ def _prewarm_trailer_files(trigger="unknown"):
         pass
 
 
-def refresh_library_cache():
-    """Refresh the stats and library cache in the background. Thread-safe."""
-    global _cache_refreshing, _cache_refresh_pending
-    if _cache_refreshing:
-        _cache_refresh_pending = True
-        return
-    _cache_refreshing = True
-    t = threading.Thread(target=_do_refresh_cache, daemon=True, name="cache-refresh")
+def refresh_library_cache(full=False):
+    """Refresh the stats and library cache in the background. Thread-safe.
+
+    By default only items that changed since the last refresh are rebuilt
+    (see _refresh_cache_delta); full=True forces a rebuild from scratch.
+
+    A request that arrives while a refresh is running supersedes it: the
+    running refresh is cancelled (its partial results are discarded) and a
+    new one starts as soon as it has stopped.
+    """
+    global _cache_refreshing, _cache_refresh_pending, _cache_refresh_full_pending
+    with _cache_refresh_lock:
+        if _cache_refreshing:
+            _cache_refresh_pending = True
+            _cache_refresh_full_pending = _cache_refresh_full_pending or full
+            _cache_refresh_cancel.set()
+            return
+        _cache_refreshing = True
+        _cache_refresh_cancel.clear()
+    t = threading.Thread(target=_do_refresh_cache, args=(full,), daemon=True, name="cache-refresh")
     t.start()
 
 
+def _plex_timestamp(value):
+    """Epoch seconds of a plexapi datetime attribute (0 if unset)."""
+    try:
+        return int(value.timestamp()) if value else 0
+    except (AttributeError, OverflowError, OSError, ValueError):
+        return 0
+
+
+def _folder_signature(folder):
+    """mtimes of an item's folder and its Trailers/ subfolder.
+
+    Adding or removing a trailer changes one of the two (a new file inside an
+    existing Trailers/ folder only touches that folder's mtime), so an
+    unchanged signature means the local trailer lookup would give the same
+    result as last time.
+    """
+    if not folder:
+        return []
+    signature = []
+    for path in (folder, os.path.join(folder, 'Trailers')):
+        try:
+            signature.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            signature.append(0)
+    return signature
+
+
 def _build_movie_cache_entry(movie, lib_name, genres_to_skip, check_plex_pass, skipped_keys=frozenset()):
     """Build a single movie cache entry dict"""
     has_local, local_file = _check_local_trailer_movie(movie)
@@ -450,7 +708,8 @@ def _build_movie_cache_entry(movie, lib_name, genres_to_skip, check_plex_pass, s
             item_genres = [g.tag.lower() for g in movie.genres] if movie.genres else []
             if not item_genres:
                 try:
-                    movie.reload()
+                    from Modules.plex_batch import ensure_full_metadata
+                    ensure_full_metadata(movie)
                     item_genres = [g.tag.lower() for g in movie.genres] if movie.genres else []
                 except Exception:
                     pass
@@ -480,6 +739,8 @@ def _build_movie_cache_entry(movie, lib_name, genres_to_skip, check_plex_pass, s
 
     return {
         "ratingKey": movie.ratingKey,
+        "updatedAt": _plex_timestamp(movie.updatedAt),
+        "folderSignature": _folder_signature(os.path.dirname(media_path) if media_path else ""),
         "title": movie.title,
         "year": movie.year,
         "addedAt": movie.addedAt.isoformat() if movie.addedAt else "",
@@ -513,7 +774,8 @@ def _build_show_cache_entry(show, lib_name, genres_to_skip, check_plex_pass, loc
             item_genres = [g.tag.lower() for g in show.genres] if show.genres else []
             if not item_genres:
                 try:
-                    show.reload()
+                    from Modules.plex_batch import ensure_full_metadata
+                    ensure_full_metadata(show)
                     item_genres = [g.tag.lower() for g in show.genres] if show.genres else []
                 except Exception:
                     pass
@@ -539,6 +801,8 @@ def _build_show_cache_entry(show, lib_name, genres_to_skip, check_plex_pass, loc
 
     return {
         "ratingKey": show.ratingKey,
+        "updatedAt": _plex_timestamp(show.updatedAt),
+        "folderSignature": _folder_signature(media_path),
         "title": show.title,
         "year": show.year,
         "addedAt": show.addedAt.isoformat() if show.addedAt else "",
@@ -605,82 +869,154 @@ def _decrement_item_stats(stats, entry, collection):
         stats[k] = max(0, stats.get(k, 0) - 1)
 
 
-def _do_refresh_cache():
-    """Actually refresh the cache (runs in background thread)."""
-    global _cache_refreshing, _cache_progress, _cache_refresh_pending
-    _cache_progress = {"refreshing": True, "phase": "", "current_library": "", "processed": 0, "total": 0}
-    try:
-        config = _load_yaml(webui._config_path)
-        plex = _get_plex_server(config)
-        if not plex:
-            return
+def _bump(counts, key, delta):
+    """Add delta to counts[key], dropping the key when it reaches zero."""
+    value = counts.get(key, 0) + delta
+    if value > 0:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
 
-        check_plex_pass = config.get('CHECK_PLEX_PASS_TRAILERS', True)
-        movie_libs = config.get('MOVIE_LIBRARIES', [])
-        tv_libs = config.get('TV_LIBRARIES', [])
 
-        stats = {
-            "total_movies": 0,
-            "total_shows": 0,
-            "movies_missing_trailers": 0,
-            "shows_missing_trailers": 0,
-            "movies_local_trailers": 0,
-            "shows_local_trailers": 0,
-            "movies_skipped_genres": 0,
-            "shows_skipped_genres": 0,
-            "movies_plexpass_trailers": 0,
-            "shows_plexpass_trailers": 0,
-            "movies_disk_bytes": 0,
-            "shows_disk_bytes": 0,
-        }
+def _breakdowns_apply(breakdowns, entry, collection, delta):
+    """Add (delta=1) or remove (delta=-1) one entry's contribution to the dashboard breakdowns."""
+    from Modules.trailer_core import LANGUAGE_NAMES
+    lib_name = entry.get("library", "Unknown")
+    lib = breakdowns["libraries"].get(lib_name)
+    if lib is None:
+        if delta < 0:
+            return
+        lib = breakdowns["libraries"][lib_name] = {
+            "type": "movie" if collection == "movies" else "show",
+            "total": 0, "local": 0, "missing": 0, "plexpass": 0, "skipped": 0}
+    lib["total"] += delta
+    status = entry.get("trailerStatus", "")
+    if status == "local":
+        lib["local"] += delta
+        _bump(breakdowns["resolution"], entry.get("trailerResolution") or "Unknown", delta)
+        lang = entry.get("trailerLanguage") or ""
+        lang_label = LANGUAGE_NAMES.get(lang, lang) if lang else "Original"
+        _bump(breakdowns["language"], lang_label, delta)
+    elif status == "plexpass":
+        lib["plexpass"] += delta
+        _bump(breakdowns["resolution_plexpass"], entry.get("trailerResolution") or "Unknown", delta)
+    elif status == "missing":
+        lib["skipped" if entry.get("genreSkipped") else "missing"] += delta
+    if lib["total"] <= 0:
+        del breakdowns["libraries"][lib_name]
 
-        movies_list = []
-        tvshows_list = []
-        _collected_dirs = []  # Pre-collect dirs for allowed-dirs cache
 
-        # Process movies
-        for lib in movie_libs:
-            lib_name = lib.get('name', '') if isinstance(lib, dict) else lib
-            genres_to_skip = lib.get('genres_to_skip', []) if isinstance(lib, dict) else []
-            try:
-                section = plex.library.section(lib_name)
-                _collected_dirs.extend(section.locations)
-                movies = section.all()
-                stats["total_movies"] += len(movies)
+def _compute_breakdowns(movies_list, tvshows_list):
+    """Build the dashboard's resolution, language and per-library counts from the cache entries.
 
-                # Pre-compute set of ratingKeys that match skip genres
-                # using section.search() as a fast first pass
-                skipped_keys = set()
-                if genres_to_skip:
-                    for genre_name in genres_to_skip:
-                        try:
-                            matched = section.search(genre=genre_name)
-                            for m in matched:
-                                skipped_keys.add(m.ratingKey)
-                        except Exception:
-                            pass
+    Kept in _cache_data["breakdowns"] and adjusted per entry afterwards, like
+    the stats counters.
+    """
+    breakdowns = {"resolution": {}, "resolution_plexpass": {}, "language": {}, "libraries": {}}
+    for entry in movies_list:
+        _breakdowns_apply(breakdowns, entry, "movies", 1)
+    for entry in tvshows_list:
+        _breakdowns_apply(breakdowns, entry, "tvshows", 1)
+    return breakdowns
+
+
+def _adjust_breakdowns(entry, collection, delta):
+    """Apply one entry to _cache_data["breakdowns"], if built. Caller must hold _cache_lock."""
+    breakdowns = _cache_data.get("breakdowns")
+    if breakdowns is not None:
+        _breakdowns_apply(breakdowns, entry, collection, delta)
+
+
+def _build_cache_entries(full_items, build):
+    """Build cache entries for a library section's items, in input order.
+
+    full_items is an iterator from Modules.plex_batch that fetches the full
+    metadata (with extras) a batch at a time; it is consumed on this thread
+    while a pool of workers runs build(item) on the items already fetched, so
+    the Plex requests and the filesystem checks overlap.
+    _cache_progress["processed"] counts finished items. Items whose entry
+    can't be built are left out. Returns None if the refresh was cancelled.
+
+    On cancel, queued items are dropped and the ones already running are
+    waited for, so a superseded refresh has stopped (and stopped counting
+    progress) before the next one starts.
+    """
+    def _done(_future):
+        with _cache_progress_lock:
+            _cache_progress["processed"] += 1
 
-                _cache_progress.update(phase="movies", current_library=lib_name, processed=0, total=len(movies))
-                for idx, movie in enumerate(movies):
-                    _cache_progress["processed"] = idx + 1
-                    entry = _build_movie_cache_entry(movie, lib_name, genres_to_skip, check_plex_pass, skipped_keys)
-                    _movie_stats_increment(stats, entry)
-                    movies_list.append(entry)
+    pool = ThreadPoolExecutor(max_workers=_CACHE_REFRESH_WORKERS, thread_name_prefix="cache-entry")
+    try:
+        futures = []
+        for item in full_items:
+            if _cache_refresh_cancel.is_set():
+                return None
+            future = pool.submit(build, item)
+            future.add_done_callback(_done)
+            futures.append(future)
+        entries = []
+        for future in futures:
+            if _cache_refresh_cancel.is_set():
+                return None
+            try:
+                entries.append(future.result())
             except Exception:
                 pass
+        return entries
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
 
-        # Process TV shows
-        for lib in tv_libs:
-            lib_name = lib.get('name', '') if isinstance(lib, dict) else lib
-            genres_to_skip = lib.get('genres_to_skip', []) if isinstance(lib, dict) else []
+
+def _lib_settings(lib):
+    """(name, genres_to_skip) of a MOVIE_LIBRARIES / TV_LIBRARIES entry."""
+    if isinstance(lib, dict):
+        return lib.get('name', ''), lib.get('genres_to_skip', [])
+    return lib, []
+
+
+def _cache_refresh_config(config):
+    """The settings the cache entries depend on; a change forces a full rebuild."""
+    return {
+        "movie_libraries": config.get('MOVIE_LIBRARIES', []),
+        "tv_libraries": config.get('TV_LIBRARIES', []),
+        "check_plex_pass": bool(config.get('CHECK_PLEX_PASS_TRAILERS', True)),
+    }
+
+
+def _full_refresh_due(config, last_full_refresh):
+    """True when the last full rebuild is older than CACHE_FULL_REFRESH_HOURS."""
+    try:
+        hours = float(config.get('CACHE_FULL_REFRESH_HOURS', 24))
+    except (TypeError, ValueError):
+        hours = 24
+    if hours <= 0 or not last_full_refresh:
+        return True
+    try:
+        age = datetime.now() - datetime.fromisoformat(last_full_refresh)
+    except (TypeError, ValueError):
+        return True
+    return age.total_seconds() >= hours * 3600
+
+
+def _refresh_cache_full(plex, config, check_plex_pass, collected_dirs):
+    """Rebuild every cache entry. Returns (movies, tvshows), or None if cancelled."""
+    from Modules.plex_batch import iter_full_items
+    movies_list = []
+    tvshows_list = []
+
+    for collection, libs_key, phase in (("movies", 'MOVIE_LIBRARIES', "movies"),
+                                        ("tvshows", 'TV_LIBRARIES', "tvshows")):
+        target = movies_list if collection == "movies" else tvshows_list
+        for lib in config.get(libs_key, []):
+            lib_name, genres_to_skip = _lib_settings(lib)
             try:
                 section = plex.library.section(lib_name)
-                shows = section.all()
                 locations = section.locations
-                _collected_dirs.extend(locations)
-                stats["total_shows"] += len(shows)
+                collected_dirs.extend(locations)
+                items = section.all()
 
                 # Pre-compute set of ratingKeys that match skip genres
+                # using section.search() as a fast first pass
                 skipped_keys = set()
                 if genres_to_skip:
                     for genre_name in genres_to_skip:
@@ -691,21 +1027,159 @@ def _do_refresh_cache():
                         except Exception:
                             pass
 
-                _cache_progress.update(phase="tvshows", current_library=lib_name, processed=0, total=len(shows))
-                for idx, show in enumerate(shows):
-                    _cache_progress["processed"] = idx + 1
-                    entry = _build_show_cache_entry(show, lib_name, genres_to_skip, check_plex_pass, locations, skipped_keys)
-                    _show_stats_increment(stats, entry)
-                    tvshows_list.append(entry)
+                _cache_progress.update(phase=phase, current_library=lib_name, processed=0, total=len(items))
+                if collection == "movies":
+                    build = lambda movie: _build_movie_cache_entry(
+                        movie, lib_name, genres_to_skip, check_plex_pass, skipped_keys)
+                else:
+                    build = lambda show: _build_show_cache_entry(
+                        show, lib_name, genres_to_skip, check_plex_pass, locations, skipped_keys)
+                entries = _build_cache_entries(iter_full_items(plex, items), build)
+                if entries is None:
+                    return None
+                target.extend(entries)
             except Exception:
                 pass
+    return movies_list, tvshows_list
+
+
+def _refresh_cache_delta(plex, config, check_plex_pass, collected_dirs, old_movies, old_tvshows):
+    """Rebuild only the cache entries that may have changed since the last refresh.
+
+    Each section's listing gives every item's ratingKey and updatedAt without
+    loading full metadata. Items missing from the listing are dropped (deleted
+    in Plex); items that are new, moved to another library, have a different
+    updatedAt than their cached entry, or whose folder signature changed (a
+    trailer was added or removed on disk) are rebuilt; every other entry is
+    kept as-is. Comparing against the stored updatedAt rather than the time of
+    the last refresh avoids clock skew between Plex and this host.
+
+    Returns (movies, tvshows), or None if cancelled.
+    """
+    from Modules.plex_batch import iter_items_by_key, section_item_versions
+    result = {}
+
+    for collection, libs_key, old_entries in (("movies", 'MOVIE_LIBRARIES', old_movies),
+                                              ("tvshows", 'TV_LIBRARIES', old_tvshows)):
+        old_by_key = {e.get("ratingKey"): e for e in old_entries}
+        merged = []
+        for lib in config.get(libs_key, []):
+            lib_name, genres_to_skip = _lib_settings(lib)
+            section = plex.library.section(lib_name)
+            locations = section.locations
+            collected_dirs.extend(locations)
+
+            slots = []
+            stale_keys = []
+            for rating_key, updated_at in section_item_versions(plex, section):
+                entry = old_by_key.get(rating_key)
+                if (entry is None
+                        or entry.get("library") != lib_name
+                        or entry.get("updatedAt") != updated_at
+                        or entry.get("folderSignature") != _folder_signature(
+                            os.path.dirname(entry.get("mediaPath", "")) if collection == "movies"
+                            else entry.get("mediaPath", ""))):
+                    stale_keys.append(rating_key)
+                    slots.append(rating_key)
+                else:
+                    slots.append(entry)
 
+            _cache_progress.update(phase=collection, current_library=lib_name, processed=0, total=len(stale_keys))
+            # Full metadata carries the genres, so no genre search is needed here
+            if collection == "movies":
+                build = lambda movie: _build_movie_cache_entry(
+                    movie, lib_name, genres_to_skip, check_plex_pass)
+            else:
+                build = lambda show: _build_show_cache_entry(
+                    show, lib_name, genres_to_skip, check_plex_pass, locations)
+            entries = _build_cache_entries(iter_items_by_key(plex, stale_keys), build)
+            if entries is None:
+                return None
+            rebuilt = {e["ratingKey"]: e for e in entries}
+            for slot in slots:
+                if isinstance(slot, dict):
+                    merged.append(slot)
+                elif slot in rebuilt:
+                    merged.append(rebuilt[slot])
+        result[collection] = merged
+    return result["movies"], result["tvshows"]
+
+
+def _compute_stats(movies_list, tvshows_list):
+    """Build the dashboard stats dict from the cache entries."""
+    stats = {
+        "total_movies": len(movies_list),
+        "total_shows": len(tvshows_list),
+        "movies_missing_trailers": 0,
+        "shows_missing_trailers": 0,
+        "movies_local_trailers": 0,
+        "shows_local_trailers": 0,
+        "movies_skipped_genres": 0,
+        "shows_skipped_genres": 0,
+        "movies_plexpass_trailers": 0,
+        "shows_plexpass_trailers": 0,
+        "movies_disk_bytes": 0,
+        "shows_disk_bytes": 0,
+    }
+    for entry in movies_list:
+        _movie_stats_increment(stats, entry)
+    for entry in tvshows_list:
+        _show_stats_increment(stats, entry)
+    return stats
+
+
+def _do_refresh_cache(full=False):
+    """Actually refresh the cache (runs in background thread)."""
+    global _cache_refreshing, _cache_progress, _cache_refresh_pending, _cache_refresh_full_pending
+    _cache_progress = {"refreshing": True, "phase": "", "current_library": "", "processed": 0, "total": 0}
+    try:
+        config = _load_yaml(webui._config_path)
+        plex = _get_plex_server(config)
+        if not plex:
+            return
+
+        check_plex_pass = config.get('CHECK_PLEX_PASS_TRAILERS', True)
+        refresh_config = _cache_refresh_config(config)
+        with _cache_lock:
+            old_movies = _cache_data.get("movies")
+            old_tvshows = _cache_data.get("tvshows")
+            last_full_refresh = _cache_data.get("last_full_refresh")
+            same_config = _cache_data.get("refresh_config") == refresh_config
+
+        full = (full or old_movies is None or old_tvshows is None or not same_config
+                or _full_refresh_due(config, last_full_refresh))
+        _collected_dirs = []  # Pre-collect dirs for allowed-dirs cache
+        result = None
+        if not full:
+            try:
+                result = _refresh_cache_delta(plex, config, check_plex_pass, _collected_dirs,
+                                              list(old_movies), list(old_tvshows))
+            except Exception as e:
+                print(f"Incremental cache refresh failed ({e}); rebuilding the whole cache")
+                full = True
+                _collected_dirs = []
+        if full:
+            result = _refresh_cache_full(plex, config, check_plex_pass, _collected_dirs)
+
+        if result is None or _cache_refresh_cancel.is_set():
+            print("Library cache refresh superseded by a newer request; restarting")
+            return
+        movies_list, tvshows_list = result
+        stats = _compute_stats(movies_list, tvshows_list)
+        breakdowns = _compute_breakdowns(movies_list, tvshows_list)
+
+        now = datetime.now().isoformat()
         with _cache_lock:
             _cache_data["stats"] = stats
+            _cache_data["breakdowns"] = breakdowns
             _cache_data["movies"] = movies_list
             _cache_data["tvshows"] = tvshows_list
-            _cache_data["last_refreshed"] = datetime.now().isoformat()
+            _cache_data["last_refreshed"] = now
+            _cache_data["refresh_config"] = refresh_config
+            if full:
+                _cache_data["last_full_refresh"] = now
             _rebuild_known_trailer_paths()
+            _rebuild_library_index()
 
         _save_cache()
 
@@ -724,16 +1198,20 @@ def _do_refresh_cache():
             _allowed_dirs_cache["dirs"] = dirs
             _allowed_dirs_cache["timestamp"] = time.time()
 
-        print("Library cache refreshed")
+        print("Library cache refreshed" if full else "Library cache updated")
         _prewarm_trailer_files(trigger="post-refresh")
     except Exception as e:
         print(f"Cache refresh error: {e}")
     finally:
-        _cache_refreshing = False
         _cache_progress.update(refreshing=False, phase="", current_library="", processed=0, total=0)
-        if _cache_refresh_pending:
+        with _cache_refresh_lock:
+            _cache_refreshing = False
+            restart = _cache_refresh_pending
+            restart_full = _cache_refresh_full_pending
             _cache_refresh_pending = False
-            refresh_library_cache()
+            _cache_refresh_full_pending = False
+        if restart:
+            refresh_library_cache(full=restart_full)
 
 
 def upsert_cache_item(rating_key):
@@ -804,13 +1282,18 @@ def upsert_cache_item(rating_key):
                 if it.get("ratingKey") == rating_key:
                     existing_idx = i
                     break
+            old_entry = None
             if existing_idx is not None:
-                _decrement_item_stats(stats, items[existing_idx], collection)
+                old_entry = items[existing_idx]
+                _decrement_item_stats(stats, old_entry, collection)
+                _adjust_breakdowns(old_entry, collection, -1)
                 items[existing_idx] = entry
             else:
                 items.append(entry)
                 stats[total_key] = stats.get(total_key, 0) + 1
             incr(stats, entry)
+            _adjust_breakdowns(entry, collection, 1)
+            _index_replace_item(collection, old_entry, entry)
             _rebuild_known_trailer_paths()
 
         _save_cache()
@@ -848,6 +1331,7 @@ SECTION_HEADERS = {
     'YT_DLP_CUSTOM_OPTIONS': '################################################################################\n##########                  YT-DLP CUSTOM OPTIONS:                    ##########\n################################################################################',
     'SCHEDULE_TYPE': '################################################################################\n##########                         SCHEDULER:                         ##########\n################################################################################',
     'NEW_ITEM_DETECTION': '################################################################################\n##########                   NEW ITEM DETECTION:                      ##########\n################################################################################',
+    'MAX_CONCURRENT_ITEMS': '################################################################################\n##########                        PERFORMANCE:                        ##########\n################################################################################',
 }
 
 # ── Config option metadata ─────────────────────────────────────────────────
@@ -881,6 +1365,18 @@ SETTINGS_OPTIONS = [
      "label": "Detection Delay (seconds)",
      "description": "How long to wait after a new item appears before checking it, so Plex can finish matching metadata and extras.",
      "section": "Scheduler"},
+    {"key": "NEW_ITEM_WORKERS", "type": "number", "default": 3, "min": 1,
+     "label": "Detection Workers",
+     "description": "How many new items are checked at the same time, so a bulk import (e.g. a whole collection) is handled in minutes instead of one item after another.",
+     "section": "Scheduler"},
+    {"key": "NEW_ITEM_WORKERS_PER_LIBRARY", "type": "number", "default": 2, "min": 1,
+     "label": "Detection Workers per Library",
+     "description": "How many of those checks may run on the same Plex library at once.",
+     "section": "Scheduler"},
+    {"key": "NEW_ITEM_BANDWIDTH_LIMIT", "type": "number", "default": 0, "min": 0,
+     "label": "Detection Bandwidth Limit (MB/s)",
+     "description": "Total download speed of new-item checks, split evenly between the workers. 0 = unlimited.",
+     "section": "Scheduler"},
     # General
     {"key": "LAUNCH_METHOD", "type": "select", "default": "3", "label": "Launch Method", "description": "What to process on each run", "section": "General", "options": [
         {"value": "0", "label": "Menu (local only)"},
@@ -934,11 +1430,67 @@ SETTINGS_OPTIONS = [
     ]},
     # yt-dlp
     {"key": "YT_DLP_CUSTOM_OPTIONS", "type": "string_list", "default": [], "label": "yt-dlp Custom Options", "description": "Extra command-line flags passed to yt-dlp", "section": "yt-dlp Custom Options"},
+    # Performance
+    {"key": "MAX_CONCURRENT_ITEMS", "type": "number", "default": 1, "label": "Concurrent Items", "description": "How many movies/shows are checked at the same time during a run. 1 = one after the other.", "section": "Performance", "min": 1},
+    {"key": "PARALLEL_PIPELINES", "type": "bool", "default": False, "label": "Movies and TV in Parallel", "description": "When both movies and TV shows are processed, scan them at the same time instead of one after the other.", "section": "Performance"},
+    {"key": "PARALLEL_LIBRARIES", "type": "bool", "default": False, "label": "Libraries in Parallel", "description": "Scan all configured movie libraries (and all TV libraries) at the same time, each in its own process.", "section": "Performance"},
+    {"key": "DOWNLOAD_WORKERS", "type": "number", "default": 0, "label": "Download Workers", "description": "Number of background trailer downloads that run while the scan continues. 0 = download during the scan, one at a time.", "section": "Performance", "min": 0},
+    {"key": "PARALLEL_SEARCH", "type": "bool", "default": False, "label": "Parallel Trailer Search", "description": "Run all three YouTube search queries at once and pick the best trailer from the combined results, instead of trying them one after another.", "section": "Performance"},
+    {"key": "SEARCH_CACHE_TTL_HOURS", "type": "number", "default": 168, "label": "Search Cache (hours)", "description": "How long YouTube search results are reused before searching again. 0 = don't cache.", "section": "Performance", "min": 0},
+    {"key": "SEARCH_CACHE_NO_MATCH_TTL_HOURS", "type": "number", "default": 72, "label": "No-Match Cache (hours)", "description": "How long a search that found no usable trailer is skipped before it is tried again. 0 = always retry.", "section": "Performance", "min": 0},
+    {"key": "INCREMENTAL_SCAN", "type": "bool", "default": False, "label": "Incremental Scheduled Scans", "description": "Scheduled runs only check items added to Plex since the last successful run. Run Now always scans everything.", "section": "Performance"},
+    {"key": "FULL_SCAN_DAYS", "type": "number", "default": 7, "label": "Full Scan Interval (days)", "description": "With incremental scans on, a scheduled run still checks the whole library when the last full scan is older than this, so items without a trailer are retried.", "section": "Performance", "min": 1},
+    {"key": "CACHE_FULL_REFRESH_HOURS", "type": "number", "default": 24, "label": "Full Cache Rebuild (hours)", "description": "The Web UI library cache is normally updated incrementally (only new, changed and deleted items). It is rebuilt from scratch when the last full rebuild is older than this. 0 = always rebuild fully.", "section": "Performance", "min": 0},
 ]
 
 
 # ── Helper functions ───────────────────────────────────────────────────────
 
+def _status_payload(include_pool=True):
+    """The /api/status payload: scheduler state, cache and scan progress, watcher."""
+    if webui._scheduler_state:
+        result = webui._scheduler_state.get_status_dict()
+    else:
+        result = {"status": "unknown", "has_schedule": False}
+    with _cache_lock:
+        result["last_refreshed"] = _cache_data.get("last_refreshed")
+    result["cache_progress"] = dict(_cache_progress)
+    if webui._trailer_tracker:
+        result["scan_progress"] = dict(webui._trailer_tracker.scan_progress)
+    if getattr(webui, "_watcher", None) is not None:
+        try:
+            result["watcher"] = webui._watcher.get_status_dict()
+        except Exception:
+            pass
+    if include_pool:
+        try:
+            from Modules.plex_pool import get_plex_pool
+            result["plex_pool"] = get_plex_pool().stats()
+        except Exception:
+            pass
+    return result
+
+
+# Werkzeug access-log lines for API requests, hidden from the Log page
+_HTTP_LOG_RE = re.compile(r'^\d+\.\d+\.\d+\.\d+\s+-\s+-\s+\[.*?\]\s+"(GET|POST|PUT|DELETE|PATCH|HEAD|OPTIONS)\s+/api/')
+
+_event_hub = None
+_event_hub_lock = threading.Lock()
+
+
+def _get_event_hub():
+    """The EventHub behind /api/events, created on first use."""
+    global _event_hub
+    with _event_hub_lock:
+        if _event_hub is None:
+            from webui.events import EventHub
+            # Plex pool latency stats change with every request; they stay on /api/status only
+            _event_hub = EventHub(lambda: _status_payload(include_pool=False),
+                                  lambda: webui._log_path,
+                                  skip_log_line=lambda line: bool(_HTTP_LOG_RE.match(line)))
+        return _event_hub
+
+
 def _load_yaml(path):
     """Load a YAML file and return the dict (or empty dict)."""
     try:
@@ -1020,22 +1572,15 @@ def _test_plex_connection(url, token, timeout=10):
 
 
 def _get_plex_server(config=None):
-    """Get a PlexServer instance from config."""
-    from plexapi.server import PlexServer
+    """Get the shared (pooled, keep-alive) PlexServer for the configured server."""
+    from Modules.plex_pool import get_plex_pool, plex_settings
     if config is None:
         config = _load_yaml(webui._config_path)
-    url = config.get('PLEX_URL', '')
-    token = config.get('PLEX_TOKEN', '')
-    if not url or not token:
+    settings = plex_settings(config)
+    if settings is None:
         return None
     try:
-        timeout = int(config.get('PLEX_TIMEOUT', 120))
-    except (TypeError, ValueError):
-        timeout = 120
-    if timeout < 30:
-        timeout = 120
-    try:
-        return PlexServer(url, token, timeout=timeout)
+        return get_plex_pool().server(*settings)
     except Exception:
         return None
 
@@ -1061,38 +1606,17 @@ def _get_media_directories(config):
 # ── Path validation (security) ────────────────────────────────────────────
 _ALLOWED_VIDEO_EXTS = {'.mkv', '.mp4', '.webm', '.avi', '.mov', '.m4v', '.wmv'}
 
-# Language code to label mapping for trailer filenames
-_LANG_CODE_MAP = {
-    'de': 'German', 'fr': 'French', 'es': 'Spanish', 'it': 'Italian',
-    'ja': 'Japanese', 'ko': 'Korean', 'pt': 'Portuguese', 'ru': 'Russian',
-    'zh': 'Chinese', 'en': 'English',
-}
-
-# Keywords used to detect whether a video title/channel matches a language
-_LANGUAGE_KEYWORDS = {
-    'german': ['deutsch', 'german', 'auf deutsch', 'de'],
-    'french': ['français', 'francais', 'french', 'vf', 'vostfr', 'fr'],
-    'spanish': ['español', 'espanol', 'spanish', 'castellano', 'es'],
-    'italian': ['italiano', 'italian', 'it'],
-    'japanese': ['日本語', 'japanese', 'jp', 'ja'],
-    'korean': ['한국어', 'korean', 'ko'],
-    'portuguese': ['português', 'portugues', 'portuguese', 'pt', 'dublado'],
-    'russian': ['русский', 'russian', 'ru'],
-    'chinese': ['中文', 'chinese', 'zh'],
-    'english': ['english', 'en'],
-}
-
-
 def _detect_trailer_language(trailer_file):
     """Extract language code from trailer filename (e.g. 'Title.de-trailer.mkv' → 'de')."""
     if not trailer_file:
         return ""
+    from Modules.trailer_core import LANGUAGE_NAMES
     basename = os.path.splitext(os.path.basename(trailer_file))[0]  # e.g. "Title (2020).de-trailer"
     if basename.endswith('-trailer'):
         prefix = basename[:-len('-trailer')]  # e.g. "Title (2020).de"
         # Check if prefix ends with a language code
         parts = prefix.rsplit('.', 1)
-        if len(parts) == 2 and parts[1] in _LANG_CODE_MAP:
+        if len(parts) == 2 and parts[1] in LANGUAGE_NAMES:
             return parts[1]
     return ""
 
@@ -1286,13 +1810,17 @@ def _get_ytdlp_info():
 # ── Manual search helper ──────────────────────────────────────────────────
 
 def _yt_search(query, limit=10):
-    """Search YouTube using yt-dlp and return results."""
+    """Search YouTube using yt-dlp and return results.
+
+    The search is flat (no per-video format extraction), so 'resolution' is
+    left empty here; _yt_max_resolution() resolves it for a single result.
+    """
     import yt_dlp
     results = []
     ydl_opts = {
         'quiet': True,
         'no_warnings': True,
-        'extract_flat': False,
+        'extract_flat': True,
         'skip_download': True,
         'ignoreerrors': True,
     }
@@ -1304,278 +1832,81 @@ def _yt_search(query, limit=10):
                     if entry is None:
                         continue
                     duration = entry.get('duration', 0) or 0
-                    # Determine highest available resolution from formats
-                    formats = entry.get('formats') or []
-                    max_height = 0
-                    max_width = 0
-                    for f in formats:
-                        h = f.get('height') or 0
-                        w = f.get('width') or 0
-                        if h > max_height:
-                            max_height = h
-                            max_width = w
+                    video_id = entry.get('id', '')
+                    thumbnails = entry.get('thumbnails') or []
+                    thumbnail = entry.get('thumbnail') or (thumbnails[-1].get('url', '') if thumbnails else '')
+                    if not thumbnail and video_id:
+                        thumbnail = f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
                     results.append({
-                        'id': entry.get('id', ''),
+                        'id': video_id,
                         'title': entry.get('title', ''),
-                        'channel': entry.get('channel', entry.get('uploader', '')),
+                        'channel': entry.get('channel') or entry.get('uploader') or '',
                         'duration': duration,
                         'duration_str': f"{int(duration)//60}:{int(duration)%60:02d}" if duration else '?',
                         'view_count': entry.get('view_count', 0) or 0,
-                        'thumbnail': entry.get('thumbnail', ''),
-                        'url': entry.get('webpage_url', f"https://www.youtube.com/watch?v={entry.get('id', '')}"),
-                        'resolution': _classify_resolution(max_width, max_height) if max_height else '',
+                        'thumbnail': thumbnail,
+                        'url': entry.get('webpage_url') or entry.get('url') or f"https://www.youtube.com/watch?v={video_id}",
+                        'resolution': '',
                     })
     except Exception as e:
         print(f"yt-dlp search error: {e}")
     return results
 
 
-def _rename_trailer_with_resolution(filepath):
-    """Probe a downloaded trailer's resolution and rename the file to include it."""
-    if not filepath or not os.path.isfile(filepath):
-        return filepath
-    try:
-        result = subprocess.run(
-            ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
-             '-show_entries', 'stream=width,height', '-of', 'csv=p=0', filepath],
-            capture_output=True, text=True, timeout=10
-        )
-        dims = result.stdout.strip().split(',')
-        if len(dims) != 2:
-            return filepath
-        width, height = int(dims[0]), int(dims[1])
-        res_label = _classify_resolution(width, height)
-    except Exception:
-        return filepath
-
-    directory = os.path.dirname(filepath)
-    name, ext = os.path.splitext(os.path.basename(filepath))
-    if not name.endswith('-trailer'):
-        return filepath
-
-    # Skip if resolution is already in the filename
-    if re.search(r'\.\d{3,4}p[.\-]', name):
-        return filepath
-
-    prefix = name[:-len('-trailer')]
-
-    # Language codes for detection
-    lang_codes = {'de', 'fr', 'es', 'it', 'ja', 'ko', 'pt', 'ru', 'zh', 'en'}
-
-    # Insert resolution before language code (if present) and -trailer
-    parts = prefix.rsplit('.', 1)
-    if len(parts) == 2 and parts[1] in lang_codes:
-        new_name = f"{parts[0]}.{res_label}.{parts[1]}-trailer{ext}"
-    else:
-        new_name = f"{prefix}.{res_label}-trailer{ext}"
-
-    new_path = os.path.join(directory, new_name)
-    try:
-        os.rename(filepath, new_path)
-        return new_path
-    except OSError:
-        return filepath
-
-
-def _rename_trailer_with_lang_tag(filepath, lang_code, lang_codes_map):
-    """Rename a downloaded trailer to include the language tag."""
-    directory = os.path.dirname(filepath)
-    name, ext = os.path.splitext(os.path.basename(filepath))
-    if not name.endswith('-trailer'):
-        return filepath
-    prefix = name[:-len('-trailer')]
-    # Check if already has a language code
-    parts = prefix.rsplit('.', 1)
-    if len(parts) == 2 and parts[1] in lang_codes_map.values():
-        return filepath  # Already has a lang tag
-    # Insert lang code before -trailer (after resolution label if present)
-    new_name = f"{prefix}.{lang_code}-trailer{ext}"
-    new_path = os.path.join(directory, new_name)
+def _yt_max_resolution(url):
+    """Highest resolution label available for one video ('' if unknown)."""
+    import yt_dlp
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'skip_download': True,
+        'ignoreerrors': True,
+        'noplaylist': True,
+    }
     try:
-        os.rename(filepath, new_path)
-        return new_path
-    except OSError:
-        return filepath
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            # process=False: the format list is all we need, no format selection
+            info = ydl.extract_info(url, download=False, process=False)
+    except Exception as e:
+        print(f"yt-dlp format lookup error: {e}")
+        return ''
+    max_height = 0
+    max_width = 0
+    for f in (info or {}).get('formats') or []:
+        h = f.get('height') or 0
+        w = f.get('width') or 0
+        if h > max_height:
+            max_height = h
+            max_width = w
+    from Modules.trailer_core import classify_resolution
+    return classify_resolution(max_width, max_height) if max_height else ''
 
 
 def _download_trailer_for_item(video_url, media_path, title, year, media_type="movie", ignore_quality_min=False):
     """Download a trailer from YouTube and save it alongside the media file."""
-    import yt_dlp
+    from Modules.trailer_core import TrailerSettings, TrailerTarget, download_video
 
     config = _load_yaml(webui._config_path)
 
     # Normalize path for Docker (Windows Plex → Linux container)
     media_path = _normalize_path(media_path)
 
-    # Determine output path
     # For movies: media_path is a file path (e.g. /media/Movies/Title/Title.mkv)
     #   → trailer goes in the same directory's Trailers subfolder
     # For TV shows: media_path is the show folder (e.g. /media/TV Shows/Title/)
-    #   → trailer goes in the show folder's Trailers subfolder
+    #   → trailer goes in the show folder's Trailers subfolder (no year in the name)
     if media_type == "movie":
-        media_dir = os.path.dirname(media_path)
+        target = TrailerTarget.for_movie(title, year, media_path)
     else:
-        # TV show - media_path is already the show folder
-        media_dir = media_path.rstrip('/').rstrip('\\')
-    trailers_dir = os.path.join(media_dir, 'Trailers')
+        target = TrailerTarget.for_show(title, year, media_path)
     try:
-        os.makedirs(trailers_dir, exist_ok=True)
+        os.makedirs(target.trailers_folder, exist_ok=True)
     except PermissionError:
-        return False, f"Permission denied: '{trailers_dir}'. Please check that your media paths are mounted correctly in Docker."
+        return False, f"Permission denied: '{target.trailers_folder}'. Please check that your media paths are mounted correctly in Docker."
     except OSError as e:
-        return False, f"Cannot create trailer directory: '{trailers_dir}' — {e}. Please check that your media paths are mounted correctly."
-
-    # Clean title for filename (match module behavior: colons → " -")
-    safe_title = title.replace(":", " -")
-    safe_title = re.sub(r'[<>"/\\|?*]', '', safe_title)
-
-    # Language code — will only be applied to the filename AFTER download
-    # if the video title actually matches the preferred language
-    lang_codes = {
-        'german': 'de', 'french': 'fr', 'spanish': 'es', 'italian': 'it',
-        'japanese': 'ja', 'korean': 'ko', 'portuguese': 'pt', 'russian': 'ru',
-        'chinese': 'zh', 'english': 'en',
-    }
-    preferred_lang = config.get('PREFERRED_LANGUAGE', 'original').lower()
-    lang_code = lang_codes.get(preferred_lang, '')
+        return False, f"Cannot create trailer directory: '{target.trailers_folder}' — {e}. Please check that your media paths are mounted correctly."
 
-    if media_type == "movie" and year:
-        output_name = f"{safe_title} ({year})-trailer"
-    else:
-        # TV shows: no year in filename (matches TV.py behavior)
-        output_name = f"{safe_title}-trailer"
-
-    output_path = os.path.join(trailers_dir, output_name)
-
-    # Remove ALL existing trailers for this item (any language variant).
-    # This ensures switching language doesn't leave the old trailer behind.
-    # Match: "Title (Year)<optional .langcode>-trailer.<ext>" for movies
-    #        "Title<optional .langcode>-trailer.<ext>" for TV shows
-    if media_type == "movie" and year:
-        base_prefix = f"{safe_title} ({year})"
-    else:
-        base_prefix = safe_title
-    for fname in os.listdir(trailers_dir):
-        fname_noext, fext = os.path.splitext(fname)
-        if fext.lower() not in ('.mkv', '.mp4', '.webm', '.avi', '.mov'):
-            continue
-        if fname_noext.endswith('-trailer') and fname_noext.startswith(base_prefix):
-            # Verify suffix parts are only resolution labels and/or language codes
-            stem = fname_noext[:-len('-trailer')]
-            suffix = stem[len(base_prefix):]
-            # suffix is e.g. "", ".de", ".720p", ".720p.de"
-            if not suffix or all(
-                p in lang_codes.values() or (p.endswith('p') and p[:-1].isdigit())
-                for p in suffix.lstrip('.').split('.') if p
-            ):
-                try:
-                    os.remove(os.path.join(trailers_dir, fname))
-                except OSError:
-                    pass
-
-    max_res = int(config.get('TRAILER_RESOLUTION_MAX', 1080))
-    min_res = int(config.get('TRAILER_RESOLUTION_MIN', 1080))
-    file_format = config.get('TRAILER_FILE_FORMAT', 'mkv').lower()
-    if file_format not in ('mkv', 'mp4'):
-        file_format = 'mkv'
-    if min_res > max_res:
-        min_res, max_res = max_res, min_res
-    if ignore_quality_min:
-        fmt = (f'bestvideo[height<={max_res}][ext=mp4]+bestaudio[ext=m4a]/'
-               f'bestvideo[height<={max_res}][ext=webm]+bestaudio[ext=webm]/'
-               f'bestvideo[height<={max_res}]+bestaudio/'
-               f'best[height<={max_res}]/best')
-    else:
-        fmt = (f'bestvideo[height<={max_res}][height>={min_res}][ext=mp4]+bestaudio[ext=m4a]/'
-               f'bestvideo[height<={max_res}][height>={min_res}][ext=webm]+bestaudio[ext=webm]/'
-               f'bestvideo[height<={max_res}][height>={min_res}]+bestaudio/'
-               f'best[height<={max_res}][height>={min_res}]')
-    ydl_opts = {
-        'format': fmt,
-        'merge_output_format': file_format,
-        'outtmpl': output_path + '.%(ext)s',
-        'quiet': True,
-        'no_warnings': True,
-    }
-
-    # Check for cookies
-    if IS_DOCKER:
-        cookies_path = '/cookies/cookies.txt'
-    else:
-        cookies_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cookies', 'cookies.txt')
-    if os.path.exists(cookies_path):
-        ydl_opts['cookiefile'] = cookies_path
-
-    # Custom options
-    # Blocklist of yt-dlp options that could allow arbitrary code execution,
-    # file writes outside media dirs, or credential theft.
-    _BLOCKED_YTDLP_OPTS = {
-        'exec', 'exec_before_dl', 'exec_before_download',
-        'output', 'outtmpl', 'paths', 'batch_file',
-        'cookies', 'cookiefile', 'cookies_from_browser', 'cookiesfrombrowser',
-        'download_archive', 'config_locations', 'config_location',
-        'plugin_dirs', 'write_pages', 'print_to_file',
-    }
-    custom_opts = config.get('YT_DLP_CUSTOM_OPTIONS', [])
-    if custom_opts:
-        import shlex
-        for option_str in custom_opts:
-            parts = shlex.split(option_str)
-            for i, part in enumerate(parts):
-                if not part.startswith('--'):
-                    continue
-                key = part[2:].replace('-', '_')
-                if key in _BLOCKED_YTDLP_OPTS:
-                    print(f"[Security] Blocked dangerous yt-dlp option: --{part[2:]}")
-                    continue
-                if i + 1 < len(parts) and not parts[i + 1].startswith('--'):
-                    value = parts[i + 1]
-                    if key == 'extractor_args':
-                        if ':' in value:
-                            service, args_str = value.split(':', 1)
-                            if 'extractor_args' not in ydl_opts:
-                                ydl_opts['extractor_args'] = {}
-                            if service not in ydl_opts['extractor_args']:
-                                ydl_opts['extractor_args'][service] = {}
-                            for arg_pair in args_str.split(','):
-                                if '=' in arg_pair:
-                                    arg_key, arg_val = arg_pair.split('=', 1)
-                                    ydl_opts['extractor_args'][service][arg_key] = [arg_val]
-                    else:
-                        ydl_opts[key] = value
-
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # Extract video info first to check language match later
-            video_info = ydl.extract_info(video_url, download=False)
-            video_title = (video_info.get('title', '') or '') if video_info else ''
-            video_channel = (video_info.get('channel', '') or video_info.get('uploader', '') or '') if video_info else ''
-
-            ydl.download([video_url])
-
-        # Find the downloaded file and rename to include resolution
-        for ext in ['.mkv', '.mp4', '.webm']:
-            final_path = output_path + ext
-            if os.path.exists(final_path):
-                final_path = _rename_trailer_with_resolution(final_path)
-                # Apply language tag only if video title/channel matches preferred language
-                if lang_code and preferred_lang != 'original':
-                    lang_kws = _LANGUAGE_KEYWORDS.get(preferred_lang, [preferred_lang])
-                    title_lower = video_title.lower()
-                    channel_lower = video_channel.lower()
-                    if any(kw in title_lower or kw in channel_lower for kw in lang_kws):
-                        final_path = _rename_trailer_with_lang_tag(final_path, lang_code, lang_codes)
-                return True, final_path
-
-        return False, "Download completed but file not found"
-    except Exception as e:
-        err_msg = str(e)
-        if not ignore_quality_min and ("Requested format is not available" in err_msg
-                                       or "No video formats found" in err_msg
-                                       or "format is not available" in err_msg.lower()):
-            return False, "QUALITY_TOO_HIGH"
-        print(f"Trailer download error: {err_msg}")
-        return False, "Download failed"
+    return download_video(TrailerSettings(config), target, video_url, ignore_quality_min=ignore_quality_min)
 
 
 # ── Route registration ─────────────────────────────────────────────────────
@@ -1614,27 +1945,25 @@ def register_routes(app):
     # ── Cache refresh ──────────────────────────────────────────────
     @app.route("/api/cache/refresh", methods=["POST"])
     def api_cache_refresh():
-        refresh_library_cache()
+        refresh_library_cache(full=True)
         return jsonify({"ok": True})
 
     # ── Status ─────────────────────────────────────────────────────────
     @app.route("/api/status")
     def api_status():
-        if webui._scheduler_state:
-            result = webui._scheduler_state.get_status_dict()
-        else:
-            result = {"status": "unknown", "has_schedule": False}
-        with _cache_lock:
-            result["last_refreshed"] = _cache_data.get("last_refreshed")
-        result["cache_progress"] = dict(_cache_progress)
-        if webui._trailer_tracker:
-            result["scan_progress"] = dict(webui._trailer_tracker.scan_progress)
-        if getattr(webui, "_watcher", None) is not None:
-            try:
-                result["watcher"] = webui._watcher.get_status_dict()
-            except Exception:
-                pass
-        return jsonify(result)
+        return jsonify(_status_payload())
+
+    # ── Events (SSE) ───────────────────────────────────────────────────
+    @app.route("/api/events")
+    def api_events():
+        """Push status changes and new log lines; see webui/events.py."""
+        hub = _get_event_hub()
+        q = hub.subscribe()
+        response = Response(hub.stream(q), mimetype="text/event-stream")
+        response.headers['Cache-Control'] = 'no-cache'
+        # Don't let a reverse proxy (nginx) buffer the stream
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
 
     @app.route("/api/scheduler/run-now", methods=["POST"])
     def api_run_now():
@@ -1713,6 +2042,23 @@ def register_routes(app):
                     return jsonify({"ok": False, "error": "Detection Delay must be a whole number"}), 400
                 if value < 0:
                     return jsonify({"ok": False, "error": "Detection Delay must be 0 or more seconds"}), 400
+            # Coerce the detection worker counts to ints >= 1
+            if key in ("NEW_ITEM_WORKERS", "NEW_ITEM_WORKERS_PER_LIBRARY"):
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    return jsonify({"ok": False, "error": "Detection workers must be a whole number"}), 400
+                if value < 1:
+                    return jsonify({"ok": False, "error": "Detection workers must be 1 or more"}), 400
+            if key == "NEW_ITEM_BANDWIDTH_LIMIT":
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    return jsonify({"ok": False, "error": "Detection Bandwidth Limit must be a number"}), 400
+                if value < 0:
+                    return jsonify({"ok": False, "error": "Detection Bandwidth Limit must be 0 or more"}), 400
+                if value.is_integer():
+                    value = int(value)
             config[key] = value
         if "movie" in libraries:
             config["MOVIE_LIBRARIES"] = libraries["movie"]
@@ -1746,6 +2092,13 @@ def register_routes(app):
             if not ok:
                 return jsonify({"ok": False, "error": err}), 400
 
+        # Drop pooled Plex connections; the next request reconnects with the saved settings
+        try:
+            from Modules.plex_pool import get_plex_pool
+            get_plex_pool().invalidate()
+        except Exception:
+            pass
+
         # Apply new-item-detection settings to the live watcher (enable/disable,
         # delay, and reconnect if Plex creds changed) without a container restart.
         if getattr(webui, "_watcher", None) is not None:
@@ -1834,6 +2187,16 @@ def register_routes(app):
             return jsonify({"ok": True, "removed": removed})
         return jsonify({"ok": False, "error": "Tracker unavailable"}), 500
 
+    @app.route("/api/search-cache/purge", methods=["POST"])
+    def api_purge_search_cache():
+        """Drop all cached YouTube search results so the next run searches afresh."""
+        from Modules.search_cache import SearchCache
+        try:
+            removed = SearchCache().purge()
+        except Exception as e:
+            return jsonify({"ok": False, "error": str(e)}), 500
+        return jsonify({"ok": True, "removed": removed})
+
     # ── Connection test ────────────────────────────────────────────────
     @app.route("/api/test/plex", methods=["POST"])
     def api_test_plex():
@@ -1942,134 +2305,28 @@ def register_routes(app):
     # ── Dashboard: detailed breakdowns ──────────────────────────────────
     @app.route("/api/dashboard/breakdowns")
     def api_dashboard_breakdowns():
-        """Resolution, language, and per-library breakdowns computed from cache."""
+        """Resolution, language, and per-library breakdowns maintained with the cache."""
         with _cache_lock:
-            movies = _cache_data.get("movies")
-            tvshows = _cache_data.get("tvshows")
-        if movies is None and tvshows is None:
-            return jsonify({"resolution": {}, "language": {}, "libraries": []})
-
-        resolution = {}            # local trailer resolutions
-        resolution_plexpass = {}   # Plex Pass trailer (max available) resolutions
-        language = {}
-        lib_map = {}  # lib_name -> {type, total, local, missing, plexpass, skipped}
-
-        for item in (movies or []):
-            lib_name = item.get("library", "Unknown")
-            if lib_name not in lib_map:
-                lib_map[lib_name] = {"type": "movie", "total": 0, "local": 0, "missing": 0, "plexpass": 0, "skipped": 0}
-            lib_map[lib_name]["total"] += 1
-            status = item.get("trailerStatus", "")
-            if status == "local":
-                lib_map[lib_name]["local"] += 1
-                res = item.get("trailerResolution") or "Unknown"
-                resolution[res] = resolution.get(res, 0) + 1
-                lang = item.get("trailerLanguage") or ""
-                lang_label = _LANG_CODE_MAP.get(lang, lang) if lang else "Original"
-                language[lang_label] = language.get(lang_label, 0) + 1
-            elif status == "plexpass":
-                lib_map[lib_name]["plexpass"] += 1
-                res = item.get("trailerResolution") or "Unknown"
-                resolution_plexpass[res] = resolution_plexpass.get(res, 0) + 1
-            elif status == "missing":
-                if item.get("genreSkipped"):
-                    lib_map[lib_name]["skipped"] += 1
-                else:
-                    lib_map[lib_name]["missing"] += 1
-
-        for item in (tvshows or []):
-            lib_name = item.get("library", "Unknown")
-            if lib_name not in lib_map:
-                lib_map[lib_name] = {"type": "show", "total": 0, "local": 0, "missing": 0, "plexpass": 0, "skipped": 0}
-            lib_map[lib_name]["total"] += 1
-            status = item.get("trailerStatus", "")
-            if status == "local":
-                lib_map[lib_name]["local"] += 1
-                res = item.get("trailerResolution") or "Unknown"
-                resolution[res] = resolution.get(res, 0) + 1
-                lang = item.get("trailerLanguage") or ""
-                lang_label = _LANG_CODE_MAP.get(lang, lang) if lang else "Original"
-                language[lang_label] = language.get(lang_label, 0) + 1
-            elif status == "plexpass":
-                lib_map[lib_name]["plexpass"] += 1
-                res = item.get("trailerResolution") or "Unknown"
-                resolution_plexpass[res] = resolution_plexpass.get(res, 0) + 1
-            elif status == "missing":
-                if item.get("genreSkipped"):
-                    lib_map[lib_name]["skipped"] += 1
-                else:
-                    lib_map[lib_name]["missing"] += 1
-
-        libraries = [{"name": k, **v} for k, v in lib_map.items()]
-        return jsonify({"resolution": resolution, "resolution_plexpass": resolution_plexpass,
-                        "language": language, "libraries": libraries})
+            breakdowns = _cache_data.get("breakdowns")
+            if breakdowns is None:
+                return jsonify({"resolution": {}, "language": {}, "libraries": []})
+            result = {
+                "resolution": dict(breakdowns["resolution"]),
+                "resolution_plexpass": dict(breakdowns["resolution_plexpass"]),
+                "language": dict(breakdowns["language"]),
+                "libraries": [{"name": k, **v} for k, v in breakdowns["libraries"].items()],
+            }
+        return jsonify(result)
 
     # ── Library: Movies ────────────────────────────────────────────────
     @app.route("/api/library/movies")
     def api_library_movies():
-        sort = request.args.get("sort", "title")
-        filter_type = request.args.get("filter", "all")
-
-        with _cache_lock:
-            cached = _cache_data.get("movies")
-        if cached is None:
-            # No cache yet - trigger refresh
-            refresh_library_cache()
-            return jsonify({"items": [], "loading": True})
-
-        items = cached
-        if filter_type != "all":
-            items = [i for i in items if i.get("trailerStatus") == filter_type]
-
-        if sort == "added":
-            items = sorted(items, key=lambda x: x.get("addedAt", ""), reverse=True)
-        else:
-            items = sorted(items, key=lambda x: x.get("title", "").lower())
-
-        # Build per-library genres_to_skip map
-        config = _load_yaml(webui._config_path)
-        genres_to_skip_map = {}
-        for lib in config.get('MOVIE_LIBRARIES', []):
-            if isinstance(lib, dict):
-                lib_name = lib.get('name', '')
-                skip_genres = [g.lower() for g in lib.get('genres_to_skip', [])]
-                if skip_genres:
-                    genres_to_skip_map[lib_name] = skip_genres
-
-        return jsonify({"items": items, "genresToSkip": genres_to_skip_map})
+        return _library_response("movies")
 
     # ── Library: TV Shows ──────────────────────────────────────────────
     @app.route("/api/library/tvshows")
     def api_library_tvshows():
-        sort = request.args.get("sort", "title")
-        filter_type = request.args.get("filter", "all")
-
-        with _cache_lock:
-            cached = _cache_data.get("tvshows")
-        if cached is None:
-            refresh_library_cache()
-            return jsonify({"items": [], "loading": True})
-
-        items = cached
-        if filter_type != "all":
-            items = [i for i in items if i.get("trailerStatus") == filter_type]
-
-        if sort == "added":
-            items = sorted(items, key=lambda x: x.get("addedAt", ""), reverse=True)
-        else:
-            items = sorted(items, key=lambda x: x.get("title", "").lower())
-
-        # Build per-library genres_to_skip map
-        config = _load_yaml(webui._config_path)
-        genres_to_skip_map = {}
-        for lib in config.get('TV_LIBRARIES', []):
-            if isinstance(lib, dict):
-                lib_name = lib.get('name', '')
-                skip_genres = [g.lower() for g in lib.get('genres_to_skip', [])]
-                if skip_genres:
-                    genres_to_skip_map[lib_name] = skip_genres
-
-        return jsonify({"items": items, "genresToSkip": genres_to_skip_map})
+        return _library_response("tvshows")
 
     # ── Item detail ────────────────────────────────────────────────────
     @app.route("/api/library/item/<int:rating_key>")
@@ -2169,6 +2426,15 @@ def register_routes(app):
         page = results[offset:]
         return jsonify({"results": page, "has_more": len(page) == page_size})
 
+    @app.route("/api/search/resolution", methods=["POST"])
+    def api_search_resolution():
+        """Resolve the best available resolution of a single search result."""
+        data = request.get_json() or {}
+        url = data.get("url", "")
+        if not isinstance(url, str) or not url.startswith(("https://", "http://")):
+            return jsonify({"resolution": "", "error": "Invalid URL"}), 400
+        return jsonify({"resolution": _yt_max_resolution(url)})
+
     # ── Manual download ────────────────────────────────────────────────
     @app.route("/api/download/trailer", methods=["POST"])
     def api_download_trailer():
@@ -2520,7 +2786,7 @@ def register_routes(app):
             stream_url = extra.getStreamURL()
 
             # Proxy the stream from Plex to the client
-            resp = requests.get(stream_url, stream=True, timeout=30)
+            resp = plex._session.get(stream_url, stream=True, timeout=30)
             if resp.status_code != 200:
                 return "Plex stream unavailable", 502
 
@@ -2560,8 +2826,11 @@ def register_routes(app):
         except Exception:
             return "Invalid Plex URL", 400
         try:
+            from Modules.plex_pool import get_plex_pool, plex_settings
             thumb_url = f"{plex_url}/library/metadata/{rating_key}/thumb"
-            resp = requests.get(thumb_url, headers={'X-Plex-Token': plex_token}, timeout=10, stream=True)
+            # Keep-alive session shared with the PlexServer (sends the token header)
+            session = get_plex_pool().session(*plex_settings(config))
+            resp = session.get(thumb_url, timeout=10, stream=True)
             if resp.status_code == 200:
                 poster_resp = Response(resp.content, mimetype=resp.headers.get('Content-Type', 'image/jpeg'))
                 poster_resp.headers['Cache-Control'] = 'public, max-age=86400'  # 24h browser cache
@@ -2575,7 +2844,6 @@ def register_routes(app):
     def api_log():
         """Return the last N lines from the log file."""
         limit = request.args.get("limit", 500, type=int)
-        _http_log_re = re.compile(r'^\d+\.\d+\.\d+\.\d+\s+-\s+-\s+\[.*?\]\s+"(GET|POST|PUT|DELETE|PATCH|HEAD|OPTIONS)\s+/api/')
         project_root = os.path.dirname(os.path.dirname(__file__))
         log_paths = [
             os.path.join(project_root, "logs", "mtdp.log"),
@@ -2587,7 +2855,7 @@ def register_routes(app):
                 try:
                     with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
                         lines = f.readlines()
-                    filtered = [l for l in lines if not _http_log_re.match(l)]
+                    filtered = [l for l in lines if not _HTTP_LOG_RE.match(l)]
                     return jsonify({"lines": filtered[-limit:]})
                 except Exception:
                     pass